@@ -15,6 +15,8 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
+from src.ml.cascade_registry import get_face_cascade
+
 def load_config():
     """Load configuration from config.json"""
     config_file = "config.json"
@@ -165,9 +167,8 @@ def extract_hsv_features(image):
 def detect_faces(image):
     """Detect faces in image"""
     try:
-        # Load Haar cascade
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        face_cascade = cv2.CascadeClassifier(cascade_path)
+        # Shared Haar cascade (loaded once per thread)
+        face_cascade = get_face_cascade()
         
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
@@ -14,6 +14,14 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
+from src.ml.glcm_engine import GLCMEngine
+from src.ml.lbp_engine import LBPEngine
+from src.ml.cascade_registry import get_face_cascade
+
+# Shared GLCM and LBP engines with exact training parameters
+GLCM_ENGINE = GLCMEngine(distances=[1], angles=[0, 45, 90, 135], levels=256)
+LBP_ENGINE = LBPEngine(n_points=8, radius=1.0)
+
 def load_config():
     """Load configuration from config.json"""
     config_file = "config.json"
@@ -52,12 +60,6 @@ def load_models(models_dir):
     
     return models
 
-def shannon_entropy(P):
-    """Calculate Shannon entropy"""
-    # Remove zeros to avoid log(0)
-    P = P[P > 0]
-    return -np.sum(P * np.log2(P))
-
 def extract_hog_features_exact(image):
     """Extract HOG features with exact training parameters"""
     try:
@@ -86,8 +88,6 @@ def extract_hog_features_exact(image):
 def extract_glcm_features_exact(image):
     """Extract GLCM features with exact training parameters"""
     try:
-        from skimage.feature import graycomatrix, graycoprops
-        
         # Convert to grayscale
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
@@ -98,40 +98,8 @@ def extract_glcm_features_exact(image):
         if gray.shape[0] > 256 or gray.shape[1] > 256:
             gray = cv2.resize(gray, (256, 256))
         
-        # Exact training parameters from GLCFeatureExtractor
-        distances = [1]  # Default from config
-        angles = [0, 45, 90, 135]  # Default from config (in degrees)
-        levels = 256  # Default from config
-        
-        # Convert angles to radians
-        angles_rad = [np.radians(angle) for angle in angles]
-        
-        # Calculate GLCM
-        glcm = graycomatrix(gray, 
-                           distances=distances, 
-                           angles=angles_rad,
-                           levels=levels, 
-                           symmetric=True, 
-                           normed=True)
-        
-        # Extract Haralick features (exact from training)
-        properties = ['contrast', 'homogeneity', 'correlation', 'energy']
-        haralick_features = []
-        
-        for prop in properties:
-            feature_values = graycoprops(glcm, prop).ravel()
-            haralick_features.extend(feature_values)
-        
-        # Extract entropy for each angle (exact from training)
-        entropy_features = []
-        for j in range(len(angles_rad)):
-            # Average GLCM across distances for angle j
-            P_avg = np.mean(glcm[:, :, :, j], axis=2)
-            entropy_val = shannon_entropy(P_avg)
-            entropy_features.append(entropy_val)
-        
-        # Combine all features
-        all_features = np.concatenate([haralick_features, entropy_features])
+        # Exact training parameters: distances=[1], angles=[0,45,90,135], levels=256
+        all_features = GLCM_ENGINE.compute(gray)
         
         return all_features
     except Exception as e:
@@ -141,25 +109,14 @@ def extract_glcm_features_exact(image):
 def extract_lbp_features_exact(image):
     """Extract LBP features with exact training parameters"""
     try:
-        from skimage.feature import local_binary_pattern
-        
         # Convert to grayscale
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         else:
             gray = image
         
-        # Exact training parameters from LBPFeatureExtractor
-        P = 8  # Default from training
-        R = 1.0  # Default from training
-        method = 'uniform'  # Default from training
-        bins = P + 2  # Default from training (10 for uniform method)
-        
-        # Calculate LBP
-        lbp = local_binary_pattern(gray, P, R, method=method)
-        
-        # Calculate histogram (exact from training)
-        hist, _ = np.histogram(lbp.ravel(), bins=bins, range=(0, bins), density=True)
+        # Exact training parameters: P=8, R=1, uniform (10 bins)
+        hist = LBP_ENGINE.compute_histogram(gray)
         
         return hist.astype(np.float32)
     except Exception as e:
@@ -191,9 +148,8 @@ def extract_hsv_features_exact(image):
 def detect_faces(image):
     """Detect faces in image"""
     try:
-        # Load Haar cascade
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        face_cascade = cv2.CascadeClassifier(cascade_path)
+        # Shared Haar cascade (loaded once per thread)
+        face_cascade = get_face_cascade()
         
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Face Detector Backend Benchmark
+Compares Haar cascade and YuNet (cv2.FaceDetectorYN) throughput and recall on recorded videos
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import cv2
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+src_dir = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from src.ml.face_detector import FaceDetectorFactory
+
+
+def read_video_frames(video_path, max_frames=200):
+    """Read up to max_frames evenly spaced frames from a video"""
+    frames = []
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"❌ Could not open video file: {video_path}")
+        return frames
+
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = max(1, total_frames // max_frames) if total_frames > 0 else 1
+    index = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % step == 0:
+            frames.append(frame)
+        index += 1
+
+    cap.release()
+    print(f"📹 {video_path}: {len(frames)} frames")
+    return frames
+
+
+def benchmark_detector(detector, frames):
+    """Time detect_largest_face on every frame and record which frames had a face"""
+    detector.detect_largest_face(frames[0])  # warm-up
+
+    latencies = []
+    hits = []
+    for frame in frames:
+        detection_frame = frame if not detector.accepts_grayscale else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        start_time = time.perf_counter()
+        face = detector.detect_largest_face(detection_frame)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        hits.append(face is not None)
+
+    return {
+        'avg_latency_ms': float(np.mean(latencies)),
+        'p95_latency_ms': float(np.percentile(latencies, 95)),
+        'fps': float(1000.0 / np.mean(latencies)),
+        'detection_rate': float(np.mean(hits)),
+        'hits': hits
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark face detector backends on recorded videos')
+    parser.add_argument('--videos', nargs='+', default=['performance/cropped_video_480x360.mp4'],
+                        help='Video files to benchmark')
+    parser.add_argument('--yunet-model', default='models/face_detection_yunet_2023mar.onnx',
+                        help='Local path to the YuNet ONNX model')
+    parser.add_argument('--max-frames', type=int, default=200, help='Frames per video')
+    parser.add_argument('--detection-scale', type=float, default=1.0, help='Detection downscale factor')
+    args = parser.parse_args()
+
+    print("🚀 Face Detector Backend Benchmark")
+    print("=" * 60)
+
+    frames = []
+    for video_path in args.videos:
+        if not os.path.exists(video_path):
+            print(f"⚠️ Video file not found: {video_path}")
+            continue
+        frames.extend(read_video_frames(video_path, args.max_frames))
+
+    if not frames:
+        print("❌ No frames to benchmark (run video_crop.py first or pass --videos)")
+        return 1
+
+    backends = {'haar': ('opencv', {})}
+    if os.path.exists(args.yunet_model):
+        backends['yunet'] = ('yunet', {'model_path': args.yunet_model})
+    else:
+        print(f"⚠️ YuNet model not found: {args.yunet_model} (download it from the OpenCV model zoo)")
+
+    results = {}
+    for name, (detector_type, options) in backends.items():
+        detector = FaceDetectorFactory.create_detector(
+            detector_type, detection_scale=args.detection_scale, **options
+        )
+        results[name] = benchmark_detector(detector, frames)
+
+    # No ground-truth boxes: frames where any backend found a face serve as the reference set
+    any_hit = np.any([result['hits'] for result in results.values()], axis=0)
+    for name, result in results.items():
+        hits = np.array(result.pop('hits'))
+        result['relative_recall'] = float(hits[any_hit].mean()) if any_hit.any() else 0.0
+        print(f"⏱️ {name:6s}: {result['avg_latency_ms']:.1f} ms avg, {result['p95_latency_ms']:.1f} ms p95, "
+              f"{result['fps']:.1f} FPS | detection rate {result['detection_rate']:.1%}, "
+              f"relative recall {result['relative_recall']:.1%}")
+
+    performance_dir = Path("performance")
+    performance_dir.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = performance_dir / f"face_detector_benchmark_{timestamp}.json"
+    with open(output_file, 'w') as f:
+        json.dump({
+            'timestamp': timestamp,
+            'videos': args.videos,
+            'frames': len(frames),
+            'detection_scale': args.detection_scale,
+            'results': results
+        }, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
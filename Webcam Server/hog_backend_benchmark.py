@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+HOG Backend Benchmark
+Compares the cv2 fast path against the skimage training reference (latency and parity)
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add src directory to Python path
+src_dir = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from src.ml.hog_engine import HOGEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HOG backends (cv2 vs skimage)')
+    parser.add_argument('--iterations', type=int, default=50, help='Iterations per backend')
+    parser.add_argument('--tolerance', type=float, default=1e-4, help='Parity tolerance for the cv2 backend')
+    parser.add_argument('--save', action='store_true', help='Save results to performance/')
+    args = parser.parse_args()
+
+    print("🚀 HOG Backend Benchmark")
+    print("=" * 60)
+
+    engine = HOGEngine(image_size=(256, 256), backend='auto', parity_tolerance=args.tolerance)
+    parity = engine.parity_report
+    timings = engine.benchmark(iterations=args.iterations)
+
+    print(f"📐 Feature dimensions: {engine.feature_dimensions}")
+    print(f"🔍 Parity vs skimage: max diff {parity['max_abs_diff']:.6f}, "
+          f"min correlation {parity['min_correlation']:.4f}, tolerance {parity['tolerance']}")
+    print(f"{'✅' if parity['passed'] else '❌'} Parity check {'passed' if parity['passed'] else 'failed'}")
+    print(f"⚙️ Selected backend: {engine.backend}")
+    print()
+    for backend in ('skimage', 'cv2'):
+        print(f"⏱️ {backend:8s}: {timings[backend]['avg_latency_ms']:.2f} ms avg, "
+              f"{timings[backend]['min_latency_ms']:.2f} ms min")
+    print(f"⚡ cv2 speedup: {timings['speedup']['cv2_vs_skimage']:.1f}x")
+
+    if args.save:
+        performance_dir = Path("performance")
+        performance_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = performance_dir / f"hog_backend_benchmark_{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump({
+                'timestamp': timestamp,
+                'feature_dimensions': engine.feature_dimensions,
+                'selected_backend': engine.backend,
+                'parity': parity,
+                'timings': timings
+            }, f, indent=2)
+        print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,14 @@ import struct
 import threading
 import time
 import math
-import pickle
 import numpy as np
 import json
 from pathlib import Path
-from skimage.feature import hog, graycomatrix, graycoprops, local_binary_pattern
+from src.ml.glcm_engine import GLCMEngine
+from src.ml.lbp_engine import LBPEngine
+from src.ml.hog_engine import HOGEngine
+from src.ml.cascade_registry import get_face_cascade
+from src.ml.model_store import ModelStore
 
 # Import the logger system
 try:
@@ -27,10 +30,18 @@ except ImportError:
     logger = logging.getLogger('ml_server')
 
 class MLEthnicityDetector:
-    def __init__(self, models_dir="models/run_20250925_133309"):
+    def __init__(self, models_dir="models/run_20250925_133309", hog_backend='skimage'):
         self.models_dir = Path(models_dir)
-        self.models = {}
+        # Models are registered at startup and read on first MODEL_SELECT or prediction
+        self.models = ModelStore(mmap_mode='r', lazy_loading=True)
         self.feature_extractors = {}
+        # EXACT training parameters: distances=[1], angles=[0,45,90,135], levels=256
+        self.glcm_engine = GLCMEngine(distances=[1], angles=[0, 45, 90, 135], levels=256)
+        # EXACT training parameters: P=8, R=1, uniform (10 bins)
+        self.lbp_engine = LBPEngine(n_points=8, radius=1.0)
+        # EXACT training parameters: 256x256, 9 bins, (8,8) cell, (2,2) block, L2-Hys
+        # skimage reference by default; 'auto' only uses cv2 if it passes the parity check
+        self.hog_engine = HOGEngine(image_size=(256, 256), backend=hog_backend)
         self.load_models()
         
     def load_models(self):
@@ -50,11 +61,10 @@ class MLEthnicityDetector:
         
         for model_name, filename in model_files.items():
             model_path = self.models_dir / filename
-            if model_path.exists():
+            if model_path.exists() or model_path.with_suffix('.joblib').exists():
                 try:
-                    with open(model_path, 'rb') as f:
-                        self.models[model_name] = pickle.load(f)
-                    logger.info(f"✅ Loaded {model_name} model")
+                    self.models.register(model_name, model_path)
+                    logger.info(f"✅ Registered {model_name} model")
                 except Exception as e:
                     logger.error(f"❌ Failed to load {model_name}: {e}")
             else:
@@ -63,6 +73,40 @@ class MLEthnicityDetector:
         # Load feature configuration if available
         self.load_feature_config()
         
+        # Verify feature layout against what each model was trained on
+        self.verify_model_dimensions()
+        
+    def get_expected_feature_dimensions(self, model_name):
+        """Feature count produced by the extractors for a model (GLCM, LBP, HOG, HSV order)"""
+        dimensions = {
+            'glcm': self.glcm_engine.feature_dimensions,
+            'lbp': self.lbp_engine.bins,
+            'hog': self.hog_engine.feature_dimensions,
+            'hsv': 32
+        }
+        return sum(dimensions[feature] for feature in model_name.split('_'))
+    
+    def verify_model_dimensions(self):
+        """Check every loaded model's n_features_in_ against the extractor output"""
+        results = {}
+        for model_name in list(self.models):
+            expected = self.get_expected_feature_dimensions(model_name)
+            # Converted models carry n_features in their manifest, so they are not loaded here
+            metadata = self.models.get_metadata(model_name)
+            if 'n_features' in metadata and not self.models.is_loaded(model_name):
+                actual = metadata['n_features']
+            else:
+                actual = getattr(self.models[model_name], 'n_features_in_', None)
+            results[model_name] = {'expected': expected, 'model': actual, 'match': actual in (None, expected)}
+            if actual is not None and actual != expected:
+                logger.error(f"❌ {model_name}: model expects {actual} features, extractors produce {expected} - disabling model")
+                del self.models[model_name]
+            else:
+                logger.info(f"✅ {model_name}: feature dimensions verified ({expected})")
+        
+        logger.info(f"🔍 HOG backend: {self.hog_engine.backend} (parity: {self.hog_engine.parity_report})")
+        return results
+    
     def load_feature_config(self):
         """Load feature extraction configuration"""
         config_file = self.models_dir / "feature_sets_summary_20250925_133309.json"
@@ -88,22 +132,8 @@ class MLEthnicityDetector:
         else:
             gray = resized
         
-        # EXACT training parameters from exact_training_benchmark.py
-        features = hog(gray, 
-                      orientations=9,
-                      pixels_per_cell=(8, 8),
-                      cells_per_block=(2, 2),
-                      block_norm='L2-Hys',
-                      feature_vector=True,
-                      channel_axis=None)
-        
-        return features.astype(np.float32)
-    
-    def shannon_entropy(self, P):
-        """Calculate Shannon entropy"""
-        # Remove zeros to avoid log(0)
-        P = P[P > 0]
-        return -np.sum(P * np.log2(P))
+        # Unified HOG engine (skimage reference layout, verified cv2 fast path)
+        return self.hog_engine.compute(gray)
     
     def extract_glcm_features(self, image):
         """Extract GLCM features with EXACT training parameters (20 features: 4 props×4 angles + 4 entropy)"""
@@ -117,40 +147,8 @@ class MLEthnicityDetector:
         if gray.shape[0] > 256 or gray.shape[1] > 256:
             gray = cv2.resize(gray, (256, 256))
         
-        # EXACT training parameters from exact_training_benchmark.py
-        distances = [1]  # NOT [1,2,3]!
-        angles = [0, 45, 90, 135]  # in degrees
-        levels = 256
-        
-        # Convert angles to radians
-        angles_rad = [np.radians(angle) for angle in angles]
-        
-        # Calculate GLCM
-        glcm = graycomatrix(gray, 
-                           distances=distances, 
-                           angles=angles_rad,
-                           levels=levels, 
-                           symmetric=True, 
-                           normed=True)
-        
-        # Extract Haralick features (exact from training)
-        properties = ['contrast', 'homogeneity', 'correlation', 'energy']
-        haralick_features = []
-        
-        for prop in properties:
-            feature_values = graycoprops(glcm, prop).ravel()
-            haralick_features.extend(feature_values)
-        
-        # Extract entropy for each angle (exact from training)
-        entropy_features = []
-        for j in range(len(angles_rad)):
-            # Average GLCM across distances for angle j
-            P_avg = np.mean(glcm[:, :, :, j], axis=2)
-            entropy_val = self.shannon_entropy(P_avg)
-            entropy_features.append(entropy_val)
-        
-        # Combine all features (16 Haralick + 4 entropy = 20)
-        all_features = np.concatenate([haralick_features, entropy_features])
+        # Vectorized GLCM engine (bit-exact with skimage graycomatrix/graycoprops)
+        all_features = self.glcm_engine.compute(gray)
         
         return all_features.astype(np.float32)
     
@@ -165,17 +163,8 @@ class MLEthnicityDetector:
         # Resize to 256x256 - CRITICAL: must match training!
         gray = cv2.resize(gray, (256, 256))
         
-        # EXACT training parameters from exact_training_benchmark.py
-        P = 8  # Number of points
-        R = 1.0  # Radius
-        method = 'uniform'
-        bins = P + 2  # 10 bins for uniform method (NOT 256!)
-        
-        # Calculate LBP
-        lbp = local_binary_pattern(gray, P, R, method=method)
-        
-        # Calculate histogram (exact from training)
-        hist, _ = np.histogram(lbp.ravel(), bins=bins, range=(0, bins), density=True)
+        # Vectorized uniform LBP (bit-exact with skimage local_binary_pattern + np.histogram)
+        hist = self.lbp_engine.compute_histogram(gray)
         
         return hist.astype(np.float32)
     
@@ -202,7 +191,8 @@ class MLEthnicityDetector:
     
     def detect_face(self, image):
         """Detect face in image using OpenCV"""
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Warm per-thread cascade (parsed once, not on every detection)
+        face_cascade = get_face_cascade()
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         faces = face_cascade.detectMultiScale(gray, 1.1, 4)
         
@@ -213,16 +203,8 @@ class MLEthnicityDetector:
             return image[y:y+h, x:x+w], (x, y, w, h)
         return None, None
     
-    def predict_ethnicity(self, image, model_name='glcm_lbp_hog_hsv'):
-        """Predict ethnicity using specified model"""
-        if model_name not in self.models:
-            return None, 0.0
-        
-        # Detect face first
-        face_image, face_coords = self.detect_face(image)
-        if face_image is None:
-            return None, 0.0
-        
+    def extract_model_features(self, face_image, model_name):
+        """Extract the feature list a model expects (GLCM, LBP, HOG, HSV order), or None for unknown models"""
         # Extract features based on model (only extract what the model expects)
         features = []
         
@@ -246,6 +228,51 @@ class MLEthnicityDetector:
             features.extend(self.extract_hsv_features(face_image))
         else:
             print(f"⚠️ Unknown model: {model_name}")
+            return None
+        
+        return features
+    
+    def warm_up(self, model_name):
+        """Load the model and run cascade, extractors and predict_proba once on synthetic input"""
+        timings = {}
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        face_image = rng.integers(0, 256, (128, 128, 3), dtype=np.uint8)
+        
+        start_time = time.perf_counter()
+        self.detect_face(frame)
+        timings['face_detector'] = (time.perf_counter() - start_time) * 1000
+        
+        try:
+            start_time = time.perf_counter()
+            model = self.models[model_name]
+            timings['model_load'] = (time.perf_counter() - start_time) * 1000
+            
+            start_time = time.perf_counter()
+            features = np.array(self.extract_model_features(face_image, model_name)).reshape(1, -1)
+            timings['features'] = (time.perf_counter() - start_time) * 1000
+            
+            start_time = time.perf_counter()
+            model.predict_proba(features)
+            timings['predict'] = (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            logger.warning(f"⚠️ Warm-up of {model_name} failed: {e}")
+        
+        logger.info(f"🔥 Warm-up for {model_name}: " + ", ".join(f"{name} {ms:.0f}ms" for name, ms in timings.items()))
+        return timings
+    
+    def predict_ethnicity(self, image, model_name='glcm_lbp_hog_hsv'):
+        """Predict ethnicity using specified model"""
+        if model_name not in self.models:
+            return None, 0.0
+        
+        # Detect face first
+        face_image, face_coords = self.detect_face(image)
+        if face_image is None:
+            return None, 0.0
+        
+        features = self.extract_model_features(face_image, model_name)
+        if features is None:
             return None, 0.0
         
         features = np.array(features).reshape(1, -1)
@@ -256,8 +283,11 @@ class MLEthnicityDetector:
         # Make prediction
         try:
             model = self.models[model_name]
-            prediction = model.predict(features)[0]
-            confidence = model.predict_proba(features).max()
+            # Single predict_proba pass: label is the argmax class
+            probabilities = model.predict_proba(features)[0]
+            best_index = int(np.argmax(probabilities))
+            prediction = model.classes_[best_index]
+            confidence = probabilities[best_index]
             
             # Map prediction to ethnicity names (5 classes: Banjar, Bugis, Javanese, Malay, Sundanese)
             # Mapping: Javanese/Sundanese/Malay → Jawa, Banjar → Sasak, Bugis → Papua
@@ -302,7 +332,9 @@ class MLWebcamServer:
         models_dir = self.config.get('ml', {}).get('models_dir', 'models/run_20250925_133309')
         models_path = Path(__file__).parent / models_dir
         logger.info(f"🔍 Looking for models in: {models_path}")
-        self.ml_detector = MLEthnicityDetector(str(models_path))
+        self.ml_detector = MLEthnicityDetector(
+            str(models_path), hog_backend=self.config.get('ml', {}).get('hog_backend', 'skimage')
+        )
         
         # Use config default model or fallback
         self.current_model = self.config.get('ml', {}).get('default_model', 'hsv')
@@ -311,6 +343,10 @@ class MLWebcamServer:
         # Log ML status
         self.log_ml_status()
         
+        # First visitor should not pay for model loading and first-call setup
+        if self.detection_mode == "ML" and self.config.get('ml', {}).get('warm_up', {}).get('enabled', True):
+            self.ml_detector.warm_up(self.current_model)
+        
         # Load server settings from config
         self.detection_interval = self.config.get('server', {}).get('detection_interval', 30)
         self.max_packet_size = self.config.get('performance', {}).get('max_packet_size', 32768)
@@ -671,10 +707,18 @@ class MLWebcamServer:
     def select_model(self, model_name, addr):
         """Select ML model for detection"""
         if model_name in self.ml_detector.models:
+            # First selection loads the model so the next prediction does not pay for it
+            try:
+                self.ml_detector.models[model_name]
+            except Exception as e:
+                response = f"MODEL_ERROR:Model {model_name} failed to load"
+                self.server_socket.sendto(response.encode('utf-8'), addr)
+                logger.error(f"❌ Failed to load {model_name}: {e}")
+                return
             self.current_model = model_name
             response = f"MODEL_SELECTED:{model_name}"
             self.server_socket.sendto(response.encode('utf-8'), addr)
-            print(f"🧠 Model changed to: {model_name}")
+            print(f"🧠 Model changed to: {model_name} ({self.ml_detector.models.get_stats()[model_name]})")
         else:
             response = f"MODEL_ERROR:Model {model_name} not found"
             self.server_socket.sendto(response.encode('utf-8'), addr)
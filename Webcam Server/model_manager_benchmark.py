@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Model Manager Benchmark
+Compares pickle (sklearn), compiled tree and ONNX Runtime inference for latency and output agreement
+"""
+
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+src_dir = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from src.core.config_manager import ConfigManager
+from src.ml.model_manager import ModelManagerFactory
+
+
+def time_predictions(manager, model_name, samples, batch_size):
+    """Single-sample and batch predict_distribution latency in milliseconds"""
+    manager.predict_distribution(model_name, samples[:1])  # warm-up (conversion/compilation)
+
+    latencies = []
+    for row in samples:
+        start_time = time.perf_counter()
+        manager.predict_distribution(model_name, row.reshape(1, -1))
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    start_time = time.perf_counter()
+    manager.predict_distribution(model_name, samples[:batch_size])
+    batch_latency = (time.perf_counter() - start_time) * 1000
+
+    return {
+        'avg_latency_ms': float(np.mean(latencies)),
+        'p95_latency_ms': float(np.percentile(latencies, 95)),
+        'batch_latency_ms': batch_latency
+    }
+
+
+def compare_outputs(reference, candidate):
+    """Label agreement and maximum probability difference between two result lists"""
+    labels = [r['ethnicity'] == c['ethnicity'] for r, c in zip(reference, candidate)]
+    max_diff = max(
+        abs(r['probabilities'].get(name, 0.0) - c['probabilities'].get(name, 0.0))
+        for r, c in zip(reference, candidate) for name in r['probabilities']
+    ) if reference and reference[0]['probabilities'] else 0.0
+    return {'label_agreement': float(np.mean(labels)) if labels else 0.0, 'max_prob_diff': float(max_diff)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark model managers on the configured models')
+    parser.add_argument('--models', nargs='+', default=None, help='Models to benchmark (defaults to all available)')
+    parser.add_argument('--managers', nargs='+', default=['pickle', 'compiled_tree', 'onnx'], help='Manager types')
+    parser.add_argument('--samples', type=int, default=200, help='Random feature rows per model')
+    parser.add_argument('--batch-size', type=int, default=64, help='Rows in the batch timing')
+    args = parser.parse_args()
+
+    print("🚀 Model Manager Benchmark")
+    print("=" * 60)
+
+    config_manager = ConfigManager()
+    managers = {}
+    for manager_type in args.managers:
+        try:
+            manager = ModelManagerFactory.create_manager(manager_type, config_manager=config_manager)
+            manager.load_models()
+            managers[manager_type] = manager
+        except ImportError as e:
+            print(f"⚠️ Skipping {manager_type}: {e}")
+
+    if 'pickle' not in managers:
+        print("❌ The pickle manager is required as the reference")
+        return 1
+
+    reference = managers['pickle']
+    model_names = args.models or reference.get_available_models()
+    if not model_names:
+        print(f"❌ No models found in {config_manager.get_models_dir()}")
+        return 1
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for model_name in model_names:
+        n_features = reference.get_model_info(model_name).get('n_features')
+        if n_features is None:
+            print(f"⚠️ Skipping {model_name}: unknown feature count")
+            continue
+
+        # Feature scale matters less than coverage: random rows exercise many split paths
+        samples = rng.random((args.samples, n_features)).astype(np.float32)
+        reference_outputs = reference.predict_distribution(model_name, samples)
+
+        results[model_name] = {}
+        for manager_type, manager in managers.items():
+            timing = time_predictions(manager, model_name, samples, args.batch_size)
+            agreement = compare_outputs(reference_outputs, manager.predict_distribution(model_name, samples))
+            results[model_name][manager_type] = {**timing, **agreement}
+            print(f"⏱️ {model_name:18s} {manager_type:14s}: {timing['avg_latency_ms']:7.2f} ms avg, "
+                  f"{timing['p95_latency_ms']:7.2f} ms p95, batch {timing['batch_latency_ms']:7.2f} ms | "
+                  f"labels {agreement['label_agreement']:.1%}, max prob diff {agreement['max_prob_diff']:.2e}")
+
+    performance_dir = Path("performance")
+    performance_dir.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = performance_dir / f"model_manager_benchmark_{timestamp}.json"
+    with open(output_file, 'w') as f:
+        json.dump({
+            'timestamp': timestamp,
+            'samples': args.samples,
+            'batch_size': args.batch_size,
+            'managers': list(managers),
+            'results': results
+        }, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
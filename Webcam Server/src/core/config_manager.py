@@ -49,11 +49,86 @@ class ConfigManager:
                 "frame_height": 360,
                 "target_fps": 15,
                 "jpeg_quality": 40,
-                "detection_interval": 30
+                "detection_interval": 30,
+                "detection_mode": "process",
+                "detection_request_workers": 4,
+                "keep_alive_interval": 90
             },
             "ml": {
                 "models_dir": "models/run_20250925_133309",
                 "default_model": "glcm_lbp_hog_hsv",
+                "manager": "pickle",
+                "hog_backend": "skimage",
+                "hog_parity_tolerance": 0.0001,
+                "face_detection": {
+                    "backend": "opencv",
+                    "yunet_model": "models/face_detection_yunet_2023mar.onnx",
+                    "score_threshold": 0.7,
+                    "detection_scale": 0.5,
+                    "min_face_size": 30,
+                    "tracking": {
+                        "enabled": True,
+                        "full_scan_interval": 10,
+                        "roi_expansion": 0.5,
+                        "size_tolerance": 0.3
+                    }
+                },
+                "feature_cache": {
+                    "enabled": True,
+                    "max_entries": 32,
+                    "similarity_threshold": 6,
+                    "ttl_seconds": 5.0
+                },
+                "quality_gate": {
+                    "enabled": True,
+                    "min_face_size": 64,
+                    "min_sharpness": 25.0,
+                    "min_brightness": 40,
+                    "max_brightness": 220
+                },
+                "parallel_extraction": {
+                    "enabled": False,
+                    "max_workers": 4,
+                    "latency_budget_ms": 250
+                },
+                "onnx": {
+                    "intra_op_threads": 1
+                },
+                "warm_up": {
+                    "enabled": True
+                },
+                "inference_queue": {
+                    "enabled": False,
+                    "max_batch_size": 16,
+                    "max_wait_ms": 5.0
+                },
+                "hot_reload": {
+                    "enabled": True,
+                    "watch": True,
+                    "poll_interval": 5.0
+                },
+                "cascade": {
+                    "description": "cheap_model must pass the feature dimension check; the HSV extractor produces 120 features while the trained HSV model expects 32, so an inactive cascade is reported at startup until a matching cheap model is trained",
+                    "enabled": False,
+                    "cheap_model": "hsv",
+                    "confidence_threshold": 0.9
+                },
+                "temporal_aggregation": {
+                    "enabled": True,
+                    "method": "decay",
+                    "decay": 0.6,
+                    "window": 5,
+                    "margin": 0.25,
+                    "convergence_count": 3,
+                    "face_change_threshold": 20,
+                    "session_timeout": 15.0
+                },
+                "model_store": {
+                    "lazy_loading": True,
+                    "mmap_mode": "r",
+                    "max_resident_models": 2,
+                    "max_resident_mb": 0
+                },
                 "available_models": [
                     {
                         "name": "glcm_hog",
@@ -4,12 +4,22 @@ ML Ethnicity Detector Implementation
 Following SOLID principles with dependency injection and composition
 """
 
+import cv2
 import numpy as np
 import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, Dict, Any, List
 from .face_detector import IFaceDetector, FaceDetectorFactory
 from .feature_extractors import IFeatureExtractor, FeatureExtractorFactory
+from .preprocessing import FacePreprocessingContext
+from .extraction_plan import FeatureExtractionPlan, build_extraction_plan
+from .feature_cache import FeatureCache, compute_face_hash
+from .quality_gate import FaceQualityGate
 from .model_manager import IModelManager, ModelManagerFactory
+from .inference_queue import InferenceQueue
+from .model_reloader import ModelReloader
+from .temporal_aggregator import TemporalAggregator
 from ..core.logger import logger
 from ..core.config_manager import ConfigManager
 
@@ -25,18 +35,65 @@ class MLEthnicityDetector:
         face_detector: IFaceDetector,
         feature_extractors: Dict[str, IFeatureExtractor],
         model_manager: IModelManager,
-        config_manager: ConfigManager
+        config_manager: ConfigManager,
+        feature_cache: Optional[FeatureCache] = None,
+        extraction_workers: int = 0,
+        extraction_budget_ms: Optional[float] = None,
+        quality_gate: Optional[FaceQualityGate] = None,
+        cascade_model: Optional[str] = None,
+        cascade_threshold: float = 0.9,
+        temporal_aggregator: Optional[TemporalAggregator] = None
     ):
         self.face_detector = face_detector
         self.feature_extractors = feature_extractors
         self.model_manager = model_manager
+        self.quality_gate = quality_gate
         self.config_manager = config_manager
+        self.feature_cache = feature_cache
         self.models_dir = config_manager.get_models_dir()
         
         # Performance tracking
         self.detection_count = 0
         self.total_detection_time = 0.0
         self.last_detection_result: Optional[Tuple[str, float]] = None
+        self.last_probabilities: Dict[str, float] = {}
+        
+        # Compiled per-model feature layouts (built on first use)
+        self.extraction_plans: Dict[str, FeatureExtractionPlan] = {}
+        
+        # Optional concurrent extractor execution (OpenCV/skimage kernels release the GIL)
+        self.extraction_executor: Optional[ThreadPoolExecutor] = None
+        self.extraction_budget = extraction_budget_ms / 1000.0 if extraction_budget_ms else None
+        if extraction_workers > 1:
+            self.extraction_executor = ThreadPoolExecutor(
+                max_workers=extraction_workers, thread_name_prefix="feature-extractor"
+            )
+            logger.info(f"Concurrent feature extraction enabled: {extraction_workers} workers, budget {extraction_budget_ms}ms")
+        
+        # Models whose n_features_in_ does not match the extractor output
+        self.dimension_report: Dict[str, Dict[str, Any]] = {}
+        self.invalid_models: set = set()
+        # Lazily registered models without manifest info, checked when first used
+        self.unverified_models: set = set()
+        
+        # Per-component warm-up timings in milliseconds (empty until warm_up runs)
+        self.warm_up_report: Dict[str, float] = {}
+        
+        # Background hot reload of the model set (see create_default_detector)
+        self.model_reloader: Optional[ModelReloader] = None
+        
+        # Confidence cascade: cheap model first, requested model only when it is unsure
+        self.cascade_model = cascade_model
+        self.cascade_threshold = cascade_threshold
+        self.cascade_detections = 0
+        self.cascade_escalations = 0
+        self.cascade_accepted_time = 0.0
+        self.cascade_escalated_time = 0.0
+        if cascade_model:
+            logger.info(f"Confidence cascade enabled: {cascade_model} first, escalating below {cascade_threshold:.2f}")
+        
+        # Optional smoothing of single-face results over a face session
+        self.temporal_aggregator = temporal_aggregator
         
         logger.info("ML Ethnicity Detector initialized")
     
@@ -49,21 +106,367 @@ class MLEthnicityDetector:
         if config_manager is None:
             config_manager = ConfigManager()
         
-        # Create face detector
-        face_detector = FaceDetectorFactory.create_detector("opencv")
+        ml_config = config_manager.get_ml_config()
+        
+        # Create face detector (backend and detection scale from config)
+        face_detector = cls._create_face_detector(ml_config.get('face_detection', {}))
         
-        # Create feature extractors
+        # Create feature extractors ('auto'/'cv2' HOG backends are verified against the skimage reference)
         feature_extractors = FeatureExtractorFactory.create_combined_extractor(
-            ['hog', 'glcm', 'lbp', 'hsv']
+            ['glcm', 'lbp', 'hsv']
+        )
+        feature_extractors['hog'] = FeatureExtractorFactory.create_extractor(
+            'hog',
+            backend=ml_config.get('hog_backend', 'skimage'),
+            parity_tolerance=ml_config.get('hog_parity_tolerance', 1e-4)
         )
         
-        # Create model manager with config
-        model_manager = ModelManagerFactory.create_manager("pickle", config_manager=config_manager)
+        # Create model manager with config ("pickle" by default; "compiled_tree" and "onnx" are opt-in)
+        model_manager = cls._create_model_manager(ml_config, config_manager)
+        
+        # Micro-batch predictions from concurrent callers into one model call; only pays off with
+        # several callers (inline detection_mode answering DETECTION_REQUESTs), so it is opt-in
+        queue_config = ml_config.get('inference_queue', {})
+        if queue_config.get('enabled', False):
+            model_manager = InferenceQueue(
+                model_manager,
+                max_batch_size=queue_config.get('max_batch_size', 16),
+                max_wait_ms=queue_config.get('max_wait_ms', 5.0)
+            )
+            model_manager.start()
         
         # Load models using config
         model_manager.load_models()
         
-        return cls(face_detector, feature_extractors, model_manager, config_manager)
+        # Feature cache for consecutive detections of the same face
+        cache_config = ml_config.get('feature_cache', {})
+        feature_cache = None
+        if cache_config.get('enabled', True):
+            feature_cache = FeatureCache(
+                max_entries=cache_config.get('max_entries', 32),
+                similarity_threshold=cache_config.get('similarity_threshold', 6),
+                ttl_seconds=cache_config.get('ttl_seconds', 5.0)
+            )
+        
+        # Face-crop quality gate (size, exposure, blur) ahead of feature extraction
+        gate_config = ml_config.get('quality_gate', {})
+        quality_gate = None
+        if gate_config.get('enabled', True):
+            quality_gate = FaceQualityGate(
+                min_face_size=gate_config.get('min_face_size', 64),
+                min_sharpness=gate_config.get('min_sharpness', 25.0),
+                min_brightness=gate_config.get('min_brightness', 40.0),
+                max_brightness=gate_config.get('max_brightness', 220.0)
+            )
+        
+        # Optional thread-pool execution of the extractor set
+        parallel_config = ml_config.get('parallel_extraction', {})
+        extraction_workers = parallel_config.get('max_workers', 4) if parallel_config.get('enabled', False) else 0
+        
+        # Optional confidence cascade (cheap model first, escalate on low confidence)
+        cascade_config = ml_config.get('cascade', {})
+        
+        # Optional temporal aggregation with convergence detection
+        aggregation_config = ml_config.get('temporal_aggregation', {})
+        temporal_aggregator = None
+        if aggregation_config.get('enabled', False):
+            temporal_aggregator = TemporalAggregator(
+                method=aggregation_config.get('method', 'decay'),
+                decay=aggregation_config.get('decay', 0.6),
+                window=aggregation_config.get('window', 5),
+                margin=aggregation_config.get('margin', 0.25),
+                convergence_count=aggregation_config.get('convergence_count', 3),
+                face_change_threshold=aggregation_config.get('face_change_threshold', 20),
+                session_timeout=aggregation_config.get('session_timeout', 15.0)
+            )
+        
+        detector = cls(
+            face_detector, feature_extractors, model_manager, config_manager, feature_cache,
+            extraction_workers=extraction_workers,
+            extraction_budget_ms=parallel_config.get('latency_budget_ms'),
+            quality_gate=quality_gate,
+            cascade_model=cascade_config.get('cheap_model', 'hsv') if cascade_config.get('enabled', False) else None,
+            cascade_threshold=cascade_config.get('confidence_threshold', 0.9),
+            temporal_aggregator=temporal_aggregator
+        )
+        detector.verify_model_dimensions()
+        
+        # Pay first-call costs before the server reports ready, not on the first visitor
+        if ml_config.get('warm_up', {}).get('enabled', True):
+            detector.warm_up()
+        detector.check_cascade_model()
+        
+        # Swap in retrained models without a restart (directory watch or RELOAD_MODELS)
+        reload_config = ml_config.get('hot_reload', {})
+        if reload_config.get('enabled', False):
+            detector.model_reloader = ModelReloader(
+                detector,
+                detector.models_dir,
+                poll_interval=reload_config.get('poll_interval', 5.0),
+                watch=reload_config.get('watch', True)
+            )
+            detector.model_reloader.start()
+        
+        return detector
+    
+    @staticmethod
+    def _create_model_manager(ml_config: Dict[str, Any], config_manager: ConfigManager) -> IModelManager:
+        """Create the configured model manager, falling back to pickle if its dependencies are missing"""
+        manager_type = ml_config.get('manager', 'pickle')
+        options = {}
+        if manager_type == 'onnx':
+            options['intra_op_threads'] = ml_config.get('onnx', {}).get('intra_op_threads', 1)
+        
+        try:
+            return ModelManagerFactory.create_manager(manager_type, config_manager=config_manager, **options)
+        except ImportError as e:
+            logger.warning(f"{manager_type} model manager unavailable ({e}), falling back to pickle")
+            return ModelManagerFactory.create_manager("pickle", config_manager=config_manager)
+    
+    @staticmethod
+    def _create_face_detector(face_detection_config: Dict[str, Any]) -> IFaceDetector:
+        """Create the configured face detector backend ('opencv' Haar cascade or 'yunet' CNN)"""
+        detector_options = {
+            'detection_scale': face_detection_config.get('detection_scale', 1.0),
+            'min_face_size': face_detection_config.get('min_face_size', 30)
+        }
+        
+        backend = face_detection_config.get('backend', 'opencv')
+        if backend == 'yunet':
+            try:
+                return FaceDetectorFactory.create_detector(
+                    "yunet",
+                    model_path=face_detection_config.get('yunet_model', 'models/face_detection_yunet_2023mar.onnx'),
+                    score_threshold=face_detection_config.get('score_threshold', 0.7),
+                    **detector_options
+                )
+            except ValueError as e:
+                logger.warning(f"YuNet face detector unavailable ({e}), falling back to Haar cascade")
+        
+        tracking_config = face_detection_config.get('tracking', {})
+        if tracking_config.get('enabled', False):
+            # ROI-tracked detection between periodic full-frame scans
+            return FaceDetectorFactory.create_detector(
+                "opencv_tracking",
+                full_scan_interval=tracking_config.get('full_scan_interval', 10),
+                roi_expansion=tracking_config.get('roi_expansion', 0.5),
+                size_tolerance=tracking_config.get('size_tolerance', 0.3),
+                **detector_options
+            )
+        
+        return FaceDetectorFactory.create_detector("opencv", **detector_options)
+    
+    def get_extraction_plan(self, model_name: str) -> FeatureExtractionPlan:
+        """Get (or build) the extraction plan for a model from its config `features` list"""
+        plan = self.extraction_plans.get(model_name)
+        if plan is None:
+            plan = build_extraction_plan(
+                model_name, self.feature_extractors, self.config_manager.get_model_info(model_name)
+            )
+            self.extraction_plans[model_name] = plan
+            logger.info(f"Extraction plan for {model_name}: {plan.get_layout()} ({plan.total_dimensions} features)")
+        return plan
+    
+    def get_expected_feature_dimensions(self, model_name: str) -> int:
+        """Number of features the extractors produce for a model's configured feature set"""
+        return self.get_extraction_plan(model_name).total_dimensions
+    
+    def verify_model_dimensions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Check each model's n_features_in_ against the extractor output
+        
+        Models with a mismatching layout are rejected by predict_ethnicity
+        instead of being fed features they were not trained on. Models that
+        are loaded or described by the conversion manifest are checked now;
+        lazily registered models without manifest info are checked when they
+        are first used, so the check never loads a model ahead of time.
+        """
+        self.dimension_report = {}
+        self.invalid_models = set()
+        self.unverified_models = set()
+        
+        for model_name in self.model_manager.get_available_models():
+            self._verify_model(model_name, load=False)
+        
+        if 'hog' in self.feature_extractors and hasattr(self.feature_extractors['hog'], 'engine'):
+            hog_engine = self.feature_extractors['hog'].engine
+            logger.info(f"HOG backend: {hog_engine.backend}, parity: {hog_engine.parity_report}")
+        
+        return self.dimension_report
+    
+    def _verify_model(self, model_name: str, load: bool = True) -> bool:
+        """
+        Check one model's feature dimensions
+        
+        Args:
+            model_name: Model to check
+            load: Load the model if nothing else tells its feature count
+            
+        Returns:
+            False if the model is rejected
+        """
+        try:
+            expected = self.get_expected_feature_dimensions(model_name)
+        except ValueError as e:
+            self.invalid_models.add(model_name)
+            self.unverified_models.discard(model_name)
+            logger.error(f"Cannot build extraction plan for {model_name}: {e}")
+            return False
+        
+        info = self.model_manager.get_model_info(model_name, load=load)
+        if info.get('loaded') is False and 'n_features' not in info:
+            self.unverified_models.add(model_name)
+            self.dimension_report[model_name] = {'expected': expected, 'model': None, 'match': None}
+            logger.info(f"Feature dimensions of {model_name} will be verified when it is first loaded")
+            return True
+        
+        self.unverified_models.discard(model_name)
+        actual = info.get('n_features')
+        match = actual is None or actual == expected
+        self.dimension_report[model_name] = {'expected': expected, 'model': actual, 'match': match}
+        
+        if match:
+            logger.info(f"Feature dimensions verified for {model_name}: {expected}")
+        else:
+            self.invalid_models.add(model_name)
+            logger.error(f"Feature dimension mismatch for {model_name}: model expects {actual}, extractors produce {expected}")
+        return match
+    
+    def _model_usable(self, model_name: str) -> bool:
+        """Check a model's dimensions on first use if needed and tell if it may serve predictions"""
+        if model_name in self.unverified_models:
+            self._verify_model(model_name)
+        return model_name not in self.invalid_models
+    
+    def reload_models(self, models_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Hot-reload the model set while detections continue
+        
+        The model manager loads, warms and checks the new models, then swaps
+        them in between predictions. Models must keep the feature dimensions
+        of their extraction plans, so the extractors stay valid. After a
+        successful swap cached predictions of the old models are dropped.
+        
+        Args:
+            models_dir: Directory to load (defaults to the current models directory)
+            
+        Returns:
+            Reload report from the model manager
+        """
+        expected_features = {}
+        for model_name in self.model_manager.get_available_models():
+            if model_name in self.invalid_models:
+                continue
+            try:
+                expected_features[model_name] = self.get_expected_feature_dimensions(model_name)
+            except ValueError:
+                continue
+        
+        report = self.model_manager.reload_models(models_dir, expected_features)
+        if not report.get('success'):
+            return report
+        
+        self.models_dir = report['models_dir']
+        if self.feature_cache is not None:
+            self.feature_cache.clear()
+        
+        # Models rejected for their dimensions before may match in the new set
+        for model_name in list(self.invalid_models):
+            actual = report['models'].get(model_name, {}).get('n_features')
+            try:
+                expected = self.get_expected_feature_dimensions(model_name)
+            except ValueError:
+                continue
+            self.dimension_report[model_name] = {'expected': expected, 'model': actual, 'match': actual == expected}
+            if actual == expected:
+                self.invalid_models.discard(model_name)
+                logger.info(f"Feature dimensions verified for reloaded {model_name}: {expected}")
+        
+        # The reload checked every model it loaded against its extraction plan
+        for model_name in list(self.unverified_models):
+            actual = report['models'].get(model_name, {}).get('n_features')
+            if actual is not None:
+                self.unverified_models.discard(model_name)
+                self.dimension_report[model_name] = {'expected': expected_features.get(model_name), 'model': actual,
+                                                     'match': actual == expected_features.get(model_name)}
+        
+        return report
+    
+    def request_model_reload(self, models_dir: Optional[str] = None) -> bool:
+        """
+        Queue a background hot reload
+        
+        Returns:
+            True if the reload was queued
+        """
+        if self.model_reloader is None:
+            logger.warning("Model reload requested but hot reload is disabled")
+            return False
+        return self.model_reloader.request_reload(models_dir)
+    
+    def warm_up(self, model_names: Optional[List[str]] = None, face_size: Tuple[int, int] = (128, 128)) -> Dict[str, float]:
+        """
+        Push synthetic faces through every component once
+        
+        Triggers lazy imports, cascade and HOG backend initialization, model
+        loading and sklearn's first-call setup. Components are called directly,
+        so the feature cache, quality gate and detection counters are untouched.
+        Only the models the first detections use are loaded by default; the
+        others stay lazily registered.
+        
+        Args:
+            model_names: Models to warm (defaults to the default model and the cascade's cheap model)
+            face_size: Synthetic face crop size (height, width)
+            
+        Returns:
+            Warm-up time in milliseconds per component
+        """
+        rng = np.random.default_rng(0)
+        face_image = rng.integers(0, 256, (*face_size, 3), dtype=np.uint8)
+        frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        report: Dict[str, float] = {}
+        total_start = time.perf_counter()
+        
+        def timed(component: str, func) -> None:
+            start_time = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Warm-up of {component} failed: {e}")
+            report[component] = (time.perf_counter() - start_time) * 1000
+        
+        detection_frame = frame if not self.face_detector.accepts_grayscale else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        timed('face_detector', lambda: self.face_detector.detect_largest_face(detection_frame))
+        if hasattr(self.face_detector, 'reset_tracking'):
+            self.face_detector.reset_tracking()
+        
+        for name, extractor in self.feature_extractors.items():
+            timed(f'extractor:{name}', lambda: extractor.extract(face_image))
+        
+        if model_names is None:
+            available = self.model_manager.get_available_models()
+            model_names = [name for name in dict.fromkeys((self.cascade_model, self.config_manager.get_default_model()))
+                           if name is not None and name in available]
+        
+        for model_name in model_names:
+            if not self._model_usable(model_name):
+                continue
+            
+            def run_model(model_name=model_name):
+                features = self.get_extraction_plan(model_name).extract_into(FacePreprocessingContext(face_image))
+                if features.size == 0:
+                    raise ValueError("feature extraction returned no features")
+                if not self.model_manager.predict_distribution(model_name, features):
+                    raise ValueError("prediction returned no result")
+            
+            timed(f'model:{model_name}', run_model)
+        
+        report['total'] = (time.perf_counter() - total_start) * 1000
+        self.warm_up_report = report
+        
+        logger.info(f"Warm-up finished in {report['total']:.0f}ms: "
+                    + ", ".join(f"{component} {ms:.0f}ms" for component, ms in report.items() if component != 'total'))
+        return report
     
     def predict_ethnicity(self, image: np.ndarray, model_name: Optional[str] = None) -> Tuple[Optional[str], float]:
         """
@@ -76,15 +479,32 @@ class MLEthnicityDetector:
         Returns:
             Tuple of (ethnicity, confidence) or (None, 0.0) if prediction fails
         """
+        with self._pipeline_scope():
+            return self._predict_ethnicity(image, model_name)
+    
+    def _pipeline_scope(self):
+        """Let a micro-batching model manager know this thread is heading for a prediction"""
+        return self.model_manager.track() if isinstance(self.model_manager, InferenceQueue) else nullcontext()
+    
+    def _predict_ethnicity(self, image: np.ndarray, model_name: Optional[str]) -> Tuple[Optional[str], float]:
+        """Single-face detection, extraction and prediction pipeline"""
         # Use default model from config if not specified
         if model_name is None:
             model_name = self.config_manager.get_default_model()
         
+        if not self._model_usable(model_name):
+            logger.warning(f"Model {model_name} disabled: feature dimension mismatch")
+            return None, 0.0
+        
         start_time = time.time()
         
         try:
+            # Grayscale frame is computed once and shared by detection and extraction
+            frame_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+            
             # Step 1: Face detection
-            face_coords = self.face_detector.detect_largest_face(image)
+            detection_frame = frame_gray if self.face_detector.accepts_grayscale else image
+            face_coords = self.face_detector.detect_largest_face(detection_frame)
             if face_coords is None:
                 logger.debug("No face detected in image")
                 return None, 0.0
@@ -95,14 +515,52 @@ class MLEthnicityDetector:
                 logger.warning("Failed to extract face region")
                 return None, 0.0
             
-            # Step 2: Feature extraction
-            features = self._extract_combined_features(face_image, model_name)
-            if len(features) == 0:
-                logger.warning("Failed to extract features")
+            # Build per-face preprocessing context (gray crop is cut from the gray frame)
+            context = FacePreprocessingContext(
+                face_image,
+                face_gray=self.face_detector.extract_face_region(frame_gray, face_coords),
+                frame_gray=frame_gray
+            )
+            
+            # Skip the expensive path for crops that cannot give a usable result
+            if self.quality_gate is not None:
+                passed, _ = self.quality_gate.evaluate(context.face_gray)
+                if not passed:
+                    return None, 0.0
+            
+            # Face hash keys the feature cache and tells the aggregator when the face changes
+            face_hash = None
+            if self.feature_cache is not None or self.temporal_aggregator is not None:
+                face_hash = compute_face_hash(context.face_gray)
+            
+            # Cached result for a near-identical crop skips extraction and prediction
+            if self.feature_cache is not None:
+                cached = self.feature_cache.lookup(model_name, face_hash)
+                if cached is not None:
+                    ethnicity, confidence = cached['result']
+                    self._update_performance_stats(time.time() - start_time)
+                    self.last_probabilities = dict(cached.get('probabilities') or {})
+                    ethnicity, confidence = self._aggregate(ethnicity, confidence, face_hash, model_name, repeated=True)
+                    self.last_detection_result = (ethnicity, confidence)
+                    logger.debug(f"Feature cache hit for {model_name}")
+                    return ethnicity, confidence
+            
+            # Steps 2 and 3: feature extraction and prediction (through the cascade if enabled)
+            if self._cascade_applies(model_name):
+                _, prediction = self._predict_cascade(context, model_name)
+            else:
+                _, prediction = self._extract_and_predict(context, model_name)
+            if prediction is None:
                 return None, 0.0
+            ethnicity, confidence = prediction['ethnicity'], prediction['confidence']
+            self.last_probabilities = prediction['probabilities']
+            
+            if self.feature_cache is not None and ethnicity is not None:
+                self.feature_cache.store(model_name, face_hash, (ethnicity, confidence),
+                                         probabilities=self.last_probabilities)
             
-            # Step 3: ML prediction
-            ethnicity, confidence = self.model_manager.predict(model_name, features)
+            # Report the session's aggregated result instead of this frame's alone
+            ethnicity, confidence = self._aggregate(ethnicity, confidence, face_hash, model_name)
             
             # Update performance tracking
             detection_time = time.time() - start_time
@@ -120,42 +578,248 @@ class MLEthnicityDetector:
             logger.error(f"Ethnicity prediction failed: {e}")
             return None, 0.0
     
-    def _extract_combined_features(self, face_image: np.ndarray, model_name: str) -> np.ndarray:
-        """Extract features based on model requirements"""
+    def _aggregate(
+        self,
+        ethnicity: Optional[str],
+        confidence: float,
+        face_hash: Optional[int],
+        model_name: str,
+        repeated: bool = False
+    ) -> Tuple[Optional[str], float]:
+        """
+        Fold a single-frame result into the face session (pass-through without an aggregator)
+        
+        A repeated result (feature cache hit) is not new evidence: it reports
+        the session's current state and only starts a session if none applies.
+        """
+        if self.temporal_aggregator is None or ethnicity is None:
+            return ethnicity, confidence
+        
+        aggregated = self.temporal_aggregator.current(face_hash, model_name) if repeated else None
+        if aggregated is None:
+            aggregated = self.temporal_aggregator.update(
+                self.last_probabilities or {ethnicity: confidence}, face_hash, model_name
+            )
+        self.last_probabilities = aggregated['probabilities']
+        return aggregated['ethnicity'], aggregated['confidence']
+    
+    def is_converged(self) -> bool:
+        """Check if the current face session has a stable result (detection rate can drop)"""
+        return self.temporal_aggregator is not None and self.temporal_aggregator.is_converged()
+    
+    def _extract_and_predict(
+        self,
+        context: FacePreprocessingContext,
+        model_name: str
+    ) -> Tuple[np.ndarray, Optional[Dict[str, Any]]]:
+        """
+        Extract one model's features and predict them
+        
+        Returns:
+            Tuple of (feature row, prediction with 'ethnicity', 'confidence' and
+            'probabilities', or None if extraction or prediction failed)
+        """
+        # Step 2: Feature extraction
+        features = self._extract_combined_features(context, model_name)
+        if len(features) == 0:
+            logger.warning("Failed to extract features")
+            return features, None
+        
+        # Step 3: ML prediction (one predict_proba call, full distribution kept)
+        predictions = self.model_manager.predict_distribution(model_name, features)
+        if not predictions:
+            return features, None
+        return features, predictions[0]
+    
+    def _cascade_applies(self, model_name: str) -> bool:
+        """Check if a request for this model goes through the cheap model first"""
+        return (
+            self.cascade_model is not None
+            and model_name != self.cascade_model
+            and self.cascade_model in self.model_manager.get_available_models()
+            and self._model_usable(self.cascade_model)
+        )
+    
+    def _predict_cascade(
+        self,
+        context: FacePreprocessingContext,
+        model_name: str
+    ) -> Tuple[np.ndarray, Optional[Dict[str, Any]]]:
+        """
+        Predict with the cheap model and escalate to the requested one on doubt
+        
+        The cheap prediction is returned when its confidence reaches the
+        cascade threshold. Otherwise the requested model runs; feature blocks
+        the cheap model already extracted are reused from the context.
+        """
+        start_time = time.perf_counter()
+        features, prediction = self._extract_and_predict(context, self.cascade_model)
+        self.cascade_detections += 1
+        
+        if prediction is not None and prediction['confidence'] >= self.cascade_threshold:
+            self.cascade_accepted_time += time.perf_counter() - start_time
+            logger.debug(f"Cascade: {self.cascade_model} accepted at {prediction['confidence']:.3f}")
+            return features, prediction
+        
+        features, prediction = self._extract_and_predict(context, model_name)
+        self.cascade_escalations += 1
+        self.cascade_escalated_time += time.perf_counter() - start_time
+        logger.debug(f"Cascade: escalated to {model_name}")
+        return features, prediction
+    
+    def check_cascade_model(self) -> bool:
+        """
+        Report a cascade whose cheap model cannot run
+        
+        _cascade_applies skips such a cascade on every request, which would
+        otherwise go unnoticed; the check is repeated per request, so a hot
+        reload with a matching model enables the cascade again.
+        
+        Returns:
+            True if the cascade is off or its cheap model can serve predictions
+        """
+        if self.cascade_model is None:
+            return True
+        if self.cascade_model not in self.model_manager.get_available_models():
+            logger.error(f"Confidence cascade inactive: cheap model {self.cascade_model} is not available")
+            return False
+        if not self._model_usable(self.cascade_model):
+            logger.error(f"Confidence cascade inactive: cheap model {self.cascade_model} fails the feature "
+                         f"dimension check {self.dimension_report.get(self.cascade_model)}")
+            return False
+        return True
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """Get escalation rate and average cost of cascaded detections"""
+        accepted = self.cascade_detections - self.cascade_escalations
+        total_time = self.cascade_accepted_time + self.cascade_escalated_time
+        return {
+            'cheap_model': self.cascade_model,
+            'active': (self.cascade_model in self.model_manager.get_available_models()
+                       and self.cascade_model not in self.invalid_models),
+            'confidence_threshold': self.cascade_threshold,
+            'detections': self.cascade_detections,
+            'escalations': self.cascade_escalations,
+            'escalation_rate': self.cascade_escalations / self.cascade_detections if self.cascade_detections else 0.0,
+            'average_ms': total_time / self.cascade_detections * 1000 if self.cascade_detections else 0.0,
+            'average_accepted_ms': self.cascade_accepted_time / accepted * 1000 if accepted else 0.0,
+            'average_escalated_ms': self.cascade_escalated_time / self.cascade_escalations * 1000 if self.cascade_escalations else 0.0
+        }
+    
+    def predict_ethnicity_batch(self, image: np.ndarray, model_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Predict ethnicity for every face detected in the image
+        
+        Features for all faces are stacked into one matrix and classified
+        with a single model call. Each result carries its own distribution;
+        the shared last-result fields are left to predict_ethnicity, so
+        concurrent batch calls (DETECTION_REQUEST workers) never replace the
+        distribution of a detection in progress.
+        
+        Args:
+            image: Input image
+            model_name: Name of the model to use for prediction (uses default from config if None)
+            
+        Returns:
+            List of {'face_coords', 'ethnicity', 'confidence', 'probabilities'} dictionaries, one per face
+        """
+        with self._pipeline_scope():
+            return self._predict_ethnicity_batch(image, model_name)
+    
+    def _predict_ethnicity_batch(self, image: np.ndarray, model_name: Optional[str]) -> List[Dict[str, Any]]:
+        """Multi-face detection, extraction and stacked prediction pipeline"""
+        if model_name is None:
+            model_name = self.config_manager.get_default_model()
+        
+        if not self._model_usable(model_name):
+            logger.warning(f"Model {model_name} disabled: feature dimension mismatch")
+            return []
+        
+        start_time = time.time()
+        
         try:
-            features = []
+            frame_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+            
+            # Step 1: Face detection (all faces)
+            detection_frame = frame_gray if self.face_detector.accepts_grayscale else image
+            faces = self.face_detector.detect_faces(detection_frame)
+            if not faces:
+                logger.debug("No face detected in image")
+                return []
+            
+            face_coords_list = []
+            contexts = []
+            for face_coords in faces:
+                face_image = self.face_detector.extract_face_region(image, face_coords)
+                if face_image.size == 0:
+                    continue
+                context = FacePreprocessingContext(
+                    face_image,
+                    face_gray=self.face_detector.extract_face_region(frame_gray, face_coords),
+                    frame_gray=frame_gray
+                )
+                if self.quality_gate is not None and not self.quality_gate.evaluate(context.face_gray)[0]:
+                    continue
+                face_coords_list.append(face_coords)
+                contexts.append(context)
+            
+            if not contexts:
+                logger.debug("No usable face regions")
+                return []
             
-            # Extract features based on model name
-            if 'hog' in model_name and 'hog' in self.feature_extractors:
-                hog_features = self.feature_extractors['hog'].extract(face_image)
-                features.extend(hog_features)
-                logger.debug(f"Extracted {len(hog_features)} HOG features")
+            # Step 2: Feature extraction (n_faces x n_features)
+            features = self._extract_combined_features_batch(contexts, model_name)
+            if features.size == 0:
+                logger.warning("Failed to extract batch features")
+                return []
             
-            if 'glcm' in model_name and 'glcm' in self.feature_extractors:
-                glcm_features = self.feature_extractors['glcm'].extract(face_image)
-                features.extend(glcm_features)
-                logger.debug(f"Extracted {len(glcm_features)} GLCM features")
+            # Step 3: One stacked prediction for every face
+            predictions = self.model_manager.predict_distribution(model_name, features)
+            if not predictions:
+                return []
             
-            if 'lbp' in model_name and 'lbp' in self.feature_extractors:
-                lbp_features = self.feature_extractors['lbp'].extract(face_image)
-                features.extend(lbp_features)
-                logger.debug(f"Extracted {len(lbp_features)} LBP features")
+            detection_time = time.time() - start_time
+            self._update_performance_stats(detection_time)
             
-            if 'hsv' in model_name and 'hsv' in self.feature_extractors:
-                hsv_features = self.feature_extractors['hsv'].extract(face_image)
-                features.extend(hsv_features)
-                logger.debug(f"Extracted {len(hsv_features)} HSV features")
+            results = [
+                {'face_coords': face_coords, **prediction}
+                for face_coords, prediction in zip(face_coords_list, predictions)
+            ]
             
-            if not features:
-                logger.warning(f"No features extracted for model {model_name}")
-                return np.array([])
+            logger.debug(f"Batch prediction of {len(results)} faces in {detection_time * 1000:.1f}ms")
+            return results
             
-            return np.array(features, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Batch ethnicity prediction failed: {e}")
+            return []
+    
+    def _extract_combined_features(self, context: FacePreprocessingContext, model_name: str) -> np.ndarray:
+        """
+        Extract the model's feature row from a shared preprocessing context
+        
+        The returned row is the plan's preallocated buffer and is overwritten
+        by the next extraction for the same model.
+        """
+        try:
+            return self.get_extraction_plan(model_name).extract_into(
+                context, executor=self.extraction_executor, timeout=self.extraction_budget
+            )
             
         except Exception as e:
             logger.error(f"Feature extraction failed: {e}")
             return np.array([])
     
+    def _extract_combined_features_batch(self, contexts: List[FacePreprocessingContext], model_name: str) -> np.ndarray:
+        """Extract features for several faces into one (n_faces, n_features) array"""
+        try:
+            return self.get_extraction_plan(model_name).extract_batch(
+                contexts, self.extraction_executor, self.extraction_budget
+            )
+            
+        except Exception as e:
+            logger.error(f"Batch feature extraction failed: {e}")
+            return np.array([])
+    
     def _update_performance_stats(self, detection_time: float) -> None:
         """Update performance statistics"""
         self.detection_count += 1
@@ -170,31 +834,86 @@ class MLEthnicityDetector:
         """Get list of available models"""
         return self.model_manager.get_available_models()
     
-    def get_model_info(self, model_name: str) -> Dict[str, Any]:
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
         """Get information about a specific model"""
-        return self.model_manager.get_model_info(model_name)
+        return self.model_manager.get_model_info(model_name, load)
     
     def get_last_detection_result(self) -> Optional[Tuple[str, float]]:
         """Get the last detection result"""
         return self.last_detection_result
     
+    def get_last_probabilities(self) -> Dict[str, float]:
+        """Get the class distribution of the last prediction (empty if the model has none)"""
+        return dict(self.last_probabilities)
+    
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
         if self.detection_count == 0:
-            return {
+            stats = {
                 'total_detections': 0,
                 'average_time': 0.0,
                 'total_time': 0.0
             }
+        else:
+            stats = {
+                'total_detections': self.detection_count,
+                'average_time': self.total_detection_time / self.detection_count,
+                'total_time': self.total_detection_time
+            }
         
-        return {
-            'total_detections': self.detection_count,
-            'average_time': self.total_detection_time / self.detection_count,
-            'total_time': self.total_detection_time
-        }
+        if self.feature_cache is not None:
+            stats['feature_cache'] = self.feature_cache.get_stats()
+        
+        if self.quality_gate is not None:
+            stats['quality_gate'] = self.quality_gate.get_stats()
+        
+        if hasattr(self.face_detector, 'get_tracking_stats'):
+            stats['face_tracking'] = self.face_detector.get_tracking_stats()
+        
+        model_load_stats = self.model_manager.get_load_stats()
+        if model_load_stats:
+            stats['models'] = model_load_stats
+            stats['model_residency'] = self.model_manager.get_residency_stats()
+        
+        if isinstance(self.model_manager, InferenceQueue):
+            stats['inference_queue'] = self.model_manager.get_queue_stats()
+        
+        if self.model_reloader is not None:
+            stats['model_reload'] = self.model_reloader.get_stats()
+        
+        if self.cascade_model is not None:
+            stats['cascade'] = self.get_cascade_stats()
+        
+        if self.temporal_aggregator is not None:
+            stats['temporal_aggregation'] = self.temporal_aggregator.get_stats()
+        
+        if self.warm_up_report:
+            stats['warm_up_ms'] = dict(self.warm_up_report)
+        
+        if self.extraction_executor is not None:
+            stats['extraction_budget_overruns'] = sum(plan.budget_overruns for plan in self.extraction_plans.values())
+        
+        return stats
+    
+    def shutdown(self) -> None:
+        """Release background resources"""
+        if self.model_reloader is not None:
+            self.model_reloader.stop()
+            self.model_reloader = None
+        
+        if self.extraction_executor is not None:
+            self.extraction_executor.shutdown(wait=False)
+            self.extraction_executor = None
+        
+        if isinstance(self.model_manager, InferenceQueue):
+            self.model_manager.stop()
     
     def reset_performance_stats(self) -> None:
         """Reset performance statistics"""
         self.detection_count = 0
         self.total_detection_time = 0.0
+        self.cascade_detections = 0
+        self.cascade_escalations = 0
+        self.cascade_accepted_time = 0.0
+        self.cascade_escalated_time = 0.0
         logger.info("Performance statistics reset")
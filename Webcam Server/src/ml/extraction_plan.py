@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Feature Extraction Plan
+Compiled per-model feature layout with a preallocated float32 feature row
+"""
+
+import threading
+import numpy as np
+from concurrent.futures import Executor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+from .feature_extractors import IFeatureExtractor
+from .preprocessing import FacePreprocessingContext
+from ..core.logger import logger
+
+
+class FeatureExtractionPlan:
+    """
+    Extraction plan for one model
+
+    The feature order comes from the model's `features` list in config.json
+    (the order used during training). Offsets and the total dimension are
+    fixed when the plan is built, and every extractor writes its block
+    straight into a slice of a preallocated float32 row. Each calling
+    thread gets its own row, so concurrent detections do not share it.
+    """
+
+    def __init__(self, model_name: str, feature_names: Sequence[str], extractors: Dict[str, IFeatureExtractor]):
+        """
+        Initialize extraction plan
+
+        Args:
+            model_name: Name of the model this plan feeds
+            feature_names: Feature extractor names in training order
+            extractors: Available feature extractors by name
+        """
+        missing = [name for name in feature_names if name not in extractors]
+        if missing:
+            raise ValueError(f"No extractor available for {missing} (model {model_name})")
+
+        self.model_name = model_name
+        self.feature_names = list(feature_names)
+        self.segments: List[Tuple[str, IFeatureExtractor, int, int]] = []
+
+        offset = 0
+        for name in self.feature_names:
+            extractor = extractors[name]
+            size = extractor.get_feature_dimensions()
+            self.segments.append((name, extractor, offset, offset + size))
+            offset += size
+
+        self.total_dimensions = offset
+        self._local = threading.local()
+
+        # Parallel extractions abandoned after exceeding the latency budget
+        self.budget_overruns = 0
+
+        logger.debug(f"Extraction plan for {model_name}: {self.get_layout()}")
+
+    @property
+    def buffer(self) -> np.ndarray:
+        """The calling thread's preallocated feature row"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = np.zeros(self.total_dimensions, dtype=np.float32)
+        return buffer
+    
+    def _replace_buffer(self) -> None:
+        """Give the calling thread a fresh row (the old one is still being written)"""
+        self._local.buffer = np.zeros(self.total_dimensions, dtype=np.float32)
+    
+    def get_layout(self) -> Dict[str, Tuple[int, int]]:
+        """Slice (start, stop) of every feature block in the row"""
+        return {name: (start, stop) for name, _, start, stop in self.segments}
+
+    def extract_into(
+        self,
+        context: FacePreprocessingContext,
+        out: Optional[np.ndarray] = None,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Extract all feature blocks for one face
+
+        Args:
+            context: Per-face preprocessing context
+            out: Optional float32 row to fill (defaults to the calling thread's buffer,
+                 which is overwritten by its next call)
+            executor: Optional thread pool to run the extractors concurrently
+            timeout: Latency budget in seconds for the concurrent mode (None waits indefinitely)
+
+        Returns:
+            Filled feature row, or empty array if any extractor fails
+        """
+        if out is None:
+            out = self.buffer
+
+        # Blocks another plan already extracted for this face are copied, not recomputed
+        segments = []
+        for name, extractor, start, stop in self.segments:
+            block = context.feature_blocks.get(name)
+            if block is not None and block.shape[0] == stop - start:
+                out[start:stop] = block
+            else:
+                segments.append((name, extractor, start, stop))
+
+        if executor is not None and len(segments) > 1:
+            return self._extract_concurrent(context, out, segments, executor, timeout)
+
+        for name, extractor, start, stop in segments:
+            if not extractor.extract_into(context, out[start:stop]):
+                logger.warning(f"{name.upper()} extraction failed for model {self.model_name}")
+                return np.array([])
+            context.feature_blocks[name] = out[start:stop]
+
+        return out
+
+    def _extract_concurrent(
+        self,
+        context: FacePreprocessingContext,
+        out: np.ndarray,
+        segments: List[Tuple[str, IFeatureExtractor, int, int]],
+        executor: Executor,
+        timeout: Optional[float]
+    ) -> np.ndarray:
+        """
+        Run the given extractors on the executor, each writing its own slice
+
+        If the budget runs out, the row is abandoned: running extractors keep
+        writing into it, so the plan switches to a fresh buffer for the next call.
+        """
+        # Grayscale crop is shared by GLCM and LBP, convert once before fanning out
+        context.face_gray
+
+        futures = {
+            executor.submit(extractor.extract_into, context, out[start:stop]): (name, start, stop)
+            for name, extractor, start, stop in segments
+        }
+        done, not_done = wait(futures, timeout=timeout)
+
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            self.budget_overruns += 1
+            if out is self.buffer:
+                self._replace_buffer()
+            pending = [futures[future][0] for future in not_done]
+            logger.warning(f"Extraction budget of {timeout * 1000:.0f}ms exceeded for model {self.model_name} (pending: {pending})")
+            return np.array([])
+
+        for future in done:
+            if not future.result():
+                logger.warning(f"{futures[future][0].upper()} extraction failed for model {self.model_name}")
+                return np.array([])
+
+        for name, start, stop in futures.values():
+            context.feature_blocks[name] = out[start:stop]
+        return out
+
+    def extract_batch(
+        self,
+        contexts: Sequence[FacePreprocessingContext],
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Extract feature rows for several faces
+
+        Returns:
+            float32 array of shape (n_faces, total_dimensions), or empty array if any face fails
+        """
+        batch = np.empty((len(contexts), self.total_dimensions), dtype=np.float32)
+        for i, context in enumerate(contexts):
+            if self.extract_into(context, batch[i], executor, timeout).size == 0:
+                return np.array([])
+        return batch
+
+
+def build_extraction_plan(
+    model_name: str,
+    extractors: Dict[str, IFeatureExtractor],
+    model_config: Optional[Dict] = None
+) -> FeatureExtractionPlan:
+    """
+    Build the extraction plan for a model
+
+    Args:
+        model_name: Name of the model
+        extractors: Available feature extractors by name
+        model_config: Model entry from config.json (its `features` list sets the order);
+                      falls back to the feature names in the model name, e.g. glcm_lbp_hog
+
+    Returns:
+        Compiled extraction plan
+    """
+    feature_names = (model_config or {}).get('features') or model_name.split('_')
+    return FeatureExtractionPlan(model_name, feature_names, extractors)
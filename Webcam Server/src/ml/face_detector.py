@@ -4,16 +4,22 @@ Face Detection Interface and Implementation
 Following SOLID principles with abstract interfaces
 """
 
+import os
+import threading
 import cv2
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Dict, Any
+from .cascade_registry import cascade_registry, DEFAULT_FACE_CASCADE
 from ..core.logger import logger
 
 
 class IFaceDetector(ABC):
     """Abstract interface for face detection (Interface Segregation Principle)"""
     
+    # Whether detection works on a grayscale frame (callers can then share one conversion)
+    accepts_grayscale = True
+    
     @abstractmethod
     def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """Detect faces in image and return list of (x, y, w, h) coordinates"""
@@ -33,22 +39,35 @@ class IFaceDetector(ABC):
 class OpenCVFaceDetector(IFaceDetector):
     """OpenCV-based face detector implementation"""
     
-    def __init__(self, cascade_path: Optional[str] = None):
+    def __init__(self, cascade_path: Optional[str] = None, detection_scale: float = 1.0, min_face_size: int = 30):
         """
         Initialize face detector with Haar cascade
         
         Args:
             cascade_path: Path to Haar cascade file. If None, uses default frontal face cascade.
+            detection_scale: Downscale factor for detection (0.25..1.0); boxes are mapped
+                back to full-resolution coordinates
+            min_face_size: Minimum face size in full-resolution pixels
         """
-        if cascade_path is None:
-            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        if not 0.25 <= detection_scale <= 1.0:
+            raise ValueError(f"Detection scale must be between 0.25 and 1.0, got {detection_scale}")
+        
+        self.detection_scale = detection_scale
+        self.min_face_size = min_face_size
         
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
+        if cascade_path is None:
+            cascade_path = DEFAULT_FACE_CASCADE
         
-        if self.face_cascade.empty():
-            raise ValueError(f"Failed to load cascade classifier from {cascade_path}")
+        # Warm per-thread instance from the shared registry (raises if the file cannot be loaded)
+        self.cascade_path = cascade_path
+        cascade_registry.get(cascade_path)
         
-        logger.info(f"OpenCV face detector initialized with cascade: {cascade_path}")
+        logger.info(f"OpenCV face detector initialized with cascade: {cascade_path} (detection scale {detection_scale})")
+    
+    @property
+    def face_cascade(self) -> cv2.CascadeClassifier:
+        """Cascade instance owned by the calling thread"""
+        return cascade_registry.get(self.cascade_path)
     
     def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """Detect all faces in image"""
@@ -59,17 +78,28 @@ class OpenCVFaceDetector(IFaceDetector):
             else:
                 gray = image
             
+            # Detect on a downscaled image (cascade cost grows with pixel count)
+            scale = self.detection_scale
+            if scale < 1.0:
+                detection_image = cv2.resize(gray, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                detection_image = gray
+            min_size = max(1, int(round(self.min_face_size * scale)))
+            
             # Detect faces
             faces = self.face_cascade.detectMultiScale(
-                gray,
+                detection_image,
                 scaleFactor=1.1,
                 minNeighbors=4,
-                minSize=(30, 30),
+                minSize=(min_size, min_size),
                 flags=cv2.CASCADE_SCALE_IMAGE
             )
             
-            # Convert to list of tuples
-            face_list = [(int(x), int(y), int(w), int(h)) for x, y, w, h in faces]
+            # Map boxes back to full-resolution coordinates
+            if scale < 1.0:
+                face_list = self._map_to_full_resolution(faces, scale, gray.shape[:2])
+            else:
+                face_list = [(int(x), int(y), int(w), int(h)) for x, y, w, h in faces]
             
             logger.debug(f"Detected {len(face_list)} faces in image")
             return face_list
@@ -78,6 +108,21 @@ class OpenCVFaceDetector(IFaceDetector):
             logger.error(f"Face detection failed: {e}")
             return []
     
+    @staticmethod
+    def _map_to_full_resolution(
+        faces, scale: float, image_shape: Tuple[int, int]
+    ) -> List[Tuple[int, int, int, int]]:
+        """Scale detected boxes back to the full-resolution frame, clipped to its bounds"""
+        h_img, w_img = image_shape
+        face_list = []
+        for x, y, w, h in faces:
+            x0 = max(0, int(round(x / scale)))
+            y0 = max(0, int(round(y / scale)))
+            x1 = min(w_img, int(round((x + w) / scale)))
+            y1 = min(h_img, int(round((y + h) / scale)))
+            face_list.append((x0, y0, x1 - x0, y1 - y0))
+        return face_list
+    
     def detect_largest_face(self, image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """Detect the largest face in image"""
         faces = self.detect_faces(image)
@@ -115,6 +160,227 @@ class OpenCVFaceDetector(IFaceDetector):
             return np.array([])
 
 
+class TrackingFaceDetector(OpenCVFaceDetector):
+    """
+    OpenCV face detector that tracks the last face between full-frame scans
+    
+    After a hit, detect_largest_face only searches an expanded ROI around the
+    last face with minSize/maxSize bounded to the last face size. A full-frame
+    scan runs every `full_scan_interval` calls and after any ROI miss.
+    """
+    
+    def __init__(
+        self,
+        cascade_path: Optional[str] = None,
+        detection_scale: float = 1.0,
+        min_face_size: int = 30,
+        full_scan_interval: int = 10,
+        roi_expansion: float = 0.5,
+        size_tolerance: float = 0.3
+    ):
+        """
+        Initialize tracking face detector
+        
+        Args:
+            cascade_path: Path to Haar cascade file. If None, uses default frontal face cascade.
+            detection_scale: Downscale factor for full-frame scans (0.25..1.0)
+            min_face_size: Minimum face size for full-frame scans
+            full_scan_interval: Force a full-frame scan every N calls
+            roi_expansion: ROI margin around the last face, as a fraction of its size
+            size_tolerance: Allowed relative face size change between calls
+        """
+        super().__init__(cascade_path, detection_scale, min_face_size)
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.roi_expansion = roi_expansion
+        self.size_tolerance = size_tolerance
+        
+        self.last_face: Optional[Tuple[int, int, int, int]] = None
+        self.calls_since_full_scan = 0
+        
+        # Statistics
+        self.full_scans = 0
+        self.roi_scans = 0
+        self.roi_hits = 0
+        
+        logger.info(f"Tracking face detector: full scan every {self.full_scan_interval} calls, ROI expansion {roi_expansion}")
+    
+    def detect_largest_face(self, image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Detect the largest face, searching around the last face when possible"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+        
+        if self.last_face is not None and self.calls_since_full_scan < self.full_scan_interval:
+            self.calls_since_full_scan += 1
+            self.roi_scans += 1
+            face = self._detect_in_roi(gray, self.last_face)
+            if face is not None:
+                self.roi_hits += 1
+                self.last_face = face
+                return face
+            logger.debug("Face lost in ROI, falling back to full-frame scan")
+        
+        # Full-frame scan (periodic, first call, or after a miss)
+        self.full_scans += 1
+        self.calls_since_full_scan = 0
+        self.last_face = super().detect_largest_face(gray)
+        return self.last_face
+    
+    def _detect_in_roi(self, gray: np.ndarray, last_face: Tuple[int, int, int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """Search an expanded window around the last face with bounded face size"""
+        try:
+            x, y, w, h = last_face
+            h_img, w_img = gray.shape[:2]
+            margin_x = int(w * self.roi_expansion)
+            margin_y = int(h * self.roi_expansion)
+            x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+            x1, y1 = min(w_img, x + w + margin_x), min(h_img, y + h + margin_y)
+            
+            size = max(w, h)
+            min_size = max(1, int(size * (1 - self.size_tolerance)))
+            max_size = int(size * (1 + self.size_tolerance)) + 1
+            
+            faces = self.face_cascade.detectMultiScale(
+                gray[y0:y1, x0:x1],
+                scaleFactor=1.1,
+                minNeighbors=4,
+                minSize=(min_size, min_size),
+                maxSize=(max_size, max_size),
+                flags=cv2.CASCADE_SCALE_IMAGE
+            )
+            
+            if len(faces) == 0:
+                return None
+            
+            fx, fy, fw, fh = max(faces, key=lambda face: face[2] * face[3])
+            return int(fx) + x0, int(fy) + y0, int(fw), int(fh)
+            
+        except Exception as e:
+            logger.error(f"ROI face detection failed: {e}")
+            return None
+    
+    def reset_tracking(self) -> None:
+        """Forget the tracked face (next call scans the full frame)"""
+        self.last_face = None
+        self.calls_since_full_scan = 0
+    
+    def get_tracking_stats(self) -> Dict[str, Any]:
+        """Get tracking statistics"""
+        return {
+            'full_scans': self.full_scans,
+            'roi_scans': self.roi_scans,
+            'roi_hits': self.roi_hits,
+            'roi_hit_rate': self.roi_hits / self.roi_scans if self.roi_scans else 0.0,
+            'tracking': self.last_face is not None
+        }
+
+
+class YuNetFaceDetector(IFaceDetector):
+    """
+    CNN face detector built on cv2.FaceDetectorYN (YuNet ONNX model)
+    
+    The model file is loaded from a local path (e.g. face_detection_yunet_2023mar.onnx
+    from the OpenCV model zoo). YuNet expects a 3-channel BGR frame.
+    """
+    
+    accepts_grayscale = False
+    
+    def __init__(
+        self,
+        model_path: str = "models/face_detection_yunet_2023mar.onnx",
+        detection_scale: float = 1.0,
+        min_face_size: int = 30,
+        score_threshold: float = 0.7,
+        nms_threshold: float = 0.3,
+        top_k: int = 50
+    ):
+        """
+        Initialize YuNet face detector
+        
+        Args:
+            model_path: Local path to the YuNet ONNX model
+            detection_scale: Downscale factor for detection (0.25..1.0)
+            min_face_size: Minimum face size in full-resolution pixels
+            score_threshold: Minimum face confidence
+            nms_threshold: Non-maximum suppression IoU threshold
+            top_k: Maximum candidates kept before NMS
+        """
+        if not hasattr(cv2, 'FaceDetectorYN'):
+            raise ValueError("cv2.FaceDetectorYN is not available (requires OpenCV >= 4.5.4)")
+        if not os.path.exists(model_path):
+            raise ValueError(f"YuNet model not found: {model_path}")
+        if not 0.25 <= detection_scale <= 1.0:
+            raise ValueError(f"Detection scale must be between 0.25 and 1.0, got {detection_scale}")
+        
+        self.model_path = model_path
+        self.detection_scale = detection_scale
+        self.min_face_size = min_face_size
+        self.detector = cv2.FaceDetectorYN.create(
+            model_path, "", (320, 320), score_threshold, nms_threshold, top_k
+        )
+        self._input_size: Optional[Tuple[int, int]] = None
+        # FaceDetectorYN keeps per-input-size state and is not thread-safe
+        self._lock = threading.Lock()
+        
+        logger.info(f"YuNet face detector initialized with model: {model_path} (detection scale {detection_scale})")
+    
+    def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Detect all faces in image"""
+        try:
+            if len(image.shape) == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            
+            scale = self.detection_scale
+            if scale < 1.0:
+                detection_image = cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                detection_image = image
+            
+            height, width = detection_image.shape[:2]
+            with self._lock:
+                if self._input_size != (width, height):
+                    self.detector.setInputSize((width, height))
+                    self._input_size = (width, height)
+                _, faces = self.detector.detect(detection_image)
+            
+            if faces is None:
+                logger.debug("Detected 0 faces in image")
+                return []
+            
+            # Rows: x, y, w, h, 5 landmarks, score
+            h_img, w_img = image.shape[:2]
+            face_list = []
+            for x, y, w, h in faces[:, :4] / scale:
+                x0, y0 = max(0, int(round(x))), max(0, int(round(y)))
+                x1, y1 = min(w_img, int(round(x + w))), min(h_img, int(round(y + h)))
+                if x1 - x0 >= self.min_face_size and y1 - y0 >= self.min_face_size:
+                    face_list.append((x0, y0, x1 - x0, y1 - y0))
+            
+            logger.debug(f"Detected {len(face_list)} faces in image")
+            return face_list
+            
+        except Exception as e:
+            logger.error(f"Face detection failed: {e}")
+            return []
+    
+    def detect_largest_face(self, image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Detect the largest face in image"""
+        faces = self.detect_faces(image)
+        
+        if not faces:
+            logger.debug("No faces detected in image")
+            return None
+        
+        return max(faces, key=lambda face: face[2] * face[3])
+    
+    def extract_face_region(self, image: np.ndarray, face_coords: Tuple[int, int, int, int]) -> np.ndarray:
+        """Extract face region from image"""
+        try:
+            x, y, w, h = face_coords
+            return image[y:y+h, x:x+w]
+        except Exception as e:
+            logger.error(f"Face region extraction failed: {e}")
+            return np.array([])
+
+
 class FaceDetectorFactory:
     """Factory for creating face detectors"""
     
@@ -122,7 +388,9 @@ class FaceDetectorFactory:
     def create_detector(detector_type: str = "opencv", **kwargs) -> IFaceDetector:
         """Create face detector based on type"""
         detectors = {
-            'opencv': OpenCVFaceDetector
+            'opencv': OpenCVFaceDetector,
+            'opencv_tracking': TrackingFaceDetector,
+            'yunet': YuNetFaceDetector
         }
         
         if detector_type.lower() not in detectors:
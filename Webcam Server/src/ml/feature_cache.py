@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Feature Cache
+LRU cache of predictions keyed by a perceptual hash of the face crop
+"""
+
+import time
+import threading
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from ..core.logger import logger
+
+
+def compute_face_hash(face_gray: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Difference hash (dHash) of a grayscale face crop
+
+    The crop is shrunk to (hash_size + 1) x hash_size and every bit records
+    whether a pixel is brighter than its right neighbour, so small shifts,
+    noise and JPEG artifacts change only a few bits.
+
+    Args:
+        face_gray: 2D grayscale face crop
+        hash_size: Hash grid size (hash_size ** 2 bits)
+
+    Returns:
+        Hash as a Python integer
+    """
+    small = cv2.resize(face_gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(hash_a ^ hash_b).count('1')
+
+
+class FeatureCache:
+    """
+    LRU cache for consecutive detections of the same face
+
+    A hit skips both feature extraction and prediction, so only the
+    prediction is kept, not the (up to 34k-value) feature row. Entries are
+    keyed by (model_name, face_hash). A lookup hits when an entry
+    for the same model is within `similarity_threshold` bits of the query
+    hash and younger than `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 32, similarity_threshold: int = 6, ttl_seconds: float = 5.0):
+        """
+        Initialize feature cache
+
+        Args:
+            max_entries: Maximum number of cached faces
+            similarity_threshold: Maximum Hamming distance between hashes for a hit
+            ttl_seconds: Maximum entry age in seconds
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: 'OrderedDict[Tuple[str, int], Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        logger.info(f"Feature cache initialized: {max_entries} entries, threshold {similarity_threshold} bits, TTL {ttl_seconds}s")
+
+    def lookup(self, model_name: str, face_hash: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached entry for a similar face
+
+        Args:
+            model_name: Model the features were extracted for
+            face_hash: Perceptual hash of the face crop
+
+        Returns:
+            Copy of the entry with 'result', 'probabilities' and 'timestamp', or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+
+            best_key, best_distance = None, self.similarity_threshold + 1
+            for key in self._entries:
+                if key[0] != model_name:
+                    continue
+                distance = hamming_distance(key[1], face_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+                    if distance == 0:
+                        break
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_key)
+            entry = self._entries[best_key]
+            return {**entry, 'probabilities': dict(entry['probabilities'])}
+
+    def store(
+        self,
+        model_name: str,
+        face_hash: int,
+        result: Tuple[Optional[str], float],
+        probabilities: Optional[Dict[str, float]] = None
+    ) -> None:
+        """
+        Store the prediction for a face
+
+        Args:
+            model_name: Model that made the prediction
+            face_hash: Perceptual hash of the face crop
+            result: (ethnicity, confidence) predicted for the face
+            probabilities: Optional class distribution of the prediction
+        """
+        with self._lock:
+            key = (model_name, face_hash)
+            self._entries[key] = {
+                'result': result,
+                'probabilities': dict(probabilities or {}),
+                'timestamp': time.time()
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _expire(self, now: float) -> None:
+        """Drop entries older than the TTL (caller holds the lock)"""
+        expired = [key for key, entry in self._entries.items() if now - entry['timestamp'] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
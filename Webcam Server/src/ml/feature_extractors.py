@@ -7,7 +7,11 @@ Following SOLID principles with abstract interfaces and concrete implementations
 import cv2
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Sequence, Union
+from .preprocessing import FacePreprocessingContext
+from .glcm_engine import GLCMEngine
+from .lbp_engine import LBPEngine
+from .hog_engine import HOGEngine
 from ..core.logger import logger
 
 
@@ -19,6 +23,50 @@ class IFeatureExtractor(ABC):
         """Extract features from image"""
         pass
     
+    def extract_from_context(self, context: FacePreprocessingContext) -> np.ndarray:
+        """Extract features from a shared preprocessing context"""
+        return self.extract(context.face_bgr)
+    
+    def extract_into(self, context: FacePreprocessingContext, out: np.ndarray) -> bool:
+        """
+        Extract features from a preprocessing context into a preallocated slice
+        
+        Args:
+            context: Per-face preprocessing context
+            out: float32 slice of length get_feature_dimensions()
+            
+        Returns:
+            True if the slice was filled
+        """
+        features = self.extract_from_context(context)
+        if features.size != out.size:
+            return False
+        out[:] = features
+        return True
+    
+    def extract_batch(self, faces: Sequence[Union[np.ndarray, FacePreprocessingContext]]) -> np.ndarray:
+        """
+        Extract features for several faces into one (n_faces, n_features) array
+        
+        Args:
+            faces: Face crops or preprocessing contexts
+            
+        Returns:
+            float32 array with one row per face, or empty array if any face fails
+        """
+        try:
+            batch = np.empty((len(faces), self.get_feature_dimensions()), dtype=np.float32)
+            for i, face in enumerate(faces):
+                context = face if isinstance(face, FacePreprocessingContext) else FacePreprocessingContext(face)
+                if not self.extract_into(context, batch[i]):
+                    logger.warning(f"{self.get_feature_name()} extraction failed for face {i} in batch")
+                    return np.array([])
+            return batch
+            
+        except Exception as e:
+            logger.error(f"{self.get_feature_name()} batch extraction failed: {e}")
+            return np.array([])
+    
     @abstractmethod
     def get_feature_name(self) -> str:
         """Get the name of this feature extractor"""
@@ -33,32 +81,31 @@ class IFeatureExtractor(ABC):
 class HOGFeatureExtractor(IFeatureExtractor):
     """HOG (Histogram of Oriented Gradients) feature extractor with exact training parameters"""
     
-    def __init__(self, image_size: Tuple[int, int] = (64, 64)):
+    def __init__(self, image_size: Tuple[int, int] = (256, 256), backend: str = 'skimage', parity_tolerance: float = 1e-4):
         self.image_size = image_size
-        # Use exact training parameters from HOGFeatureExtractor
-        self.hog = cv2.HOGDescriptor(
-            (image_size[0], image_size[1]),  # winSize
-            (16, 16),                        # blockSize
-            (8, 8),                          # blockStride
-            (8, 8),                          # cellSize
-            9                                # nbins (orientations)
+        # Exact training parameters (skimage hog, 9 orientations, 8x8 cells, 2x2 blocks, L2-Hys)
+        self.engine = HOGEngine(
+            image_size=image_size,
+            orientations=9,
+            pixels_per_cell=(8, 8),
+            cells_per_block=(2, 2),
+            backend=backend,
+            parity_tolerance=parity_tolerance
         )
-        logger.info(f"HOG extractor initialized with image size {image_size} (exact training parameters)")
+        logger.info(f"HOG extractor initialized with image size {image_size}, backend {self.engine.backend} (exact training parameters)")
     
     def extract(self, image: np.ndarray) -> np.ndarray:
         """Extract HOG features from image"""
+        return self.extract_from_context(FacePreprocessingContext(image))
+    
+    def extract_from_context(self, context: FacePreprocessingContext) -> np.ndarray:
+        """Extract HOG features from preprocessing context"""
         try:
-            # Resize image to standard size
-            resized = cv2.resize(image, self.image_size)
-            gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+            # Resized grayscale crop (resize first, then convert)
+            gray = context.get_resized_then_gray(self.image_size)
             
-            # Compute HOG features
-            features = self.hog.compute(gray)
-            if features is not None:
-                return features.flatten()
-            else:
-                logger.warning("HOG computation returned None")
-                return np.array([])
+            # Compute HOG features in training layout
+            return self.engine.compute(gray)
                 
         except Exception as e:
             logger.error(f"HOG feature extraction failed: {e}")
@@ -68,22 +115,8 @@ class HOGFeatureExtractor(IFeatureExtractor):
         return "HOG"
     
     def get_feature_dimensions(self) -> int:
-        # Calculate expected HOG dimensions
-        win_size = self.image_size
-        block_size = (16, 16)
-        block_stride = (8, 8)
-        cell_size = (8, 8)
-        nbins = 9
-        
-        # Number of blocks in each dimension
-        n_blocks_x = (win_size[0] - block_size[0]) // block_stride[0] + 1
-        n_blocks_y = (win_size[1] - block_size[1]) // block_stride[1] + 1
-        
-        # Number of cells per block
-        n_cells_per_block_x = block_size[0] // cell_size[0]
-        n_cells_per_block_y = block_size[1] // cell_size[1]
-        
-        return n_blocks_x * n_blocks_y * n_cells_per_block_x * n_cells_per_block_y * nbins
+        # blocks x cells per block x orientations (34596 at 256x256)
+        return self.engine.feature_dimensions
 
 
 class GLCMFeatureExtractor(IFeatureExtractor):
@@ -95,52 +128,23 @@ class GLCMFeatureExtractor(IFeatureExtractor):
         self.distances = [1]  # Default from config
         self.angles = [0, 45, 90, 135]  # Default from config (in degrees)
         self.levels = 256  # Default from config
+        self.engine = GLCMEngine(self.distances, self.angles, self.levels)
         logger.info(f"GLCM extractor initialized with image size {image_size} (exact training parameters)")
     
     def extract(self, image: np.ndarray) -> np.ndarray:
         """Extract GLCM features from image using exact training parameters"""
+        return self.extract_from_context(FacePreprocessingContext(image))
+    
+    def extract_from_context(self, context: FacePreprocessingContext) -> np.ndarray:
+        """Extract GLCM features from preprocessing context"""
         try:
-            from skimage.feature import graycomatrix, graycoprops
-            
-            # Convert to grayscale
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-            
-            # Resize to 256x256 if needed (training preprocessing)
+            # Grayscale crop, resized to 256x256 if needed (training preprocessing)
+            gray = context.face_gray
             if gray.shape[0] > 256 or gray.shape[1] > 256:
-                gray = cv2.resize(gray, (256, 256))
-            
-            # Convert angles to radians
-            angles_rad = [np.radians(angle) for angle in self.angles]
-            
-            # Calculate GLCM
-            glcm = graycomatrix(gray, 
-                               distances=self.distances, 
-                               angles=angles_rad,
-                               levels=self.levels, 
-                               symmetric=True, 
-                               normed=True)
+                gray = context.get_gray_then_resized((256, 256))
             
-            # Extract Haralick features (exact from training)
-            properties = ['contrast', 'homogeneity', 'correlation', 'energy']
-            haralick_features = []
-            
-            for prop in properties:
-                feature_values = graycoprops(glcm, prop).ravel()
-                haralick_features.extend(feature_values)
-            
-            # Extract entropy for each angle (exact from training)
-            entropy_features = []
-            for j in range(len(angles_rad)):
-                # Average GLCM across distances for angle j
-                P_avg = np.mean(glcm[:, :, :, j], axis=2)
-                entropy_val = self._shannon_entropy(P_avg)
-                entropy_features.append(entropy_val)
-            
-            # Combine all features
-            all_features = np.concatenate([haralick_features, entropy_features])
+            # 16 Haralick features (4 properties x 4 angles) + 4 entropy features
+            all_features = self.engine.compute(gray)
             
             return all_features.astype(np.float32)
             
@@ -148,11 +152,6 @@ class GLCMFeatureExtractor(IFeatureExtractor):
             logger.error(f"GLCM feature extraction failed: {e}")
             return np.array([])
     
-    def _shannon_entropy(self, P):
-        """Calculate Shannon entropy"""
-        P = P[P > 0]
-        return -np.sum(P * np.log2(P))
-    
     def _extract_basic_texture_features(self, gray_image: np.ndarray) -> list:
         """Extract basic texture features as GLCM approximation"""
         features = []
@@ -218,8 +217,8 @@ class GLCMFeatureExtractor(IFeatureExtractor):
         return "GLCM"
     
     def get_feature_dimensions(self) -> int:
-        # Basic features + LBP approximation
-        return 9 + (8 * 2)  # 9 statistical + 8 neighbors * 2 features each
+        # 4 Haralick properties x 4 angles + 4 entropy values
+        return self.engine.feature_dimensions
 
 
 class LBPFeatureExtractor(IFeatureExtractor):
@@ -232,24 +231,21 @@ class LBPFeatureExtractor(IFeatureExtractor):
         self.n_points = 8  # Default from training
         self.method = 'uniform'  # Default from training
         self.bins = self.n_points + 2  # Default from training (10 for uniform method)
+        self.engine = LBPEngine(self.n_points, self.radius)
         logger.info(f"LBP extractor initialized with image size {image_size} (exact training parameters)")
     
     def extract(self, image: np.ndarray) -> np.ndarray:
         """Extract LBP features from image using exact training parameters"""
+        return self.extract_from_context(FacePreprocessingContext(image))
+    
+    def extract_from_context(self, context: FacePreprocessingContext) -> np.ndarray:
+        """Extract LBP features from preprocessing context"""
         try:
-            from skimage.feature import local_binary_pattern
+            # Grayscale crop
+            gray = context.face_gray
             
-            # Convert to grayscale
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-            
-            # Calculate LBP using exact training parameters
-            lbp = local_binary_pattern(gray, self.n_points, self.radius, method=self.method)
-            
-            # Calculate histogram using exact training parameters
-            hist, _ = np.histogram(lbp.ravel(), bins=self.bins, range=(0, self.bins), density=True)
+            # Uniform LBP histogram (equivalent to skimage + np.histogram with density=True)
+            hist = self.engine.compute_histogram(gray)
             
             return hist.astype(np.float32)
             
@@ -257,40 +253,11 @@ class LBPFeatureExtractor(IFeatureExtractor):
             logger.error(f"LBP feature extraction failed: {e}")
             return np.array([])
     
-    def _calculate_lbp(self, gray_image: np.ndarray) -> np.ndarray:
-        """Calculate Local Binary Pattern"""
-        h, w = gray_image.shape
-        lbp = np.zeros_like(gray_image)
-        
-        # Define circular neighborhood
-        angles = np.linspace(0, 2 * np.pi, self.n_points, endpoint=False)
-        offsets = []
-        
-        for angle in angles:
-            x_offset = int(self.radius * np.cos(angle))
-            y_offset = int(self.radius * np.sin(angle))
-            offsets.append((x_offset, y_offset))
-        
-        # Calculate LBP for each pixel
-        for y in range(self.radius, h - self.radius):
-            for x in range(self.radius, w - self.radius):
-                center_value = gray_image[y, x]
-                binary_string = ""
-                
-                for dx, dy in offsets:
-                    neighbor_value = gray_image[y + dy, x + dx]
-                    binary_string += "1" if neighbor_value >= center_value else "0"
-                
-                # Convert binary string to decimal
-                lbp[y, x] = int(binary_string, 2)
-        
-        return lbp
-    
     def get_feature_name(self) -> str:
         return "LBP"
     
     def get_feature_dimensions(self) -> int:
-        return 256  # Histogram bins
+        return self.bins  # Uniform histogram bins
 
 
 class HSVFeatureExtractor(IFeatureExtractor):
@@ -310,12 +277,23 @@ class HSVFeatureExtractor(IFeatureExtractor):
     
     def extract(self, image: np.ndarray) -> np.ndarray:
         """Extract HSV color features from image using exact training parameters"""
+        return self.extract_from_context(FacePreprocessingContext(image))
+    
+    def extract_from_context(self, context: FacePreprocessingContext) -> np.ndarray:
+        """Extract HSV color features from preprocessing context"""
+        features = np.empty(self.get_feature_dimensions(), dtype=np.float32)
+        if not self.extract_into(context, features):
+            return np.array([])
+        return features
+    
+    def extract_into(self, context: FacePreprocessingContext, out: np.ndarray) -> bool:
+        """Write normalized S and V histograms straight into the output slice"""
         try:
-            # Convert BGR to HSV
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            # BGR to HSV conversion shared through the context
+            hsv = context.hsv
             
             # Calculate histograms only for S and V channels (exact training parameters)
-            features = []
+            offset = 0
             for channel in self.channels:
                 if channel == 1:  # S channel
                     hist = cv2.calcHist([hsv], [channel], None, [self.s_bins], self.s_ranges)
@@ -323,14 +301,15 @@ class HSVFeatureExtractor(IFeatureExtractor):
                     hist = cv2.calcHist([hsv], [channel], None, [self.v_bins], self.v_ranges)
                 
                 # Normalize histogram
-                hist = hist.flatten() / (hist.sum() + 1e-7)
-                features.extend(hist)
+                hist = hist.ravel()
+                np.divide(hist, hist.sum() + 1e-7, out=out[offset:offset + hist.size])
+                offset += hist.size
             
-            return np.array(features, dtype=np.float32)
+            return True
             
         except Exception as e:
             logger.error(f"HSV feature extraction failed: {e}")
-            return np.array([])
+            return False
     
     def get_feature_name(self) -> str:
         return "HSV"
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Unified HOG Feature Engine
+Single HOG implementation with a cv2 fast path and the skimage training reference
+"""
+
+import time
+import threading
+import cv2
+import numpy as np
+from typing import Tuple, Dict, Any, List
+from ..core.logger import logger
+
+
+class HOGEngine:
+    """
+    HOG engine with two backends producing the training descriptor layout
+
+    'skimage' is the reference used during training. 'cv2' uses
+    cv2.HOGDescriptor configured with the same window, cell, block and
+    L2-Hys parameters, and reorders its output into skimage's
+    (block_row, block_col, cell_row, cell_col, orientation) layout. cv2 only
+    serves features after passing a parity check against the reference;
+    'auto' (opt-in) falls back to skimage when it does not. The parity
+    verdict is computed once per HOG configuration and shared by all engines.
+    """
+
+    BACKENDS = ('auto', 'cv2', 'skimage')
+
+    # Parity reports by (image_size, orientations, pixels_per_cell, cells_per_block, tolerance)
+    _parity_cache: Dict[Tuple, Dict[str, Any]] = {}
+    _parity_lock = threading.Lock()
+
+    def __init__(
+        self,
+        image_size: Tuple[int, int] = (256, 256),
+        orientations: int = 9,
+        pixels_per_cell: Tuple[int, int] = (8, 8),
+        cells_per_block: Tuple[int, int] = (2, 2),
+        backend: str = 'skimage',
+        parity_tolerance: float = 1e-4
+    ):
+        """
+        Initialize HOG engine
+
+        Args:
+            image_size: Expected (width, height) of the grayscale input
+            orientations: Number of orientation bins
+            pixels_per_cell: Cell size in pixels
+            cells_per_block: Block size in cells
+            backend: 'auto', 'cv2' or 'skimage'
+            parity_tolerance: Maximum absolute feature difference accepted for the cv2 backend
+        """
+        if backend.lower() not in self.BACKENDS:
+            raise ValueError(f"Unknown HOG backend: {backend}")
+
+        self.image_size = tuple(image_size)
+        self.orientations = orientations
+        self.pixels_per_cell = tuple(pixels_per_cell)
+        self.cells_per_block = tuple(cells_per_block)
+        self.parity_tolerance = parity_tolerance
+        self.requested_backend = backend.lower()
+
+        # cv2 descriptor with the training parameters (L2-Hys, unsigned gradients, no gamma)
+        cell_w, cell_h = self.pixels_per_cell[1], self.pixels_per_cell[0]
+        self._descriptor = cv2.HOGDescriptor(
+            self.image_size,                                                  # winSize
+            (cell_w * self.cells_per_block[1], cell_h * self.cells_per_block[0]),  # blockSize
+            (cell_w, cell_h),                                                 # blockStride
+            (cell_w, cell_h),                                                 # cellSize
+            orientations,                                                     # nbins
+            1,                                                                # derivAperture
+            -1,                                                               # winSigma
+            cv2.HOGDESCRIPTOR_L2HYS,                                          # histogramNormType
+            0.2,                                                              # L2HysThreshold
+            False,                                                            # gammaCorrection
+            64,                                                               # nlevels
+            False                                                             # signedGradient
+        )
+
+        self.parity_report: Dict[str, Any] = {}
+        if self.requested_backend == 'skimage':
+            self.backend = 'skimage'
+        else:
+            self.parity_report = self._cached_parity()
+            if self.parity_report['passed']:
+                self.backend = 'cv2'
+            elif self.requested_backend == 'cv2':
+                self.backend = 'cv2'
+                logger.warning(f"HOG cv2 backend forced despite failed parity check: {self.parity_report}")
+            else:
+                self.backend = 'skimage'
+                logger.info(f"HOG cv2 backend failed parity check, using skimage reference: {self.parity_report}")
+
+        logger.info(f"HOG engine initialized: {self.image_size}, backend={self.backend}, dims={self.feature_dimensions}")
+
+    @property
+    def block_grid(self) -> Tuple[int, int]:
+        """Number of blocks in (rows, cols)"""
+        width, height = self.image_size
+        cells_rows = height // self.pixels_per_cell[0]
+        cells_cols = width // self.pixels_per_cell[1]
+        return cells_rows - self.cells_per_block[0] + 1, cells_cols - self.cells_per_block[1] + 1
+
+    @property
+    def feature_dimensions(self) -> int:
+        """Number of features produced per image"""
+        blocks_rows, blocks_cols = self.block_grid
+        return blocks_rows * blocks_cols * self.cells_per_block[0] * self.cells_per_block[1] * self.orientations
+
+    def compute(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Compute HOG features with the active backend
+
+        Args:
+            gray: 2D uint8 grayscale image of size image_size
+
+        Returns:
+            float32 feature vector in skimage layout
+        """
+        if self.backend == 'cv2':
+            return self._compute_cv2(gray)
+        return self._compute_skimage(gray)
+
+    def _compute_skimage(self, gray: np.ndarray) -> np.ndarray:
+        """Reference implementation (exact training parameters)"""
+        from skimage.feature import hog
+
+        features = hog(gray,
+                       orientations=self.orientations,
+                       pixels_per_cell=self.pixels_per_cell,
+                       cells_per_block=self.cells_per_block,
+                       block_norm='L2-Hys',
+                       feature_vector=True,
+                       channel_axis=None)
+        return features.astype(np.float32)
+
+    def _compute_cv2(self, gray: np.ndarray) -> np.ndarray:
+        """cv2 fast path reordered into skimage layout"""
+        features = self._descriptor.compute(gray)
+        if features is None:
+            raise RuntimeError("HOG computation returned None")
+
+        # cv2 order: (block_x, block_y, cell_x, cell_y, bin) -> skimage (block_y, block_x, cell_y, cell_x, bin)
+        blocks_rows, blocks_cols = self.block_grid
+        features = features.reshape(
+            blocks_cols, blocks_rows, self.cells_per_block[1], self.cells_per_block[0], self.orientations
+        )
+        return np.ascontiguousarray(features.transpose(1, 0, 3, 2, 4)).ravel().astype(np.float32)
+
+    def _probe_images(self, count: int = 3) -> List[np.ndarray]:
+        """Deterministic face-like probe images for parity checks and benchmarks"""
+        rng = np.random.default_rng(0)
+        width, height = self.image_size
+        probes = []
+        for i in range(count):
+            noise = rng.integers(0, 256, (height, width), dtype=np.uint8)
+            probes.append(cv2.GaussianBlur(noise, (0, 0), 1.0 + 2.0 * i))
+        return probes
+
+    def _cached_parity(self) -> Dict[str, Any]:
+        """Parity report for this configuration, checked once per process"""
+        key = (self.image_size, self.orientations, self.pixels_per_cell, self.cells_per_block, self.parity_tolerance)
+        with self._parity_lock:
+            report = self._parity_cache.get(key)
+            if report is None:
+                report = self.check_parity()
+                self._parity_cache[key] = report
+        return dict(report)
+
+    def check_parity(self, count: int = 3) -> Dict[str, Any]:
+        """
+        Compare the cv2 backend against the skimage reference
+
+        Returns:
+            Dictionary with dimensions, max absolute difference, correlation and pass flag
+        """
+        max_diff = 0.0
+        correlations = []
+        dimensions_match = True
+        try:
+            for probe in self._probe_images(count):
+                reference = self._compute_skimage(probe)
+                fast = self._compute_cv2(probe)
+                if reference.shape != fast.shape:
+                    dimensions_match = False
+                    break
+                max_diff = max(max_diff, float(np.abs(reference - fast).max()))
+                correlations.append(float(np.corrcoef(reference, fast)[0, 1]))
+        except Exception as e:
+            logger.error(f"HOG parity check failed: {e}")
+            dimensions_match = False
+
+        return {
+            'dimensions_match': dimensions_match,
+            'max_abs_diff': max_diff,
+            'min_correlation': min(correlations) if correlations else 0.0,
+            'tolerance': self.parity_tolerance,
+            'passed': dimensions_match and max_diff <= self.parity_tolerance
+        }
+
+    def benchmark(self, iterations: int = 20) -> Dict[str, Dict[str, float]]:
+        """
+        Time both backends on the probe images
+
+        Returns:
+            Per-backend average and minimum latency in milliseconds
+        """
+        probes = self._probe_images()
+        results = {}
+        for name, compute in (('skimage', self._compute_skimage), ('cv2', self._compute_cv2)):
+            compute(probes[0])  # warm-up
+            latencies = []
+            for i in range(iterations):
+                start_time = time.perf_counter()
+                compute(probes[i % len(probes)])
+                latencies.append((time.perf_counter() - start_time) * 1000)
+            results[name] = {
+                'avg_latency_ms': float(np.mean(latencies)),
+                'min_latency_ms': float(np.min(latencies))
+            }
+        results['speedup'] = {'cv2_vs_skimage': results['skimage']['avg_latency_ms'] / results['cv2']['avg_latency_ms']}
+        return results
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Micro-Batching Inference Queue
+Collects feature rows from concurrent callers and runs one batched prediction per model
+"""
+
+import time
+import queue
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .model_manager import IModelManager
+from ..core.logger import logger
+
+
+class _InferenceRequest:
+    """Feature rows waiting for a batched prediction"""
+
+    __slots__ = ('model_name', 'features', 'enqueued', 'event', 'result')
+
+    def __init__(self, model_name: str, features: np.ndarray):
+        self.model_name = model_name
+        self.features = features
+        self.enqueued = time.perf_counter()
+        self.event = threading.Event()
+        self.result: List[Dict[str, Any]] = []
+
+
+class InferenceQueue(IModelManager):
+    """
+    Model manager front-end that micro-batches predictions
+
+    Callers block in predict_distribution while a single dispatcher thread
+    collects pending requests. It stops collecting when the batch reaches
+    max_batch_size rows, when max_wait_ms has passed since the oldest
+    request, or when every caller inside a track() scope has submitted. It
+    then stacks the rows per model, runs one predict_distribution call on
+    the wrapped manager and hands each caller its slice. A lone caller
+    inside track() is therefore never held for the window; callers outside
+    track() always wait up to max_wait_ms for company.
+
+    With a single predicting thread (e.g. the process-mode detection
+    worker) nothing is ever batched and every prediction pays the
+    dispatcher hop, so the queue is only worth enabling for concurrent
+    callers such as inline-mode DETECTION_REQUEST workers.
+
+    Everything other than prediction is delegated to the wrapped manager.
+    """
+
+    def __init__(self, model_manager: IModelManager, max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 request_timeout: float = 5.0):
+        """
+        Initialize inference queue
+
+        Args:
+            model_manager: Manager that runs the batched predictions
+            max_batch_size: Maximum rows per batch
+            max_wait_ms: Maximum time the oldest request waits for more rows
+            request_timeout: Seconds a caller waits for its result before giving up
+        """
+        self.model_manager = model_manager
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.request_timeout = request_timeout
+
+        self._queue: "queue.Queue[Optional[_InferenceRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._in_pipeline = 0
+
+        # Statistics
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_rows = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_inference_time = 0.0
+        self.timeouts = 0
+
+        logger.info(f"Inference queue initialized: max batch {max_batch_size} rows, window {max_wait_ms}ms")
+
+    def start(self) -> None:
+        """Start the dispatcher thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._dispatch_loop, name="inference-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the dispatcher thread (pending requests are still answered)"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """Check if the dispatcher thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """
+        Mark the calling thread as inside the detection pipeline
+
+        The dispatcher stops waiting for more rows once every tracked caller
+        has submitted, so batches only wait for requests that are on their way.
+        """
+        with self._lock:
+            self._in_pipeline += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_pipeline -= 1
+
+    def _dispatch_loop(self) -> None:
+        """Collect requests into batches until stopped"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            rows = len(first.features)
+            deadline = first.enqueued + self.max_wait
+
+            while rows < self.max_batch_size:
+                with self._lock:
+                    if self._in_pipeline and len(batch) >= self._in_pipeline:
+                        break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                rows += len(request.features)
+
+            self._run_batch(batch, rows)
+
+    def _run_batch(self, batch: List[_InferenceRequest], rows: int) -> None:
+        """Run one prediction per model and fan the results back out"""
+        start_time = time.perf_counter()
+        by_model: Dict[str, List[_InferenceRequest]] = {}
+        for request in batch:
+            by_model.setdefault(request.model_name, []).append(request)
+
+        for model_name, requests in by_model.items():
+            try:
+                stacked = np.vstack([request.features for request in requests])
+                results = self.model_manager.predict_distribution(model_name, stacked)
+            except Exception as e:
+                logger.error(f"Batched prediction failed for {model_name}: {e}")
+                results = []
+
+            offset = 0
+            for request in requests:
+                count = len(request.features)
+                if len(results) == len(stacked):
+                    request.result = results[offset:offset + count]
+                offset += count
+                request.event.set()
+
+        inference_time = time.perf_counter() - start_time
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.max_batch_rows = max(self.max_batch_rows, rows)
+            self.total_inference_time += inference_time
+            for request in batch:
+                wait_time = start_time - request.enqueued
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def predict_distribution(self, model_name: str, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Queue feature rows for the next batch and wait for their predictions"""
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+
+        if not self.is_running():
+            return self.model_manager.predict_distribution(model_name, features)
+
+        request = _InferenceRequest(model_name, features)
+        self._queue.put(request)
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+        if not request.event.wait(self.request_timeout):
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"Inference request for {model_name} timed out after {self.request_timeout}s")
+            return []
+        return request.result
+
+    def predict(self, model_name: str, features: np.ndarray) -> Tuple[Optional[str], float]:
+        """Make prediction through the queue"""
+        results = self.predict_distribution(model_name, features)
+        if not results:
+            return None, 0.0
+        return results[0]['ethnicity'], results[0]['confidence']
+
+    def predict_batch(self, model_name: str, features: np.ndarray) -> List[Tuple[Optional[str], float]]:
+        """Make predictions for all rows through the queue"""
+        results = self.predict_distribution(model_name, features)
+        if not results:
+            return [(None, 0.0)] * (len(features) if features.ndim > 1 else 1)
+        return [(result['ethnicity'], result['confidence']) for result in results]
+
+    def load_models(self, models_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Load models in the wrapped manager"""
+        return self.model_manager.load_models(models_dir)
+
+    def get_available_models(self) -> List[str]:
+        """Get list of available model names"""
+        return self.model_manager.get_available_models()
+
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
+        """Get information about a specific model"""
+        return self.model_manager.get_model_info(model_name, load)
+
+    def get_load_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get load time and size per model"""
+        return self.model_manager.get_load_stats()
+
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Get resident models and usage against the residency budget"""
+        return self.model_manager.get_residency_stats()
+
+    def reload_models(self, models_dir: Optional[str] = None,
+                      expected_features: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Hot-reload models in the wrapped manager (queued requests keep being served)"""
+        return self.model_manager.reload_models(models_dir, expected_features)
+
+    def __getattr__(self, name: str) -> Any:
+        # Manager-specific attributes (models, parity reports, ...) come from the wrapped manager
+        if name == 'model_manager':
+            raise AttributeError(name)
+        return getattr(self.model_manager, name)
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue depth, batch size and wait time metrics"""
+        with self._lock:
+            return {
+                'running': self.is_running(),
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'requests': self.requests,
+                'batches': self.batches,
+                'average_batch_rows': self.rows / self.batches if self.batches else 0.0,
+                'max_batch_rows': self.max_batch_rows,
+                'average_wait_ms': self.total_wait_time / self.requests * 1000 if self.requests else 0.0,
+                'max_wait_ms': self.max_wait_time * 1000,
+                'average_inference_ms': self.total_inference_time / self.batches * 1000 if self.batches else 0.0,
+                'timeouts': self.timeouts
+            }
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Vectorized Uniform LBP Engine
+Replacement for skimage local_binary_pattern(method='uniform') with exact training output
+"""
+
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Work buffers are kept for the most recent image shapes only
+MAX_CACHED_SHAPES = 4
+
+
+class LBPEngine:
+    """
+    Uniform LBP engine built on shifted-array comparisons
+
+    Neighbours that fall on the pixel grid are compared directly on uint8
+    data. Off-grid neighbours (the diagonals for P=8, R=1) use the same
+    per-row/per-column bilinear weights as skimage, so the codes are
+    identical. Codes map to uniform labels through a 2**P lookup table and
+    the histogram is built with np.bincount.
+    """
+
+    def __init__(self, n_points: int = 8, radius: float = 1.0):
+        """
+        Initialize LBP engine
+
+        Args:
+            n_points: Number of circularly symmetric neighbour points
+            radius: Radius of the circle of neighbours
+        """
+        if not 1 <= n_points <= 16:
+            raise ValueError("LBP engine supports between 1 and 16 neighbour points")
+
+        self.n_points = n_points
+        self.radius = radius
+        self.bins = n_points + 2  # uniform patterns 0..P plus one non-uniform bin
+
+        # Neighbour positions (same formula and rounding as skimage)
+        angles = 2 * np.pi * np.arange(n_points, dtype=np.float64) / n_points
+        self._rp = np.round(-radius * np.sin(angles), 5)
+        self._cp = np.round(radius * np.cos(angles), 5)
+        self._pad = int(np.ceil(radius)) + 1
+
+        self._lut = self._build_uniform_lut(n_points)
+        self._code_dtype = np.uint8 if n_points <= 8 else np.uint16
+        self._buffers: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_uniform_lut(n_points: int) -> np.ndarray:
+        """Map every raw P-bit pattern to its skimage 'uniform' label"""
+        lut = np.empty(2 ** n_points, dtype=np.uint8)
+        for code in range(2 ** n_points):
+            bits = [(code >> i) & 1 for i in range(n_points)]
+            # skimage counts transitions between consecutive points (no wrap-around)
+            changes = sum(bits[i] != bits[i + 1] for i in range(n_points - 1))
+            lut[code] = sum(bits) if changes <= 2 else n_points + 1
+        return lut
+
+    def _get_buffers(self, shape: Tuple[int, int]) -> Dict[str, Any]:
+        """Preallocated work buffers and interpolation weights for an image shape"""
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            if len(self._buffers) >= MAX_CACHED_SHAPES:
+                self._buffers.pop(next(iter(self._buffers)))
+            rows, cols = shape
+            padded_shape = (rows + 2 * self._pad, cols + 2 * self._pad)
+            points, column_weights = self._interpolation_weights(shape)
+            buffers = {
+                'padded': np.zeros(padded_shape, dtype=np.uint8),
+                'padded_float': np.zeros(padded_shape, dtype=np.float64),
+                'codes': np.zeros(shape, dtype=self._code_dtype),
+                'bit': np.zeros(shape, dtype=bool),
+                'texture': np.zeros(shape, dtype=np.float64),
+                'work': np.zeros(shape, dtype=np.float64),
+                'horizontal': [np.zeros((padded_shape[0], cols), dtype=np.float64) for _ in column_weights],
+                'horizontal_work': np.zeros((padded_shape[0], cols), dtype=np.float64),
+                'points': points,
+                'column_weights': column_weights
+            }
+            self._buffers[shape] = buffers
+        return buffers
+
+    def _interpolation_weights(self, shape: Tuple[int, int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Bilinear weights for every neighbour point
+
+        skimage evaluates top = (1 - dc) * top_left + dc * top_right per pixel,
+        where dc depends only on the column. Points sharing a column offset
+        therefore share one horizontally interpolated image, computed once for
+        all padded rows and then combined vertically per point.
+        """
+        rows, cols = shape
+        r = np.arange(rows, dtype=np.float64)
+        c = np.arange(cols, dtype=np.float64)
+
+        points: List[Dict[str, Any]] = []
+        column_weights: List[Dict[str, Any]] = []
+        column_keys: List[float] = []
+        for rp, cp in zip(self._rp, self._cp):
+            rr, cc = r + rp, c + cp
+            minr, maxr = np.floor(rr), np.ceil(rr)
+            minc, maxc = np.floor(cc), np.ceil(cc)
+            dr = (rr - minr)[:, None]
+            dc = (cc - minc)[None, :]
+
+            if not dc.any():
+                horizontal = None
+            else:
+                if cp not in column_keys:
+                    column_keys.append(cp)
+                    column_weights.append({
+                        'cols': (minc.astype(np.intp) + self._pad, maxc.astype(np.intp) + self._pad),
+                        'dc': dc, 'one_minus_dc': 1 - dc
+                    })
+                horizontal = column_keys.index(cp)
+
+            points.append({
+                'on_grid': horizontal is None and not dr.any(),
+                'horizontal': horizontal,
+                'rows': (minr.astype(np.intp) + self._pad, maxr.astype(np.intp) + self._pad),
+                'cols': (minc.astype(np.intp) + self._pad, maxc.astype(np.intp) + self._pad),
+                'dr': dr, 'one_minus_dr': 1 - dr
+            })
+        return points, column_weights
+
+    @staticmethod
+    def _window(image: np.ndarray, row_index: Optional[np.ndarray], col_index: Optional[np.ndarray]) -> np.ndarray:
+        """Shifted view of a padded image (falls back to gathering for irregular offsets)"""
+        if row_index is not None:
+            row_offset = row_index - np.arange(row_index.size)
+            if np.all(row_offset == row_offset[0]):
+                image = image[row_index[0]:row_index[-1] + 1]
+            else:
+                image = image[row_index]
+        if col_index is not None:
+            col_offset = col_index - np.arange(col_index.size)
+            if np.all(col_offset == col_offset[0]):
+                image = image[:, col_index[0]:col_index[-1] + 1]
+            else:
+                image = image[:, col_index]
+        return image
+
+    def compute_codes(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Compute raw LBP bit patterns (bit p set when neighbour p >= center)
+
+        Args:
+            gray: 2D uint8 grayscale image
+
+        Returns:
+            Array of raw P-bit codes (copy)
+        """
+        with self._lock:
+            return self._compute_codes(gray).copy()
+
+    def _compute_codes(self, gray: np.ndarray) -> np.ndarray:
+        """Compute raw LBP codes into the preallocated buffer"""
+        if gray.ndim != 2:
+            raise ValueError("LBP engine expects a 2D grayscale image")
+        if gray.dtype != np.uint8:
+            raise ValueError("LBP engine expects a uint8 image")
+
+        rows, cols = gray.shape
+        pad = self._pad
+        buffers = self._get_buffers((rows, cols))
+        padded, padded_float = buffers['padded'], buffers['padded_float']
+        codes, bit = buffers['codes'], buffers['bit']
+        texture, work = buffers['texture'], buffers['work']
+
+        # Zero padding reproduces skimage's constant (cval=0) border mode
+        padded[pad:pad + rows, pad:pad + cols] = gray
+        center = gray
+        center_float = None
+
+        # Horizontal interpolation shared by points with the same column offset
+        if buffers['column_weights']:
+            padded_float[pad:pad + rows, pad:pad + cols] = gray
+            center_float = padded_float[pad:pad + rows, pad:pad + cols]
+            horizontal_work = buffers['horizontal_work']
+            for horizontal, w in zip(buffers['horizontal'], buffers['column_weights']):
+                minc, maxc = w['cols']
+                np.multiply(w['one_minus_dc'], self._window(padded_float, None, minc), out=horizontal)
+                np.multiply(w['dc'], self._window(padded_float, None, maxc), out=horizontal_work)
+                np.add(horizontal, horizontal_work, out=horizontal)
+
+        codes.fill(0)
+        for p, point in enumerate(buffers['points']):
+            minr, maxr = point['rows']
+
+            if point['on_grid']:
+                neighbour = self._window(padded, minr, point['cols'][0])
+                np.greater_equal(neighbour, center, out=bit)
+            else:
+                if center_float is None:
+                    padded_float[pad:pad + rows, pad:pad + cols] = gray
+                    center_float = padded_float[pad:pad + rows, pad:pad + cols]
+
+                if point['horizontal'] is None:
+                    source = self._window(padded_float, None, point['cols'][0])
+                else:
+                    source = buffers['horizontal'][point['horizontal']]
+
+                # texture = (1 - dr) * top + dr * bottom
+                np.multiply(point['one_minus_dr'], self._window(source, minr, None), out=texture)
+                np.multiply(point['dr'], self._window(source, maxr, None), out=work)
+                np.add(texture, work, out=texture)
+
+                np.greater_equal(texture, center_float, out=bit)
+
+            np.bitwise_or(codes, np.left_shift(bit.view(np.uint8), p, dtype=self._code_dtype), out=codes)
+
+        return codes
+
+    def compute_labels(self, gray: np.ndarray) -> np.ndarray:
+        """Compute uniform LBP labels (0..P+1) for every pixel"""
+        with self._lock:
+            return self._lut[self._compute_codes(gray)]
+
+    def compute_histogram(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Compute the normalized uniform LBP histogram
+
+        Equivalent to np.histogram(local_binary_pattern(gray, P, R, 'uniform').ravel(),
+        bins=P+2, range=(0, P+2), density=True).
+
+        Args:
+            gray: 2D uint8 grayscale image
+
+        Returns:
+            float64 array with P+2 bins
+        """
+        with self._lock:
+            codes = self._compute_codes(gray)
+            pattern_counts = np.bincount(codes.ravel(), minlength=self._lut.size)
+
+        # Fold raw pattern counts into uniform bins (256 entries instead of every pixel)
+        counts = np.bincount(self._lut, weights=pattern_counts, minlength=self.bins)
+        return counts / counts.sum()
@@ -4,15 +4,29 @@ ML Model Manager with Factory Pattern
 Following SOLID principles for model loading and management
 """
 
-import pickle
 import json
+import time
+import threading
+import weakref
 import numpy as np
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
+from .model_store import ModelStore
+from .tree_engine import CompiledTreeEnsemble
 from ..core.logger import logger
 from ..core.config_manager import ConfigManager
 
+# Optional ONNX Runtime backend (pip install onnxruntime skl2onnx)
+try:
+    import onnxruntime as ort
+    from skl2onnx import to_onnx
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    ort = None
+    to_onnx = None
+    FloatTensorType = None
+
 
 class IModelManager(ABC):
     """Abstract interface for model management (Interface Segregation Principle)"""
@@ -27,15 +41,41 @@ class IModelManager(ABC):
         """Make prediction using specified model"""
         pass
     
+    def predict_batch(self, model_name: str, features: np.ndarray) -> List[Tuple[Optional[str], float]]:
+        """Make predictions for a (n_samples, n_features) array using specified model"""
+        return [self.predict(model_name, row) for row in features]
+    
+    def predict_distribution(self, model_name: str, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Make predictions with the full class distribution (empty if the model has none)"""
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        return [
+            {'ethnicity': ethnicity, 'confidence': confidence, 'probabilities': {}}
+            for ethnicity, confidence in self.predict_batch(model_name, features)
+        ]
+    
     @abstractmethod
     def get_available_models(self) -> List[str]:
         """Get list of available model names"""
         pass
     
     @abstractmethod
-    def get_model_info(self, model_name: str) -> Dict[str, Any]:
-        """Get information about a specific model"""
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
+        """Get information about a specific model (load=False never loads a lazily registered model)"""
         pass
+    
+    def get_load_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get load time and size per model (empty if not tracked)"""
+        return {}
+    
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Get resident models and usage against the residency budget (empty if not tracked)"""
+        return {}
+    
+    def reload_models(self, models_dir: Optional[str] = None,
+                      expected_features: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Load, check and swap in a new model set (not supported by default)"""
+        return {'success': False, 'models_dir': models_dir, 'models': {}, 'error': 'hot reload not supported'}
 
 
 class PickleModelManager(IModelManager):
@@ -43,8 +83,20 @@ class PickleModelManager(IModelManager):
     
     def __init__(self, config_manager: Optional[ConfigManager] = None):
         self.config_manager = config_manager or ConfigManager()
-        self.models: Dict[str, Any] = {}
+        store_config = self.config_manager.get_ml_config().get("model_store", {})
+        self.models = ModelStore(
+            mmap_mode=store_config.get("mmap_mode", "r"),
+            lazy_loading=store_config.get("lazy_loading", True),
+            max_resident_models=store_config.get("max_resident_models", 0),
+            max_resident_bytes=int(store_config.get("max_resident_mb", 0) * 1024 * 1024)
+        )
         self.feature_config: Dict[str, Any] = {}
+        self.models_dir: Optional[str] = None
+        
+        # Hot reload: one reload at a time, previous model set kept for rollback
+        self._reload_lock = threading.Lock()
+        self.previous_models: Optional[Tuple[ModelStore, Dict[str, Any], Optional[str]]] = None
+        self.last_reload: Dict[str, Any] = {}
         self.ethnicity_map = {
             0: "Jawa",
             1: "Batak", 
@@ -64,6 +116,18 @@ class PickleModelManager(IModelManager):
             logger.error(f"Models directory does not exist: {models_dir}")
             return {}
         
+        store = self._build_store(models_path)
+        self.models = store
+        self.models_dir = str(models_dir)
+        
+        # Load feature configuration
+        self.feature_config = self._read_feature_config(models_path)
+        
+        logger.info(f"Successfully registered {len(store)} models (lazy loading: {store.lazy_loading})")
+        return store
+    
+    def _build_store(self, models_path: Path) -> ModelStore:
+        """Register the enabled models of a directory in a new store with the current residency settings"""
         # Get enabled models from config
         enabled_models = self.config_manager.get_enabled_models()
         model_files = {}
@@ -82,88 +146,298 @@ class PickleModelManager(IModelManager):
                 if model_name in filename_mapping:
                     model_files[model_name] = filename_mapping[model_name]
         
-        loaded_models = {}
+        store = ModelStore(
+            mmap_mode=self.models.mmap_mode,
+            lazy_loading=self.models.lazy_loading,
+            max_resident_models=self.models.max_resident_models,
+            max_resident_bytes=self.models.max_resident_bytes
+        )
         
         for model_name, filename in model_files.items():
             model_path = models_path / filename
-            if model_path.exists():
+            if model_path.exists() or model_path.with_suffix('.joblib').exists():
                 try:
-                    with open(model_path, 'rb') as f:
-                        model = pickle.load(f)
-                    loaded_models[model_name] = model
-                    logger.info(f"Loaded {model_name} model from {filename}")
+                    # Lazy stores only record the path; the model is read on first use
+                    store.register(model_name, model_path)
+                    logger.info(f"Registered {model_name} model from {filename}")
                 except Exception as e:
                     logger.error(f"Failed to load {model_name} from {filename}: {e}")
             else:
                 logger.warning(f"Model file not found: {filename}")
         
-        self.models = loaded_models
-        
-        # Load feature configuration
-        self._load_feature_config(models_path)
-        
-        logger.info(f"Successfully loaded {len(loaded_models)} models")
-        return loaded_models
+        return store
     
-    def _load_feature_config(self, models_path: Path) -> None:
-        """Load feature extraction configuration"""
+    def _read_feature_config(self, models_path: Path) -> Dict[str, Any]:
+        """Read feature extraction configuration"""
         config_file = models_path / "feature_sets_summary_20250925_133309.json"
         if config_file.exists():
             try:
                 with open(config_file, 'r') as f:
-                    self.feature_config = json.load(f)
+                    feature_config = json.load(f)
                 logger.info("Loaded feature configuration")
+                return feature_config
             except Exception as e:
                 logger.error(f"Failed to load feature config: {e}")
-                self.feature_config = {}
+                return {}
         else:
             logger.warning("Feature configuration file not found")
-            self.feature_config = {}
+            return {}
+    
+    def reload_models(self, models_dir: Optional[str] = None,
+                      expected_features: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Load, check and swap in a new model set without interrupting predictions
+        
+        Every model of the new directory is loaded into a separate store and
+        warmed with a probe prediction while the current set keeps serving.
+        The new set is swapped in with a single assignment only if every model
+        passes its checks and no current model is missing; otherwise the
+        current set stays in place. The replaced set is kept for rollback_models().
+        
+        Args:
+            models_dir: Directory to load (defaults to the current models directory)
+            expected_features: Feature dimension per model the extractors produce
+            
+        Returns:
+            Reload report with success flag, per-model checks and timings
+        """
+        with self._reload_lock:
+            models_dir = str(models_dir or self.models_dir or self.config_manager.get_models_dir())
+            report: Dict[str, Any] = {'success': False, 'models_dir': models_dir, 'models': {}, 'error': None}
+            start_time = time.perf_counter()
+            
+            try:
+                models_path = Path(models_dir)
+                if not models_path.is_dir():
+                    raise ValueError(f"models directory does not exist: {models_dir}")
+                
+                store = self._build_store(models_path)
+                missing = sorted(set(self.models) - set(store))
+                if missing:
+                    raise ValueError(f"models missing from new set: {missing}")
+                
+                # Currently resident models are loaded last so they stay resident under the budget
+                current = self.models
+                resident = set(current.get_residency_stats()['resident_models']) if isinstance(current, ModelStore) else set()
+                for model_name in sorted(store, key=lambda name: name in resident):
+                    check = self._prepare_model(model_name, store, (expected_features or {}).get(model_name))
+                    report['models'][model_name] = check
+                    if not check['passed']:
+                        raise ValueError(f"{model_name} failed checks: {check.get('error')}")
+                
+                feature_config = self._read_feature_config(models_path)
+                
+                # Swap: predictions read self.models once, so each uses either the old or the new set
+                self.previous_models = (self.models, self.feature_config, self.models_dir)
+                self.models = store
+                self.feature_config = feature_config
+                self.models_dir = models_dir
+                self._commit_prepared()
+                
+                # Old models stay registered for rollback but leave memory once in-flight predictions finish
+                previous_store = self.previous_models[0]
+                if isinstance(previous_store, ModelStore):
+                    for model_name in list(previous_store):
+                        previous_store.unload(model_name)
+                
+                report['success'] = True
+                logger.info(f"Hot-swapped {len(store)} models from {models_dir}")
+                
+            except Exception as e:
+                self._discard_prepared()
+                report['error'] = str(e)
+                logger.error(f"Model reload from {models_dir} rejected, keeping current models: {e}")
+            
+            report['reload_time_ms'] = (time.perf_counter() - start_time) * 1000
+            self.last_reload = report
+            return report
+    
+    def rollback_models(self) -> bool:
+        """
+        Swap the model set replaced by the last successful reload back in
+        
+        Returns:
+            True if a previous set was restored
+        """
+        with self._reload_lock:
+            if self.previous_models is None:
+                logger.warning("No previous model set to roll back to")
+                return False
+            
+            store, feature_config, models_dir = self.previous_models
+            self.previous_models = (self.models, self.feature_config, self.models_dir)
+            self.models = store
+            self.feature_config = feature_config
+            self.models_dir = models_dir
+            logger.info(f"Rolled back to models from {models_dir}")
+            return True
+    
+    def _prepare_model(self, model_name: str, store: ModelStore, expected_features: Optional[int]) -> Dict[str, Any]:
+        """
+        Load, check and warm a model of a new set before it is swapped in
+        
+        Args:
+            model_name: Name of the model
+            store: Store holding the new set (not installed yet)
+            expected_features: Feature dimension the extractors produce (None skips the check)
+            
+        Returns:
+            Check report with 'passed' flag
+        """
+        check: Dict[str, Any] = {'passed': False}
+        try:
+            model = store[model_name]
+        except Exception as e:
+            check['error'] = f"failed to load: {e}"
+            return check
+        
+        n_features = getattr(model, 'n_features_in_', None)
+        check.update({'type': type(model).__name__, 'n_features': n_features})
+        
+        if not hasattr(model, 'predict_proba') and not hasattr(model, 'predict'):
+            check['error'] = "model has no predict method"
+            return check
+        
+        if expected_features is not None and n_features is not None and n_features != expected_features:
+            check['error'] = f"model expects {n_features} features, extractors produce {expected_features}"
+            return check
+        
+        try:
+            # Probe prediction pays sklearn's first-call cost off the detection path
+            start_time = time.perf_counter()
+            probe = np.zeros((1, n_features or expected_features or 1), dtype=np.float32)
+            if hasattr(model, 'predict_proba'):
+                model.predict_proba(probe)
+            else:
+                model.predict(probe)
+            check['warm_up_ms'] = (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            check['error'] = f"warm-up prediction failed: {e}"
+            return check
+        
+        check['passed'] = True
+        return check
+    
+    def _commit_prepared(self) -> None:
+        """Install per-model state built by _prepare_model after a successful swap"""
+        pass
+    
+    def _discard_prepared(self) -> None:
+        """Drop per-model state built by _prepare_model after a rejected reload"""
+        pass
     
     def predict(self, model_name: str, features: np.ndarray) -> Tuple[Optional[str], float]:
-        """Make prediction using specified model"""
-        if model_name not in self.models:
-            logger.error(f"Model not found: {model_name}")
+        """Make prediction using specified model (single predict_proba call)"""
+        results = self.predict_distribution(model_name, features)
+        if not results:
             return None, 0.0
         
+        ethnicity, confidence = results[0]['ethnicity'], results[0]['confidence']
+        logger.debug(f"Prediction: {ethnicity} (confidence: {confidence:.3f}) using {model_name}")
+        return ethnicity, confidence
+    
+    def predict_batch(self, model_name: str, features: np.ndarray) -> List[Tuple[Optional[str], float]]:
+        """Make predictions for all rows with a single predict_proba call"""
+        results = self.predict_distribution(model_name, features)
+        if not results:
+            return [(None, 0.0)] * (len(features) if features.ndim > 1 else 1)
+        return [(result['ethnicity'], result['confidence']) for result in results]
+    
+    def predict_distribution(self, model_name: str, features: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Probability-first inference
+        
+        Runs predict_proba once and derives each label from the argmax via
+        classes_, so no second predict() pass is needed.
+        
+        Args:
+            model_name: Name of the model
+            features: Feature row or (n_samples, n_features) array
+            
+        Returns:
+            One {'ethnicity', 'confidence', 'probabilities'} dictionary per sample,
+            or an empty list if prediction fails
+        """
+        # One read of the model table, so a concurrent hot reload cannot split this prediction
+        models = self.models
+        if model_name not in models:
+            logger.error(f"Model not found: {model_name}")
+            return []
+        
         try:
-            model = self.models[model_name]
+            model = models[model_name]
             
             # Ensure features are in correct shape
             if features.ndim == 1:
                 features = features.reshape(1, -1)
             
-            # Make prediction
-            prediction = model.predict(features)[0]
+            if not hasattr(model, 'predict_proba'):
+                # Fallback for models without probabilities
+                return [
+                    {'ethnicity': self.ethnicity_map.get(prediction, "Unknown"), 'confidence': 0.8, 'probabilities': {}}
+                    for prediction in model.predict(features)
+                ]
             
-            # Get confidence (probability of predicted class)
-            if hasattr(model, 'predict_proba'):
-                probabilities = model.predict_proba(features)
-                confidence = probabilities.max()
-            else:
-                # Fallback confidence calculation
-                confidence = 0.8  # Default confidence
+            probabilities = self._predict_proba(model_name, model, features)
+            best = probabilities.argmax(axis=1)
+            class_names = [self.ethnicity_map.get(label, "Unknown") for label in model.classes_]
             
-            # Map prediction to ethnicity name
-            ethnicity = self.ethnicity_map.get(prediction, "Unknown")
+            results = []
+            for row, best_index in zip(probabilities, best):
+                distribution: Dict[str, float] = {}
+                for name, probability in zip(class_names, row):
+                    distribution[name] = distribution.get(name, 0.0) + float(probability)
+                results.append({
+                    'ethnicity': class_names[best_index],
+                    'confidence': float(row[best_index]),
+                    'probabilities': distribution
+                })
             
-            logger.debug(f"Prediction: {ethnicity} (confidence: {confidence:.3f}) using {model_name}")
-            return ethnicity, confidence
+            logger.debug(f"Predicted {len(results)} samples using {model_name}")
+            return results
             
         except Exception as e:
             logger.error(f"Prediction failed for model {model_name}: {e}")
-            return None, 0.0
+            return []
+    
+    def _predict_proba(self, model_name: str, model: Any, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (n_samples, n_features) array"""
+        return model.predict_proba(features)
     
     def get_available_models(self) -> List[str]:
         """Get list of available model names"""
         return list(self.models.keys())
     
-    def get_model_info(self, model_name: str) -> Dict[str, Any]:
-        """Get information about a specific model"""
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
+        """
+        Get information about a specific model
+        
+        A model that is not loaded yet is described from the manifest; without
+        a manifest entry it is loaded, unless load is False.
+        """
         if model_name not in self.models:
             return {}
         
-        model = self.models[model_name]
+        metadata = self.models.get_metadata(model_name) if isinstance(self.models, ModelStore) else {}
+        lazy = isinstance(self.models, ModelStore) and not self.models.is_loaded(model_name)
+        if lazy and (metadata or not load):
+            info = {
+                'name': model_name,
+                'type': metadata.get('type'),
+                'available': True,
+                'loaded': False
+            }
+            if metadata.get('n_features') is not None:
+                info['n_features'] = metadata['n_features']
+            if metadata.get('classes') is not None:
+                info['classes'] = metadata['classes']
+            return info
+        
+        try:
+            model = self.models[model_name]
+        except Exception as e:
+            logger.error(f"Failed to load model {model_name}: {e}")
+            return {}
         info = {
             'name': model_name,
             'type': type(model).__name__,
@@ -182,11 +456,272 @@ class PickleModelManager(IModelManager):
         
         return info
     
+    def get_load_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get load time, size and residency hit/miss counters per model"""
+        return self.models.get_stats() if isinstance(self.models, ModelStore) else {}
+    
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Get resident models and usage against the residency budget"""
+        return self.models.get_residency_stats() if isinstance(self.models, ModelStore) else {}
+    
     def get_feature_config(self) -> Dict[str, Any]:
         """Get feature configuration"""
         return self.feature_config
 
 
+class CompiledTreeModelManager(PickleModelManager):
+    """
+    Model manager serving tree ensembles through array-compiled inference
+    
+    Models are loaded like PickleModelManager. On first use each supported
+    tree model is flattened into a CompiledTreeEnsemble and checked against
+    sklearn's predict_proba. Only a model that passes the check is served by
+    the compiled engine. Unsupported types, or a model that fails the check,
+    use sklearn.
+    
+    Opt-in: select it with ml.manager = "compiled_tree" (the default is "pickle").
+    """
+    
+    def __init__(self, config_manager: Optional[ConfigManager] = None, parity_tolerance: float = 1e-9):
+        super().__init__(config_manager)
+        self.parity_tolerance = parity_tolerance
+        self._compile_lock = threading.Lock()
+        # model name -> (weak reference to the source model, engine or None for sklearn fallback)
+        self.compiled: Dict[str, Tuple[weakref.ref, Optional[CompiledTreeEnsemble]]] = {}
+        self.parity_reports: Dict[str, Dict[str, Any]] = {}
+        # Engines compiled for a reload in progress, installed when the new set is swapped in
+        self._staged_engines: Dict[str, Tuple[weakref.ref, Optional[CompiledTreeEnsemble], Optional[Dict[str, Any]]]] = {}
+        logger.info(f"Compiled tree model manager initialized (parity tolerance {parity_tolerance})")
+    
+    def get_engine(self, model_name: str, model: Any) -> Optional[CompiledTreeEnsemble]:
+        """
+        Get (or compile) the engine for a loaded model
+        
+        The engine is rebuilt when the model object changes, e.g. after the
+        model store evicted and reloaded it. Engines of evicted models are
+        dropped so they do not outlive the residency budget.
+        
+        Returns:
+            Verified compiled engine, or None if the model is served by sklearn
+        """
+        with self._compile_lock:
+            entry = self.compiled.get(model_name)
+            if entry is not None and entry[0]() is model:
+                return entry[1]
+            
+            self.compiled = {name: item for name, item in self.compiled.items() if item[0]() is not None}
+            
+            engine, report = self._compile_engine(model_name, model)
+            if report is not None:
+                self.parity_reports[model_name] = report
+            if report is not None and not report['passed']:
+                logger.error(f"Compiled {model_name} failed parity check, using sklearn: {report}")
+            
+            self.compiled[model_name] = (weakref.ref(model), engine)
+            return engine
+    
+    def _compile_engine(self, model_name: str, model: Any) -> Tuple[Optional[CompiledTreeEnsemble], Optional[Dict[str, Any]]]:
+        """
+        Compile a model and check it against sklearn
+        
+        Returns:
+            Tuple of (engine if parity passed else None, parity report or None if the type is not supported)
+        """
+        try:
+            start_time = time.perf_counter()
+            candidate = CompiledTreeEnsemble(model)
+            report = candidate.check_parity(model, tolerance=self.parity_tolerance)
+            report['compile_time_ms'] = (time.perf_counter() - start_time) * 1000
+        except ValueError as e:
+            logger.info(f"Serving {model_name} with sklearn: {e}")
+            return None, None
+        
+        if not report['passed']:
+            return None, report
+        
+        logger.info(f"Compiled {model_name}: {candidate.n_trees} trees, {candidate.node_count} nodes "
+                    f"in {report['compile_time_ms']:.0f}ms (parity max diff {report['max_abs_diff']:.2e})")
+        return candidate, report
+    
+    def _prepare_model(self, model_name: str, store: ModelStore, expected_features: Optional[int]) -> Dict[str, Any]:
+        """Check and warm a new model, compiling it off the detection path (a failed parity check rejects it)"""
+        check = super()._prepare_model(model_name, store, expected_features)
+        if not check['passed']:
+            return check
+        
+        model = store[model_name]
+        engine, report = self._compile_engine(model_name, model)
+        check['inference'] = 'compiled' if engine is not None else 'sklearn'
+        if report is not None:
+            check['parity'] = report
+            if not report['passed']:
+                check['passed'] = False
+                check['error'] = f"compiled engine failed parity check (max diff {report['max_abs_diff']:.2e})"
+                return check
+        
+        self._staged_engines[model_name] = (weakref.ref(model), engine, report)
+        return check
+    
+    def _commit_prepared(self) -> None:
+        """Install the engines compiled for the swapped-in models"""
+        with self._compile_lock:
+            for model_name, (model_ref, engine, report) in self._staged_engines.items():
+                self.compiled[model_name] = (model_ref, engine)
+                if report is not None:
+                    self.parity_reports[model_name] = report
+            self._staged_engines = {}
+    
+    def _discard_prepared(self) -> None:
+        """Drop engines compiled for a rejected reload"""
+        self._staged_engines = {}
+    
+    def _predict_proba(self, model_name: str, model: Any, features: np.ndarray) -> np.ndarray:
+        """Class probabilities from the compiled engine, or sklearn if the model was not compiled"""
+        engine = self.get_engine(model_name, model)
+        if engine is None:
+            return model.predict_proba(features)
+        return engine.predict_proba(features)
+    
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
+        """Get information about a specific model, including its inference engine"""
+        info = super().get_model_info(model_name, load)
+        if info and model_name in self.parity_reports:
+            info['inference'] = 'compiled' if self.compiled.get(model_name, (None, None))[1] is not None else 'sklearn'
+            info['parity'] = self.parity_reports[model_name]
+        return info
+
+
+class OnnxModelManager(PickleModelManager):
+    """
+    Model manager serving predictions through ONNX Runtime's CPU provider
+    
+    Models are loaded like PickleModelManager. Each one is converted to ONNX
+    once with skl2onnx, and the result is cached as <model>.onnx next to the
+    pickle. The cache is rebuilt when the pickle is newer. Sessions run on
+    CPUExecutionProvider with a fixed intra-op thread count. Models that
+    fail to convert are served by sklearn.
+    """
+    
+    def __init__(self, config_manager: Optional[ConfigManager] = None, intra_op_threads: int = 1):
+        if ort is None or to_onnx is None:
+            raise ImportError("ONNX model manager requires onnxruntime and skl2onnx (pip install onnxruntime skl2onnx)")
+        
+        super().__init__(config_manager)
+        self.intra_op_threads = intra_op_threads
+        self._session_lock = threading.Lock()
+        # model name -> (weak reference to the source model, session or None, input name, probability output name)
+        self.sessions: Dict[str, Tuple[weakref.ref, Any, Optional[str], Optional[str]]] = {}
+        self.conversion_reports: Dict[str, Dict[str, Any]] = {}
+        # Sessions created for a reload in progress, installed when the new set is swapped in
+        self._staged_sessions: Dict[str, Tuple[weakref.ref, Any, Optional[str], Optional[str]]] = {}
+        logger.info(f"ONNX model manager initialized (onnxruntime {ort.__version__}, {intra_op_threads} intra-op threads)")
+    
+    def _load_onnx_bytes(self, model_name: str, model: Any, source_path: Optional[Path] = None) -> bytes:
+        """Get the ONNX graph for a model, converting and caching it if needed"""
+        if source_path is None and isinstance(self.models, ModelStore):
+            source_path = self.models.get_path(model_name)
+        onnx_path = source_path.with_suffix('.onnx') if source_path is not None else None
+        
+        if onnx_path is not None and onnx_path.exists() and onnx_path.stat().st_mtime >= source_path.stat().st_mtime:
+            self.conversion_reports[model_name] = {'cached': True, 'file': onnx_path.name}
+            return onnx_path.read_bytes()
+        
+        start_time = time.perf_counter()
+        onnx_model = to_onnx(
+            model,
+            initial_types=[('input', FloatTensorType([None, model.n_features_in_]))],
+            options={id(model): {'zipmap': False}}
+        )
+        onnx_bytes = onnx_model.SerializeToString()
+        self.conversion_reports[model_name] = {
+            'cached': False,
+            'conversion_time_ms': (time.perf_counter() - start_time) * 1000,
+            'file': onnx_path.name if onnx_path is not None else None
+        }
+        
+        if onnx_path is not None:
+            try:
+                onnx_path.write_bytes(onnx_bytes)
+            except OSError as e:
+                logger.warning(f"Could not cache ONNX model {onnx_path}: {e}")
+        
+        logger.info(f"Converted {model_name} to ONNX in {self.conversion_reports[model_name]['conversion_time_ms']:.0f}ms")
+        return onnx_bytes
+    
+    def get_session(self, model_name: str, model: Any) -> Tuple[Any, Optional[str], Optional[str]]:
+        """
+        Get (or create) the inference session for a loaded model
+        
+        Returns:
+            Tuple of (session, input name, probability output name); session is None if
+            the model is served by sklearn
+        """
+        with self._session_lock:
+            entry = self.sessions.get(model_name)
+            if entry is not None and entry[0]() is model:
+                return entry[1], entry[2], entry[3]
+            
+            self.sessions = {name: item for name, item in self.sessions.items() if item[0]() is not None}
+            
+            session, input_name, output_name = self._create_session(model_name, model)
+            self.sessions[model_name] = (weakref.ref(model), session, input_name, output_name)
+            return session, input_name, output_name
+    
+    def _create_session(self, model_name: str, model: Any,
+                        source_path: Optional[Path] = None) -> Tuple[Any, Optional[str], Optional[str]]:
+        """Convert a model and open its session (session is None if conversion fails)"""
+        try:
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            options.inter_op_num_threads = 1
+            session = ort.InferenceSession(
+                self._load_onnx_bytes(model_name, model, source_path), options, providers=['CPUExecutionProvider']
+            )
+            # Classifier graphs output (label, probabilities)
+            return session, session.get_inputs()[0].name, session.get_outputs()[-1].name
+        except Exception as e:
+            logger.error(f"ONNX conversion failed for {model_name}, using sklearn: {e}")
+            return None, None, None
+    
+    def _prepare_model(self, model_name: str, store: ModelStore, expected_features: Optional[int]) -> Dict[str, Any]:
+        """Check and warm a new model, converting it to ONNX off the detection path"""
+        check = super()._prepare_model(model_name, store, expected_features)
+        if not check['passed']:
+            return check
+        
+        # The new store is not installed yet, so the ONNX cache path comes from it
+        model = store[model_name]
+        session, input_name, output_name = self._create_session(model_name, model, store.get_path(model_name))
+        check['inference'] = 'onnx' if session is not None else 'sklearn'
+        self._staged_sessions[model_name] = (weakref.ref(model), session, input_name, output_name)
+        return check
+    
+    def _commit_prepared(self) -> None:
+        """Install the sessions created for the swapped-in models"""
+        with self._session_lock:
+            self.sessions.update(self._staged_sessions)
+            self._staged_sessions = {}
+    
+    def _discard_prepared(self) -> None:
+        """Drop sessions created for a rejected reload"""
+        self._staged_sessions = {}
+    
+    def _predict_proba(self, model_name: str, model: Any, features: np.ndarray) -> np.ndarray:
+        """Class probabilities from ONNX Runtime, or sklearn if the model was not converted"""
+        session, input_name, output_name = self.get_session(model_name, model)
+        if session is None:
+            return model.predict_proba(features)
+        return session.run([output_name], {input_name: features.astype(np.float32)})[0]
+    
+    def get_model_info(self, model_name: str, load: bool = True) -> Dict[str, Any]:
+        """Get information about a specific model, including its inference backend"""
+        info = super().get_model_info(model_name, load)
+        if info and model_name in self.sessions:
+            info['inference'] = 'onnx' if self.sessions[model_name][1] is not None else 'sklearn'
+            info['conversion'] = self.conversion_reports.get(model_name, {})
+        return info
+
+
 class ModelManagerFactory:
     """Factory for creating model managers"""
     
@@ -194,7 +729,9 @@ class ModelManagerFactory:
     def create_manager(manager_type: str = "pickle", config_manager: Optional[ConfigManager] = None, **kwargs) -> IModelManager:
         """Create model manager based on type"""
         managers = {
-            'pickle': PickleModelManager
+            'pickle': PickleModelManager,
+            'compiled_tree': CompiledTreeModelManager,
+            'onnx': OnnxModelManager
         }
         
         if manager_type.lower() not in managers:
@@ -203,7 +740,7 @@ class ModelManagerFactory:
         manager_class = managers[manager_type.lower()]
         logger.info(f"Creating {manager_type} model manager")
         
-        if manager_type.lower() == 'pickle':
+        if issubclass(manager_class, PickleModelManager):
             return manager_class(config_manager=config_manager, **kwargs)
         else:
             return manager_class(**kwargs)
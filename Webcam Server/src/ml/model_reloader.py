@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Background Model Reloader
+Watches the models directory and runs hot reloads off the detection path
+"""
+
+import time
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from ..core.logger import logger
+
+# Files whose changes trigger a reload
+WATCHED_SUFFIXES = ('.pkl', '.joblib', '.json')
+
+
+class ModelReloader:
+    """
+    Runs model hot reloads on a background thread
+
+    Reloads come from request_reload() (e.g. a RELOAD_MODELS client command)
+    or, when watching is enabled, from changes to the model files in the
+    current models directory. A change only triggers a reload once the
+    directory listing is unchanged for one more poll, so models that are
+    still being copied are not picked up half-written.
+
+    The target does the actual work through reload_models(models_dir), which
+    must keep serving the current models until the new set is ready.
+    Requested directories must lie inside the models root (the parent of
+    the configured models directory), since loading a model runs pickle.
+    """
+
+    def __init__(self, target: Any, models_dir: str, poll_interval: float = 5.0, watch: bool = True):
+        """
+        Initialize model reloader
+
+        Args:
+            target: Object with reload_models(models_dir) returning a report with a 'success' flag
+            models_dir: Models directory currently served
+            poll_interval: Seconds between directory checks
+            watch: Reload automatically when the model files change
+        """
+        self.target = target
+        self.models_dir = str(models_dir)
+        self.models_root = Path(models_dir).resolve().parent
+        self.poll_interval = poll_interval
+        self.watch = watch
+
+        self._requests: "queue.Queue[Optional[Tuple[str, Optional[str]]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._snapshot(self.models_dir)
+        self._pending_signature: Optional[Dict[str, Tuple[int, int]]] = None
+
+        # Statistics
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_report: Dict[str, Any] = {}
+
+        logger.info(f"Model reloader initialized: {self.models_dir} (watch: {watch}, poll {poll_interval}s)")
+
+    @staticmethod
+    def _snapshot(models_dir: str) -> Dict[str, Tuple[int, int]]:
+        """Size and modification time of the watched files in a directory"""
+        snapshot = {}
+        try:
+            for path in Path(models_dir).iterdir():
+                if path.suffix in WATCHED_SUFFIXES and path.is_file():
+                    stat = path.stat()
+                    snapshot[path.name] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        return snapshot
+
+    def start(self) -> None:
+        """Start the reload thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the reload thread (a reload in progress finishes first)"""
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """Check if the reload thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def request_reload(self, models_dir: Optional[str] = None) -> bool:
+        """
+        Queue a reload without blocking
+
+        Args:
+            models_dir: Directory to switch to (defaults to the current one)
+
+        Returns:
+            True if the request was queued, False if the directory is not allowed
+        """
+        if models_dir:
+            resolved = Path(models_dir).resolve()
+            if resolved.parent != self.models_root or not resolved.is_dir():
+                logger.warning(f"Reload of {models_dir} refused: not a directory in {self.models_root}")
+                return False
+
+        self._requests.put(('request', models_dir or None))
+        return True
+
+    def _run(self) -> None:
+        """Serve reload requests and poll the models directory until stopped"""
+        while True:
+            try:
+                request = self._requests.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self.watch and self._files_changed():
+                    self.reload()
+                continue
+
+            if request is None:
+                break
+            self.reload(request[1])
+
+    def _files_changed(self) -> bool:
+        """Check for a model file change that has been stable for one poll"""
+        signature = self._snapshot(self.models_dir)
+        if signature == self._signature:
+            self._pending_signature = None
+            return False
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return False
+        return True
+
+    def reload(self, models_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Run a reload in the calling thread"""
+        models_dir = models_dir or self.models_dir
+        logger.info(f"Reloading models from {models_dir}")
+
+        try:
+            report = self.target.reload_models(models_dir)
+        except Exception as e:
+            report = {'success': False, 'models_dir': models_dir, 'error': str(e)}
+            logger.error(f"Model reload failed: {e}")
+
+        # Rejected sets are not retried until the files change again
+        self._pending_signature = None
+        if report.get('success'):
+            self.reloads += 1
+            self.models_dir = str(report.get('models_dir', models_dir))
+            self._signature = self._snapshot(self.models_dir)
+        else:
+            self.failed_reloads += 1
+            if str(models_dir) == self.models_dir:
+                self._signature = self._snapshot(self.models_dir)
+
+        report['timestamp'] = time.time()
+        self.last_report = report
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reload counters and the last reload outcome"""
+        return {
+            'running': self.is_running(),
+            'models_dir': self.models_dir,
+            'watching': self.watch,
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_success': self.last_report.get('success'),
+            'last_error': self.last_report.get('error'),
+            'last_reload_ms': self.last_report.get('reload_time_ms', 0.0)
+        }
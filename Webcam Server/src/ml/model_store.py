@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Lazy Model Store
+Memory-mapped joblib model artifacts loaded on first use, with load time and size reporting
+and an LRU residency budget
+"""
+
+import json
+import time
+import pickle
+import threading
+import joblib
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from ..core.logger import logger
+
+
+MANIFEST_FILENAME = "model_store_manifest.json"
+
+
+def estimate_model_size(model: Any) -> Tuple[int, int]:
+    """
+    Estimate the array payload of a model
+
+    Walks the model's attributes (including Cython objects such as sklearn
+    trees that expose their arrays through __getstate__) and sums numpy
+    array sizes.
+
+    Returns:
+        Tuple of (resident_bytes, mapped_bytes) where mapped_bytes are
+        backed by a memory-mapped file rather than process memory
+    """
+    resident = mapped = 0
+    # Objects are kept alive so temporary __getstate__ results cannot recycle an id
+    seen: Dict[int, Any] = {}
+    stack = [model]
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+            continue
+        seen[id(obj)] = obj
+
+        if isinstance(obj, np.ndarray):
+            if isinstance(obj, np.memmap):
+                mapped += obj.nbytes
+            elif not isinstance(obj.base, np.ndarray):
+                resident += obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.extend(vars(obj).values())
+        else:
+            try:
+                state = obj.__getstate__()
+            except Exception:
+                state = None
+            if isinstance(state, dict):
+                stack.extend(state.values())
+
+    return resident, mapped
+
+
+def convert_pickle_models(models_dir: Union[str, Path], output_dir: Optional[Union[str, Path]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Convert every .pkl model in a directory to an uncompressed joblib artifact
+
+    Uncompressed joblib files store numpy arrays as raw buffers, so they can
+    be opened with mmap_mode. A manifest with each model's type, feature
+    count and classes is written next to the artifacts, which lets the
+    server verify models without loading them.
+
+    Args:
+        models_dir: Directory containing the .pkl models
+        output_dir: Directory for the .joblib files (defaults to models_dir)
+
+    Returns:
+        Manifest entries by model file stem
+    """
+    models_path = Path(models_dir)
+    output_path = Path(output_dir) if output_dir else models_path
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    manifest = {}
+    for pickle_path in sorted(models_path.glob("*.pkl")):
+        try:
+            start_time = time.perf_counter()
+            with open(pickle_path, 'rb') as f:
+                model = pickle.load(f)
+            pickle_load_time = time.perf_counter() - start_time
+
+            joblib_path = output_path / f"{pickle_path.stem}.joblib"
+            joblib.dump(model, joblib_path, compress=0)
+
+            resident, _ = estimate_model_size(model)
+            manifest[pickle_path.stem] = {
+                'file': joblib_path.name,
+                'type': type(model).__name__,
+                'n_features': int(model.n_features_in_) if hasattr(model, 'n_features_in_') else None,
+                'classes': model.classes_.tolist() if hasattr(model, 'classes_') else None,
+                'pickle_size_bytes': pickle_path.stat().st_size,
+                'pickle_mtime_ns': pickle_path.stat().st_mtime_ns,
+                'joblib_size_bytes': joblib_path.stat().st_size,
+                'pickle_load_time_ms': pickle_load_time * 1000,
+                'resident_bytes': resident
+            }
+            logger.info(f"Converted {pickle_path.name} -> {joblib_path.name} "
+                        f"({joblib_path.stat().st_size / 1e6:.1f} MB, pickle load {pickle_load_time * 1000:.0f}ms)")
+        except Exception as e:
+            logger.error(f"Failed to convert {pickle_path.name}: {e}")
+
+    with open(output_path / MANIFEST_FILENAME, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+class ModelStore(MutableMapping):
+    """
+    Dictionary of models that loads each one on first access
+
+    Models are registered by path at startup and only read from disk when
+    they are first selected or used for prediction. A .joblib artifact next
+    to the registered .pkl is preferred and opened with mmap_mode, so its
+    arrays are paged in by the OS instead of copied, as long as it is not
+    older than the .pkl (a model retrained in place is loaded from the pickle). Models assigned
+    directly (store[name] = model) are kept as-is.
+
+    An optional residency budget (model count and/or resident bytes) keeps
+    only the most recently used models in memory. The least recently used
+    model with a file behind it is evicted and reloaded on its next access.
+    """
+
+    def __init__(
+        self,
+        mmap_mode: Optional[str] = 'r',
+        lazy_loading: bool = True,
+        max_resident_models: int = 0,
+        max_resident_bytes: int = 0
+    ):
+        """
+        Initialize model store
+
+        Args:
+            mmap_mode: numpy memmap mode for joblib artifacts (None reads them into memory)
+            lazy_loading: Load models on first access (False loads on register)
+            max_resident_models: Maximum number of models kept in memory (0 = unlimited)
+            max_resident_bytes: Maximum resident array bytes of loaded models (0 = unlimited)
+        """
+        self.mmap_mode = mmap_mode
+        self.lazy_loading = lazy_loading
+        self.max_resident_models = max_resident_models
+        self.max_resident_bytes = max_resident_bytes
+
+        self._lock = threading.RLock()
+        self._paths: Dict[str, Path] = {}
+        # Loaded models in least to most recently used order
+        self._models: OrderedDict = OrderedDict()
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._load_stats: Dict[str, Dict[str, Any]] = {}
+        self._access_stats: Dict[str, Dict[str, float]] = {}
+
+    def register(self, model_name: str, model_path: Union[str, Path]) -> None:
+        """
+        Register a model file without loading it
+
+        Args:
+            model_name: Name used to look the model up
+            model_path: Path to the .pkl model (an up-to-date .joblib sibling is used instead)
+        """
+        model_path = Path(model_path)
+        entry = self._read_manifest(model_path.parent).get(model_path.stem, {})
+        model_path = self._select_artifact(model_path, entry)
+
+        with self._lock:
+            self._paths[model_name] = model_path
+            self._models.pop(model_name, None)
+            # Manifest info describes the joblib artifact, not a pickle retrained after it
+            self._metadata[model_name] = entry if model_path.suffix == '.joblib' else {}
+
+        if not self.lazy_loading:
+            self[model_name]
+
+    @staticmethod
+    def _select_artifact(pickle_path: Path, entry: Dict[str, Any]) -> Path:
+        """
+        Choose between a .pkl model and its .joblib sibling
+
+        The .joblib is used when the manifest records the current .pkl's size
+        and modification time, or when it is at least as new as the .pkl.
+        """
+        joblib_path = pickle_path.with_suffix('.joblib')
+        if not joblib_path.exists():
+            return pickle_path
+        if not pickle_path.exists():
+            return joblib_path
+
+        pickle_stat = pickle_path.stat()
+        if (entry.get('pickle_size_bytes') == pickle_stat.st_size
+                and entry.get('pickle_mtime_ns') == pickle_stat.st_mtime_ns):
+            return joblib_path
+        if joblib_path.stat().st_mtime_ns >= pickle_stat.st_mtime_ns:
+            return joblib_path
+
+        logger.warning(f"{joblib_path.name} is older than {pickle_path.name}; loading the pickle "
+                       f"(re-run the joblib conversion to restore memory-mapped loading)")
+        return pickle_path
+
+    @staticmethod
+    def _read_manifest(directory: Path) -> Dict[str, Dict[str, Any]]:
+        """Read the conversion manifest of a directory, if any"""
+        manifest_path = directory / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return {}
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read model manifest {manifest_path}: {e}")
+            return {}
+
+    def _load(self, model_name: str) -> Any:
+        """Read a registered model from disk and record its load statistics"""
+        model_path = self._paths[model_name]
+        start_time = time.perf_counter()
+
+        if model_path.suffix == '.joblib':
+            model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+        else:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+
+        load_time = time.perf_counter() - start_time
+        resident, mapped = estimate_model_size(model)
+        self._load_stats[model_name] = {
+            'file': model_path.name,
+            'format': model_path.suffix.lstrip('.'),
+            'load_time_ms': load_time * 1000,
+            'file_size_bytes': model_path.stat().st_size,
+            'resident_bytes': resident,
+            'mapped_bytes': mapped
+        }
+
+        logger.info(f"Loaded {model_name} from {model_path.name} in {load_time * 1000:.0f}ms "
+                    f"({resident / 1e6:.1f} MB resident, {mapped / 1e6:.1f} MB mapped)")
+        return model
+
+    def __getitem__(self, model_name: str) -> Any:
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is not None:
+                self._models.move_to_end(model_name)
+                self._record_access(model_name, hit=True)
+                return model
+
+            if model_name not in self._paths:
+                raise KeyError(model_name)
+
+            model = self._models[model_name] = self._load(model_name)
+            self._record_access(model_name, hit=False, load_time_ms=self._load_stats[model_name]['load_time_ms'])
+            self._enforce_budget(keep=model_name)
+            return model
+
+    def _record_access(self, model_name: str, hit: bool, load_time_ms: float = 0.0) -> None:
+        """Update per-model hit/miss counters"""
+        stats = self._access_stats.setdefault(
+            model_name, {'hits': 0, 'misses': 0, 'evictions': 0, 'total_load_time_ms': 0.0}
+        )
+        if hit:
+            stats['hits'] += 1
+        else:
+            stats['misses'] += 1
+            stats['total_load_time_ms'] += load_time_ms
+
+    def _resident_bytes(self) -> int:
+        """Resident array bytes of all loaded models"""
+        return sum(self._load_stats.get(name, {}).get('resident_bytes', 0) for name in self._models)
+
+    def _over_budget(self) -> bool:
+        """Check if loaded models exceed the residency budget"""
+        if self.max_resident_models and len(self._models) > self.max_resident_models:
+            return True
+        return bool(self.max_resident_bytes) and self._resident_bytes() > self.max_resident_bytes
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Evict least recently used reloadable models until the budget is met"""
+        while self._over_budget():
+            victim = next((name for name in self._models if name != keep and name in self._paths), None)
+            if victim is None:
+                logger.warning(f"Model residency budget exceeded but nothing can be evicted (keeping {keep})")
+                return
+
+            del self._models[victim]
+            self._access_stats[victim]['evictions'] += 1
+            logger.info(f"Evicted model {victim} (least recently used, {len(self._models)} resident)")
+
+    def unload(self, model_name: str) -> bool:
+        """
+        Drop a loaded model from memory (it stays registered and reloads on next access)
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            if model_name not in self._models or model_name not in self._paths:
+                return False
+            del self._models[model_name]
+            return True
+
+    def __setitem__(self, model_name: str, model: Any) -> None:
+        with self._lock:
+            self._models[model_name] = model
+            self._paths.pop(model_name, None)
+            self._metadata.pop(model_name, None)
+
+    def __delitem__(self, model_name: str) -> None:
+        with self._lock:
+            if model_name not in self._models and model_name not in self._paths:
+                raise KeyError(model_name)
+            self._models.pop(model_name, None)
+            self._paths.pop(model_name, None)
+            self._metadata.pop(model_name, None)
+            self._load_stats.pop(model_name, None)
+            self._access_stats.pop(model_name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = list(self._paths) + [name for name in self._models if name not in self._paths]
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(set(self._paths) | set(self._models))
+
+    def __contains__(self, model_name: object) -> bool:
+        with self._lock:
+            return model_name in self._paths or model_name in self._models
+
+    def is_loaded(self, model_name: str) -> bool:
+        """Check if a model is already in memory"""
+        with self._lock:
+            return model_name in self._models
+
+    def get_path(self, model_name: str) -> Optional[Path]:
+        """File a registered model is loaded from (None for models assigned in memory)"""
+        with self._lock:
+            return self._paths.get(model_name)
+
+    def get_metadata(self, model_name: str) -> Dict[str, Any]:
+        """Manifest entry (type, n_features, classes) of a registered model, empty if none"""
+        with self._lock:
+            return dict(self._metadata.get(model_name, {}))
+
+    def preload(self, model_names: Optional[list] = None) -> Dict[str, float]:
+        """
+        Load models ahead of first use
+
+        With a residency budget, only the most recently preloaded models stay resident.
+
+        Returns:
+            Load time in milliseconds by model (0.0 if already loaded)
+        """
+        timings = {}
+        for model_name in model_names or list(self):
+            was_loaded = self.is_loaded(model_name)
+            try:
+                self[model_name]
+                timings[model_name] = 0.0 if was_loaded else self._load_stats[model_name]['load_time_ms']
+            except Exception as e:
+                logger.error(f"Failed to load {model_name}: {e}")
+        return timings
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load time, size and hit/miss/eviction counters per model"""
+        with self._lock:
+            stats = {}
+            for model_name in self:
+                entry = {'loaded': model_name in self._models}
+                entry.update(self._load_stats.get(model_name, {}))
+                if model_name in self._paths and 'file' not in entry:
+                    entry['file'] = self._paths[model_name].name
+
+                access = self._access_stats.get(model_name)
+                if access is not None:
+                    entry.update({
+                        'hits': access['hits'],
+                        'misses': access['misses'],
+                        'evictions': access['evictions'],
+                        'average_load_time_ms': access['total_load_time_ms'] / access['misses'] if access['misses'] else 0.0
+                    })
+                stats[model_name] = entry
+            return stats
+
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Currently resident models and usage against the budget"""
+        with self._lock:
+            return {
+                'resident_models': list(self._models),
+                'resident_bytes': self._resident_bytes(),
+                'max_resident_models': self.max_resident_models,
+                'max_resident_bytes': self.max_resident_bytes,
+                'evictions': sum(stats['evictions'] for stats in self._access_stats.values())
+            }
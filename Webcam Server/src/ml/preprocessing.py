@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Per-Face Preprocessing Context
+Shares color conversions and resized crops between feature extractors
+"""
+
+import cv2
+import numpy as np
+from typing import Tuple, Optional, Dict, Any
+
+
+class FacePreprocessingContext:
+    """
+    Preprocessing cache built once per detected face
+
+    Every conversion (grayscale, HSV, resized variants) is computed lazily on
+    first access and reused by all extractors working on the same face.
+    Finished feature blocks are kept too, so a second model on the same face
+    (e.g. a cascade escalation) only runs the extractors it is missing.
+    """
+
+    def __init__(
+        self,
+        face_bgr: np.ndarray,
+        face_gray: Optional[np.ndarray] = None,
+        frame_gray: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize preprocessing context
+
+        Args:
+            face_bgr: Face crop in BGR (or grayscale) format
+            face_gray: Optional grayscale crop already cut from the detection frame
+            frame_gray: Optional grayscale version of the full detection frame
+        """
+        self.face_bgr = face_bgr
+        self.frame_gray = frame_gray
+        self._face_gray = face_gray
+        self._hsv: Optional[np.ndarray] = None
+        self._cache: Dict[Tuple[str, Tuple[int, int]], np.ndarray] = {}
+        # Extractor name -> feature block (a view into the row it was written to)
+        self.feature_blocks: Dict[str, np.ndarray] = {}
+
+    @property
+    def is_color(self) -> bool:
+        """Check if the face crop has color channels"""
+        return self.face_bgr.ndim == 3
+
+    @property
+    def face_gray(self) -> np.ndarray:
+        """Grayscale face crop"""
+        if self._face_gray is None:
+            if self.is_color:
+                self._face_gray = cv2.cvtColor(self.face_bgr, cv2.COLOR_BGR2GRAY)
+            else:
+                self._face_gray = self.face_bgr
+        return self._face_gray
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """HSV conversion of the face crop"""
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self.face_bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    def get_resized_bgr(self, size: Tuple[int, int]) -> np.ndarray:
+        """Face crop resized to (width, height)"""
+        key = ('bgr', tuple(size))
+        if key not in self._cache:
+            self._cache[key] = cv2.resize(self.face_bgr, tuple(size))
+        return self._cache[key]
+
+    def get_resized_then_gray(self, size: Tuple[int, int]) -> np.ndarray:
+        """Face crop resized first, then converted to grayscale (HOG training order)"""
+        key = ('resized_then_gray', tuple(size))
+        if key not in self._cache:
+            resized = self.get_resized_bgr(size)
+            if resized.ndim == 3:
+                self._cache[key] = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+            else:
+                self._cache[key] = resized
+        return self._cache[key]
+
+    def get_gray_then_resized(self, size: Tuple[int, int]) -> np.ndarray:
+        """Face crop converted to grayscale first, then resized (GLCM/LBP training order)"""
+        key = ('gray_then_resized', tuple(size))
+        if key not in self._cache:
+            self._cache[key] = cv2.resize(self.face_gray, tuple(size))
+        return self._cache[key]
+
+    def get_cache_info(self) -> Dict[str, Any]:
+        """Get information about the conversions computed so far"""
+        return {
+            'has_frame_gray': self.frame_gray is not None,
+            'has_face_gray': self._face_gray is not None,
+            'has_hsv': self._hsv is not None,
+            'resized_variants': [f"{kind}:{size[0]}x{size[1]}" for kind, size in self._cache],
+            'feature_blocks': list(self.feature_blocks)
+        }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Face-Crop Quality Gate
+Cheap size, sharpness and exposure checks run before feature extraction
+"""
+
+import threading
+import cv2
+import numpy as np
+from typing import Any, Dict, Tuple
+from ..core.logger import logger
+
+
+class FaceQualityGate:
+    """
+    Rejects face crops that cannot produce a usable prediction
+
+    Checks, in order of cost: minimum crop size, mean brightness (under/over
+    exposure) and Laplacian variance (blur). All checks run on the grayscale
+    crop that feature extraction uses anyway.
+    """
+
+    REASONS = ('too_small', 'too_dark', 'too_bright', 'too_blurry')
+
+    def __init__(
+        self,
+        min_face_size: int = 64,
+        min_sharpness: float = 25.0,
+        min_brightness: float = 40.0,
+        max_brightness: float = 220.0
+    ):
+        """
+        Initialize quality gate
+
+        Args:
+            min_face_size: Minimum crop width and height in pixels
+            min_sharpness: Minimum variance of the Laplacian (lower is blurrier)
+            min_brightness: Minimum mean gray level
+            max_brightness: Maximum mean gray level
+        """
+        self.min_face_size = min_face_size
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+
+        self._lock = threading.Lock()
+        self.passed = 0
+        self.rejected = {reason: 0 for reason in self.REASONS}
+
+        logger.info(f"Face quality gate initialized: min size {min_face_size}, min sharpness {min_sharpness}, "
+                    f"brightness {min_brightness}-{max_brightness}")
+
+    def evaluate(self, face_gray: np.ndarray) -> Tuple[bool, str]:
+        """
+        Check a grayscale face crop
+
+        Args:
+            face_gray: 2D grayscale face crop
+
+        Returns:
+            Tuple of (passed, reason) where reason is 'ok' or one of REASONS
+        """
+        reason = self._check(face_gray)
+        with self._lock:
+            if reason == 'ok':
+                self.passed += 1
+            else:
+                self.rejected[reason] += 1
+
+        if reason != 'ok':
+            logger.debug(f"Face crop rejected by quality gate: {reason} ({face_gray.shape[1]}x{face_gray.shape[0]})")
+        return reason == 'ok', reason
+
+    def _check(self, face_gray: np.ndarray) -> str:
+        """Run the checks from cheapest to most expensive"""
+        height, width = face_gray.shape[:2]
+        if width < self.min_face_size or height < self.min_face_size:
+            return 'too_small'
+
+        brightness = float(face_gray.mean())
+        if brightness < self.min_brightness:
+            return 'too_dark'
+        if brightness > self.max_brightness:
+            return 'too_bright'
+
+        sharpness = cv2.Laplacian(face_gray, cv2.CV_64F).var()
+        if sharpness < self.min_sharpness:
+            return 'too_blurry'
+
+        return 'ok'
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pass/reject counters"""
+        with self._lock:
+            total = self.passed + sum(self.rejected.values())
+            return {
+                'passed': self.passed,
+                'rejected': dict(self.rejected),
+                'rejection_rate': (total - self.passed) / total if total else 0.0
+            }
+
+    def reset_stats(self) -> None:
+        """Reset counters"""
+        with self._lock:
+            self.passed = 0
+            self.rejected = {reason: 0 for reason in self.REASONS}
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Temporal Result Aggregation
+Smooths per-detection class distributions over a face session and detects convergence
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from .feature_cache import hamming_distance
+from ..core.logger import logger
+
+
+class TemporalAggregator:
+    """
+    Per-session aggregation of detection results
+
+    A session is one face in front of the camera. Each detection's class
+    distribution is folded into the session, either with exponential decay
+    ('decay') or as a majority vote over the last `window` detections
+    ('vote'). The session is converged once the same leading class beats the
+    runner-up by `margin` for `convergence_count` detections in a row;
+    callers can then drop to a keep-alive detection rate.
+
+    A new session starts when the face hash moves more than
+    `face_change_threshold` bits away from the session's face, when the
+    model changes, or after `session_timeout` seconds without a detection.
+    """
+
+    METHODS = ('decay', 'vote')
+
+    def __init__(
+        self,
+        method: str = 'decay',
+        decay: float = 0.6,
+        window: int = 5,
+        margin: float = 0.25,
+        convergence_count: int = 3,
+        face_change_threshold: int = 20,
+        session_timeout: float = 15.0
+    ):
+        """
+        Initialize temporal aggregator
+
+        Args:
+            method: 'decay' (exponentially weighted distribution) or 'vote' (sliding majority vote)
+            decay: Weight of the previous aggregate in decay mode (0 = no smoothing)
+            window: Number of detections in the vote window
+            margin: Minimum lead of the top class over the runner-up
+            convergence_count: Consecutive detections the lead must hold
+            face_change_threshold: Face hash distance in bits that starts a new session
+            session_timeout: Seconds without a detection that end the session
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown aggregation method: {method} (expected one of {self.METHODS})")
+
+        self.method = method
+        self.decay = decay
+        self.window = window
+        self.margin = margin
+        self.convergence_count = convergence_count
+        self.face_change_threshold = face_change_threshold
+        self.session_timeout = session_timeout
+
+        self._lock = threading.Lock()
+        self._distribution: Dict[str, float] = {}
+        self._votes: Deque[str] = deque(maxlen=window)
+        self._face_hash: Optional[int] = None
+        self._model_name: Optional[str] = None
+        self._last_update = 0.0
+        self._streak_leader: Optional[str] = None
+        self._streak = 0
+        self.session_detections = 0
+        self.converged = False
+
+        # Statistics
+        self.sessions = 0
+        self.detections = 0
+        self.converged_sessions = 0
+        self.detections_to_convergence = 0
+
+        logger.info(f"Temporal aggregator initialized: {method}, margin {margin}, {convergence_count} detections to converge")
+
+    def _reset(self) -> None:
+        """Start a new session (caller holds the lock)"""
+        self._distribution = {}
+        self._votes.clear()
+        self._face_hash = None
+        self._model_name = None
+        self._streak_leader = None
+        self._streak = 0
+        self.session_detections = 0
+        self.converged = False
+
+    def reset(self) -> None:
+        """End the current session"""
+        with self._lock:
+            self._reset()
+
+    def _is_new_session(self, face_hash: Optional[int], model_name: Optional[str], now: float) -> bool:
+        """Check if a detection belongs to a different face, model or an expired session"""
+        if self.session_detections == 0:
+            return True
+        if now - self._last_update > self.session_timeout:
+            return True
+        if model_name != self._model_name:
+            return True
+        return (face_hash is not None and self._face_hash is not None
+                and hamming_distance(face_hash, self._face_hash) > self.face_change_threshold)
+
+    def update(
+        self,
+        probabilities: Dict[str, float],
+        face_hash: Optional[int] = None,
+        model_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fold one detection into the session
+
+        Args:
+            probabilities: Class distribution of the detection
+            face_hash: Perceptual hash of the face crop
+            model_name: Model that produced the distribution
+
+        Returns:
+            Aggregated {'ethnicity', 'confidence', 'probabilities', 'converged', 'session_detections'}
+        """
+        now = time.time()
+        with self._lock:
+            if self._is_new_session(face_hash, model_name, now):
+                self._reset()
+                self.sessions += 1
+                self._model_name = model_name
+
+            # The session face follows slow drift (pose, lighting) of the same person
+            if face_hash is not None:
+                self._face_hash = face_hash
+            self._last_update = now
+            self.session_detections += 1
+            self.detections += 1
+
+            # Classes keep their first-seen order, so ties go to the incumbent leader
+            if self.method == 'decay':
+                names = list(self._distribution) + [name for name in probabilities if name not in self._distribution]
+                if self.session_detections == 1:
+                    self._distribution = {name: float(probabilities.get(name, 0.0)) for name in names}
+                else:
+                    self._distribution = {
+                        name: self.decay * self._distribution.get(name, 0.0)
+                              + (1.0 - self.decay) * float(probabilities.get(name, 0.0))
+                        for name in names
+                    }
+            elif probabilities:
+                self._votes.append(max(probabilities, key=probabilities.get))
+                self._distribution = {name: self._votes.count(name) / len(self._votes) for name in dict.fromkeys(self._votes)}
+
+            ranked = sorted(self._distribution.values(), reverse=True)
+            leader = max(self._distribution, key=self._distribution.get) if self._distribution else None
+            lead = ranked[0] - (ranked[1] if len(ranked) > 1 else 0.0) if ranked else 0.0
+
+            # Convergence needs the same leader ahead by the margin for K detections in a row
+            if leader is not None and lead >= self.margin:
+                self._streak = self._streak + 1 if leader == self._streak_leader else 1
+                self._streak_leader = leader
+            else:
+                self._streak = 0
+                self._streak_leader = None
+
+            was_converged = self.converged
+            self.converged = self._streak >= self.convergence_count
+            if self.converged and not was_converged:
+                self.converged_sessions += 1
+                self.detections_to_convergence += self.session_detections
+                logger.info(f"Session converged on {leader} after {self.session_detections} detections (lead {lead:.2f})")
+
+            return self._state(leader)
+
+    def current(self, face_hash: Optional[int] = None, model_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Aggregated result of the session a detection belongs to, without adding to it
+
+        Used for repeated results (feature cache hits) that carry no new
+        evidence and must not count toward convergence.
+
+        Returns:
+            Same dictionary as update(), or None if the detection would start a new session
+        """
+        with self._lock:
+            if self._is_new_session(face_hash, model_name, time.time()):
+                return None
+            leader = max(self._distribution, key=self._distribution.get) if self._distribution else None
+            return self._state(leader)
+
+    def _state(self, leader: Optional[str]) -> Dict[str, Any]:
+        """Session result dictionary (caller holds the lock)"""
+        return {
+            'ethnicity': leader,
+            'confidence': self._distribution.get(leader, 0.0) if leader is not None else 0.0,
+            'probabilities': dict(self._distribution),
+            'converged': self.converged,
+            'session_detections': self.session_detections
+        }
+
+    def is_converged(self) -> bool:
+        """Check if the current session has converged (and has not expired)"""
+        with self._lock:
+            return self.converged and time.time() - self._last_update <= self.session_timeout
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session, convergence and current-session statistics"""
+        with self._lock:
+            return {
+                'method': self.method,
+                'sessions': self.sessions,
+                'detections': self.detections,
+                'converged_sessions': self.converged_sessions,
+                'average_detections_to_convergence': (
+                    self.detections_to_convergence / self.converged_sessions if self.converged_sessions else 0.0
+                ),
+                'session_detections': self.session_detections,
+                'converged': self.converged
+            }
@@ -63,6 +63,8 @@ class UDPVideoServer(IUDPServer):
         
         # Message handlers
         self.message_handlers: Dict[str, Callable] = {}
+        # "COMMAND" or "COMMAND:argument" handlers, called with (argument, addr)
+        self.command_handlers: Dict[str, Callable] = {}
         self._setup_default_handlers()
         
         logger.info(f"UDP video server initialized with max packet size {max_packet_size}")
@@ -74,7 +76,15 @@ class UDPVideoServer(IUDPServer):
             "UNREGISTER": self._handle_unregister,
             "DETECTION_REQUEST": self._handle_detection_request,
         }
-    
+
+    def register_handler(self, message: str, handler: Callable[[Tuple[str, int]], None]) -> None:
+        """Register or replace the handler for a client message"""
+        self.message_handlers[message] = handler
+
+    def register_command_handler(self, command: str, handler: Callable[[str, Tuple[str, int]], None]) -> None:
+        """Register the handler for a "COMMAND[:argument]" client message"""
+        self.command_handlers[command] = handler
+
     def start(self, host: str, port: int) -> bool:
         """Start UDP server"""
         try:
@@ -130,6 +140,9 @@ class UDPVideoServer(IUDPServer):
                     self._handle_model_select(message, addr)
                 elif message in self.message_handlers:
                     self.message_handlers[message](addr)
+                elif message.partition(":")[0] in self.command_handlers:
+                    command, _, argument = message.partition(":")
+                    self.command_handlers[command](argument, addr)
                 else:
                     logger.warning(f"Unknown message from {addr}: {message}")
                     
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Thread-Based Detection Stage
+Runs inline-mode ML detection off the frame loop, fed through a latest-frame mailbox
+"""
+
+import time
+import threading
+import numpy as np
+from typing import Optional, Dict, Any, Callable, Tuple
+from ..core.logger import logger
+from ..ml.cascade_registry import cascade_registry
+
+
+def warm_up_detection_thread(detector: Any) -> None:
+    """
+    Load the calling thread's Haar cascade before its first detection
+
+    Cascades are kept per thread and the detector's warm-up only covers the
+    thread that created it, so every thread that runs detections calls this
+    on start-up (detectors without a cascade are skipped).
+    """
+    cascade_path = getattr(getattr(detector, 'face_detector', None), 'cascade_path', None)
+    if cascade_path is None:
+        return
+    try:
+        load_time = cascade_registry.warm_up(cascade_path)
+        if load_time:
+            logger.debug(f"Cascade warmed up on {threading.current_thread().name} in {load_time * 1000:.1f}ms")
+    except Exception as e:
+        logger.error(f"Cascade warm-up failed on {threading.current_thread().name}: {e}")
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox that keeps only the newest frame
+
+    Publishing never blocks: a frame that has not been taken yet is replaced
+    by the new one. The consumer always gets the most recent frame, so a
+    slow detection never builds a backlog of stale frames.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item: Optional[Tuple[np.ndarray, int, str, float]] = None
+        self._closed = False
+
+        # Statistics
+        self.published = 0
+        self.overwritten = 0
+
+    def publish(self, frame: np.ndarray, frame_id: int, model_name: str) -> None:
+        """Put a frame in the slot, replacing any frame not yet taken"""
+        with self._condition:
+            if self._item is not None:
+                self.overwritten += 1
+            self._item = (frame, frame_id, model_name, time.time())
+            self.published += 1
+            self._condition.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, int, str, float]]:
+        """
+        Wait for a frame and empty the slot
+
+        Returns:
+            Tuple of (frame, frame_id, model_name, publish time), or None on timeout or after close()
+        """
+        with self._condition:
+            if self._item is None and not self._closed:
+                self._condition.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self) -> None:
+        """Wake up a waiting consumer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class DetectionThread:
+    """
+    Detection stage running on its own thread
+
+    The frame loop publishes frames with submit(), which only swaps a
+    reference and returns. The detection thread takes the newest frame, runs
+    the detector and hands each result to the callback as soon as it is
+    ready. Results carry the frame_id of the frame they were computed on,
+    like DetectionWorker results.
+    """
+
+    def __init__(self, detector: Any, on_result: Callable[[Dict[str, Any]], None]):
+        """
+        Initialize detection thread
+
+        Args:
+            detector: MLEthnicityDetector (only this thread calls predict_ethnicity)
+            on_result: Called on the detection thread with every result dictionary
+        """
+        self.detector = detector
+        self.on_result = on_result
+
+        self._slot = LatestFrameSlot()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Statistics
+        self.completed = 0
+        self.total_detection_time = 0.0
+        self.total_latency = 0.0
+        self.last_frame_id: Optional[int] = None
+
+    def start(self) -> None:
+        """Start the detection thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="ml-detection", daemon=True)
+            self._thread.start()
+            logger.info("Detection thread started")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the detection thread (a detection in progress finishes first)"""
+        self._running = False
+        self._slot.close()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info(f"Detection thread stopped: {self.get_stats()}")
+
+    def is_alive(self) -> bool:
+        """Check if the detection thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, frame: np.ndarray, model_name: str, frame_id: int = 0) -> None:
+        """
+        Publish a frame for detection without blocking
+
+        The frame must not be modified afterwards; an older frame still
+        waiting in the slot is dropped.
+        """
+        self._slot.publish(frame, frame_id, model_name)
+
+    def _run(self) -> None:
+        """Detect on the newest frame until stopped"""
+        warm_up_detection_thread(self.detector)
+        while self._running:
+            item = self._slot.take(timeout=0.5)
+            if item is None:
+                continue
+
+            frame, frame_id, model_name, published_at = item
+            start_time = time.time()
+            try:
+                ethnicity, confidence = self.detector.predict_ethnicity(frame, model_name)
+                result = {
+                    'frame_id': frame_id,
+                    'model': model_name,
+                    'ethnicity': ethnicity,
+                    'confidence': float(confidence),
+                    'probabilities': self.detector.get_last_probabilities() if ethnicity else {},
+                    'converged': self.detector.is_converged(),
+                    'detection_time': time.time() - start_time
+                }
+            except Exception as e:
+                logger.error(f"Detection thread error on frame {frame_id}: {e}")
+                continue
+
+            self.completed += 1
+            self.total_detection_time += result['detection_time']
+            self.total_latency += time.time() - published_at
+            self.last_frame_id = frame_id
+
+            try:
+                self.on_result(result)
+            except Exception as e:
+                logger.error(f"Detection result callback failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get detection thread statistics"""
+        return {
+            'alive': self.is_alive(),
+            'submitted': self._slot.published,
+            'completed': self.completed,
+            'dropped': self._slot.overwritten,
+            'last_frame_id': self.last_frame_id,
+            'average_time': self.total_detection_time / self.completed if self.completed else 0.0,
+            # Publish to result, including time the frame waited in the slot
+            'average_latency': self.total_latency / self.completed if self.completed else 0.0
+        }
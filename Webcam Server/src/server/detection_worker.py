@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Process-Based Detection Worker
+Runs ML ethnicity detection in a separate process so frame broadcasting never waits on the GIL
+"""
+
+import cv2
+import time
+import queue
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from typing import Optional, Dict, Any, List, Tuple
+from ..core.logger import logger
+
+
+def _forward_control_messages(detector, control_queue) -> None:
+    """Hand control messages (model reloads) to the detector until None is received"""
+    while True:
+        message = control_queue.get()
+        if message is None:
+            break
+        if message.get('type') == 'reload':
+            detector.request_model_reload(message.get('models_dir'))
+
+
+def _detection_worker_main(shm_name: str, config_file: str, job_queue, result_queue, control_queue) -> None:
+    """
+    Worker process entry point
+
+    Attaches to the shared frame buffer, builds its own detector and answers
+    one job at a time until it receives None. Control messages are handled
+    on a separate thread so they never wait behind a detection.
+    """
+    # Imported here so the parent process does not load models for the worker
+    from ..core.config_manager import ConfigManager
+    from ..ml.ethnicity_detector import MLEthnicityDetector
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    detector = None
+    try:
+        detector = MLEthnicityDetector.create_default_detector(ConfigManager(config_file))
+        result_queue.put({'type': 'ready', 'available_models': detector.get_available_models()})
+        threading.Thread(
+            target=_forward_control_messages, args=(detector, control_queue), name="worker-control", daemon=True
+        ).start()
+
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+
+            # The parent does not touch the buffer while a job is in flight
+            frame = np.ndarray(job['shape'], dtype=np.uint8, buffer=shm.buf)
+            start_time = time.time()
+            ethnicity, confidence = detector.predict_ethnicity(frame, job['model'])
+
+            result_queue.put({
+                'type': 'result',
+                'job_id': job['job_id'],
+                'frame_id': job['frame_id'],
+                'model': job['model'],
+                'ethnicity': ethnicity,
+                'confidence': float(confidence),
+                'probabilities': detector.get_last_probabilities() if ethnicity else {},
+                'converged': detector.is_converged(),
+                'detection_time': time.time() - start_time,
+                'performance_stats': detector.get_performance_stats()
+            })
+
+    except Exception as e:
+        logger.error(f"Detection worker failed: {e}")
+        result_queue.put({'type': 'error', 'error': str(e)})
+    finally:
+        if detector is not None:
+            detector.shutdown()
+        shm.close()
+
+
+class DetectionWorker:
+    """
+    Single-slot detection worker process
+
+    Frames are copied into a shared-memory buffer sized for the camera
+    resolution and results come back over a queue. Frames larger than the
+    buffer are downscaled to fit. Only one job is in flight at a time; frames
+    submitted while the worker is busy are dropped, so the caller never blocks.
+    """
+
+    def __init__(self, config_file: str, frame_shape: Tuple[int, int, int], start_timeout: float = 60.0):
+        """
+        Initialize detection worker
+
+        Args:
+            config_file: Configuration file used by the worker's detector
+            frame_shape: Largest frame shape (height, width, channels) to be submitted
+            start_timeout: Seconds to wait for the worker to load its models
+        """
+        self.config_file = config_file
+        self.frame_shape = tuple(frame_shape)
+        self.start_timeout = start_timeout
+
+        self._context = mp.get_context('spawn')
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._process = None
+        self._job_queue = None
+        self._result_queue = None
+        self._control_queue = None
+
+        self.available_models: List[str] = []
+        self.in_flight = False
+        self._next_job_id = 0
+
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.resized = 0
+        self.total_detection_time = 0.0
+        self.performance_stats: Dict[str, Any] = {}
+
+    def start(self) -> bool:
+        """Start the worker process and wait until its models are loaded"""
+        try:
+            self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.frame_shape)))
+            self._job_queue = self._context.Queue(maxsize=1)
+            self._result_queue = self._context.Queue()
+            self._control_queue = self._context.Queue()
+            self._process = self._context.Process(
+                target=_detection_worker_main,
+                args=(self._shm.name, self.config_file, self._job_queue, self._result_queue, self._control_queue),
+                name="ml-detection-worker",
+                daemon=True
+            )
+            self._process.start()
+
+            message = self._result_queue.get(timeout=self.start_timeout)
+            if message.get('type') != 'ready':
+                logger.error(f"Detection worker failed to start: {message.get('error')}")
+                self.stop()
+                return False
+
+            self.available_models = message['available_models']
+            logger.info(f"Detection worker started (pid {self._process.pid}, frame buffer {self.frame_shape})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to start detection worker: {e}")
+            self.stop()
+            return False
+
+    def is_alive(self) -> bool:
+        """Check if the worker process is running"""
+        return self._process is not None and self._process.is_alive()
+
+    def submit(self, frame: np.ndarray, model_name: str, frame_id: int = 0) -> bool:
+        """
+        Submit a frame for detection without blocking
+
+        Args:
+            frame: BGR frame (uint8)
+            model_name: Model to use for prediction
+            frame_id: Caller's frame number, returned with the result
+
+        Returns:
+            True if the job was queued, False if it was dropped
+        """
+        if self.in_flight or not self.is_alive():
+            self.dropped += 1
+            return False
+
+        if frame.dtype != np.uint8:
+            logger.warning(f"Frame dtype {frame.dtype} is not supported by the detection buffer, dropped")
+            self.dropped += 1
+            return False
+
+        if frame.nbytes > self._shm.size:
+            frame = self._fit_to_buffer(frame)
+
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf)[:] = frame
+
+        self._next_job_id += 1
+        self._job_queue.put_nowait({
+            'job_id': self._next_job_id,
+            'frame_id': frame_id,
+            'shape': frame.shape,
+            'model': model_name
+        })
+        self.in_flight = True
+        self.submitted += 1
+        return True
+
+    def _fit_to_buffer(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a frame larger than the shared buffer, keeping its aspect ratio"""
+        height, width = frame.shape[:2]
+        scale = min(self.frame_shape[0] / height, self.frame_shape[1] / width,
+                    np.sqrt(self._shm.size / frame.nbytes))
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        if self.resized == 0:
+            logger.warning(f"Frame {frame.shape} exceeds the detection buffer {self.frame_shape}; "
+                           f"downscaling to {size[0]}x{size[1]} for detection")
+        self.resized += 1
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def request_reload(self, models_dir: Optional[str] = None) -> bool:
+        """
+        Ask the worker's detector to hot-reload its models (non-blocking)
+
+        The outcome shows up in the 'model_reload' detector stats returned with results.
+
+        Returns:
+            True if the request was sent
+        """
+        if not self.is_alive():
+            return False
+        self._control_queue.put({'type': 'reload', 'models_dir': models_dir})
+        return True
+
+    def poll_result(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the finished detection result, if any (non-blocking)
+
+        Returns:
+            Result dictionary or None if no job has finished
+        """
+        if self._result_queue is None:
+            return None
+
+        try:
+            message = self._result_queue.get_nowait()
+        except queue.Empty:
+            if self.in_flight and not self.is_alive():
+                logger.error("Detection worker exited with a job in flight")
+                self.in_flight = False
+            return None
+
+        self.in_flight = False
+        if message.get('type') != 'result':
+            logger.error(f"Detection worker error: {message.get('error')}")
+            return None
+
+        self.completed += 1
+        self.total_detection_time += message['detection_time']
+        self.performance_stats = message['performance_stats']
+        return message
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker statistics"""
+        return {
+            'alive': self.is_alive(),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'resized': self.resized,
+            'in_flight': self.in_flight,
+            'average_time': self.total_detection_time / self.completed if self.completed else 0.0,
+            'detector': self.performance_stats
+        }
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the worker process and release the shared frame buffer"""
+        if self._process is not None:
+            try:
+                self._control_queue.put(None)
+                self._job_queue.put(None, timeout=timeout)
+            except Exception:
+                pass
+            self._process.join(timeout=timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout=timeout)
+            self._process = None
+
+        for q in (self._job_queue, self._result_queue, self._control_queue):
+            if q is not None:
+                q.cancel_join_thread()
+                q.close()
+        self._job_queue = None
+        self._result_queue = None
+        self._control_queue = None
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+        self.in_flight = False
+        logger.info(f"Detection worker stopped: {self.get_stats()}")
@@ -8,12 +8,15 @@ import cv2
 import threading
 import time
 import json
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
 from ..core.logger import logger
 from ..core.config_manager import ConfigManager
 from ..camera.camera_interface import ICamera, CameraFactory
 from ..network.udp_server import IUDPServer, UDPServerFactory
 from ..ml.ethnicity_detector import MLEthnicityDetector
+from .detection_worker import DetectionWorker
+from .detection_thread import DetectionThread, warm_up_detection_thread
 
 
 class MLWebcamServer:
@@ -24,6 +27,7 @@ class MLWebcamServer:
     
     def __init__(self, config_file: str = "config.json"):
         # Load configuration
+        self.config_file = config_file
         self.config_manager = ConfigManager(config_file)
         
         # Get server configuration
@@ -35,22 +39,35 @@ class MLWebcamServer:
         self.target_fps = server_config.get("target_fps", 15)
         self.jpeg_quality = server_config.get("jpeg_quality", 40)
         self.detection_interval = server_config.get("detection_interval", 30)
+        # Detection interval while the face session's result is converged (see ml.temporal_aggregation)
+        self.keep_alive_interval = server_config.get("keep_alive_interval", 90)
+        # "process" runs detection in a worker process, "inline" on a detection thread in this process
+        self.detection_mode = server_config.get("detection_mode", "process")
+        # Threads answering client DETECTION_REQUESTs (inline mode); their predictions share the inference queue
+        self.detection_request_workers = server_config.get("detection_request_workers", 4)
         
         # Dependencies (Dependency Injection)
         self.camera: Optional[ICamera] = None
         self.udp_server: Optional[IUDPServer] = None
         self.ethnicity_detector: Optional[MLEthnicityDetector] = None
+        self.detection_worker: Optional[DetectionWorker] = None
+        self.detection_thread: Optional[DetectionThread] = None
         
         # Server state
         self.running = False
         self.frame_count = 0
         self.current_model = self.config_manager.get_default_model()
+        self.detection_converged = False
+        self.keep_alive_skips = 0
         
         # Performance settings
         self.frame_send_time = 1.0 / self.target_fps
         
         # Threading
         self._broadcast_thread: Optional[threading.Thread] = None
+        self._request_executor: Optional[ThreadPoolExecutor] = None
+        # (frame, frame_id) of the last frame read, for on-demand detection requests
+        self._latest_frame: Optional[Tuple[Any, int]] = None
         
         logger.info(f"ML Webcam Server initialized: {self.host}:{self.port}")
     
@@ -79,8 +96,18 @@ class MLWebcamServer:
                 logger.error("UDP server initialization failed")
                 return False
             
-            # Initialize ML detector with config
-            self.ethnicity_detector = MLEthnicityDetector.create_default_detector(self.config_manager)
+            # Initialize ML detection (worker process, or inline detector as fallback)
+            if self.detection_mode == "process":
+                self.detection_worker = DetectionWorker(self.config_file, self._get_frame_shape())
+                if not self.detection_worker.start():
+                    logger.warning("Detection worker unavailable, falling back to inline detection")
+                    self.detection_worker = None
+            
+            if self.detection_worker is None:
+                self._start_inline_detection()
+            
+            # RELOAD_MODELS[:models_dir] swaps in retrained models without dropping clients
+            self.udp_server.register_command_handler("RELOAD_MODELS", self._handle_reload_models)
             
             logger.info("All components initialized successfully")
             return True
@@ -89,6 +116,38 @@ class MLWebcamServer:
             logger.error(f"Server initialization failed: {e}")
             return False
     
+    def _get_frame_shape(self) -> Tuple[int, int, int]:
+        """Frame shape the camera actually delivers (the requested resolution is not guaranteed)"""
+        camera_props = self.camera.get_properties() if self.camera else {}
+        width = camera_props.get('width') or self.frame_width
+        height = camera_props.get('height') or self.frame_height
+        if (width, height) != (self.frame_width, self.frame_height):
+            logger.warning(f"Camera delivers {width}x{height} instead of the configured "
+                           f"{self.frame_width}x{self.frame_height}")
+        return (max(height, self.frame_height), max(width, self.frame_width), 3)
+    
+    def _start_inline_detection(self) -> None:
+        """Create the in-process detector, its detection thread and the DETECTION_REQUEST pool"""
+        self.ethnicity_detector = MLEthnicityDetector.create_default_detector(self.config_manager)
+        self.detection_thread = DetectionThread(self.ethnicity_detector, self._on_detection_result)
+        self.detection_thread.start()
+        
+        # Answer on-demand requests concurrently so the inference queue can batch them
+        self._request_executor = ThreadPoolExecutor(
+            max_workers=self.detection_request_workers, thread_name_prefix="detection-request",
+            initializer=warm_up_detection_thread, initargs=(self.ethnicity_detector,)
+        )
+        self.udp_server.register_handler("DETECTION_REQUEST", self._handle_detection_request)
+    
+    def _fall_back_to_inline_detection(self) -> None:
+        """Replace a dead detection worker with inline detection (called on the broadcast thread)"""
+        logger.error(f"Detection worker died ({self.detection_worker.get_stats()}), switching to inline detection")
+        self.detection_worker.stop()
+        self.detection_worker = None
+        
+        # Model loading takes a while; keep broadcasting frames meanwhile
+        threading.Thread(target=self._start_inline_detection, name="detection-fallback", daemon=True).start()
+    
     def start(self) -> None:
         """Start the ML webcam server"""
         if not self.initialize():
@@ -98,7 +157,7 @@ class MLWebcamServer:
         self.running = True
         
         # Log server information
-        available_models = self.ethnicity_detector.get_available_models()
+        available_models = self._get_available_models()
         camera_props = self.camera.get_properties()
         
         logger.info(f"🚀 ML-Enhanced UDP Server: {self.host}:{self.port}")
@@ -149,10 +208,30 @@ class MLWebcamServer:
                 if not ret:
                     logger.warning("Failed to read frame from camera")
                     continue
+                self._latest_frame = (frame, self.frame_count)
                 
-                # ML Detection (every N frames)
-                if self.frame_count % self.detection_interval == 0:
-                    self._perform_ml_detection(frame)
+                # ML Detection (every N frames, keep-alive rate once the result is stable);
+                # neither backend makes the frame loop wait
+                interval = self.keep_alive_interval if self.detection_converged else self.detection_interval
+                if self.frame_count % interval != 0:
+                    if self.detection_converged and self.frame_count % self.detection_interval == 0:
+                        self.keep_alive_skips += 1
+                else:
+                    if self.detection_worker and not self.detection_worker.is_alive():
+                        self._fall_back_to_inline_detection()
+                    
+                    if self.detection_worker:
+                        # Copy into shared memory and return immediately (dropped if busy)
+                        self.detection_worker.submit(frame, self.current_model, self.frame_count)
+                    elif self.detection_thread:
+                        # Latest-frame slot: replaces a frame the detection thread has not started on
+                        self.detection_thread.submit(frame, self.current_model, self.frame_count)
+                
+                # Forward finished worker results (detection thread results are sent from its callback)
+                if self.detection_worker:
+                    result = self.detection_worker.poll_result()
+                    if result:
+                        self._on_detection_result(result)
                 
                 self.frame_count += 1
                 
@@ -171,32 +250,106 @@ class MLWebcamServer:
                 logger.error(f"Frame broadcasting error: {e}")
                 time.sleep(0.1)
     
-    def _perform_ml_detection(self, frame) -> None:
-        """Perform ML ethnicity detection on frame"""
+    def _on_detection_result(self, result: Dict[str, Any]) -> None:
+        """Broadcast a finished detection (worker poll or detection thread callback)"""
+        converged = result.get('converged', False)
+        if converged != self.detection_converged:
+            interval = self.keep_alive_interval if converged else self.detection_interval
+            logger.info(f"Face session {'converged' if converged else 'open'}: detecting every {interval} frames")
+        self.detection_converged = converged
+        
+        if result['ethnicity']:
+            self._broadcast_detection_result(result['ethnicity'], result['confidence'], result['model'],
+                                             result.get('probabilities'), result.get('frame_id'), converged)
+    
+    def _handle_detection_request(self, addr: Tuple[str, int]) -> None:
+        """Queue an on-demand detection on the latest frame (called on the UDP listener thread)"""
+        if self._request_executor is None or self._latest_frame is None:
+            logger.debug(f"Detection request from {addr} ignored: no frame yet")
+            return
         try:
-            ethnicity, confidence = self.ethnicity_detector.predict_ethnicity(frame, self.current_model)
-            
-            if ethnicity:
-                # Send detection result to all clients
-                result_data = {
-                    'ethnicity': ethnicity,
-                    'confidence': confidence,
+            self._request_executor.submit(self._answer_detection_request, addr, *self._latest_frame)
+        except RuntimeError:
+            # Executor already shut down
+            pass
+    
+    def _answer_detection_request(self, addr: Tuple[str, int], frame, frame_id: int) -> None:
+        """Run detection for one client request and reply to that client only"""
+        try:
+            # The batch path returns the distribution with each face, so concurrent requests
+            # never read another request's last_probabilities
+            results = self.ethnicity_detector.predict_ethnicity_batch(frame, self.current_model)
+            if results:
+                largest = max(results, key=lambda result: result['face_coords'][2] * result['face_coords'][3])
+                self.udp_server.send_detection_result(addr, {
+                    'ethnicity': largest['ethnicity'],
+                    'confidence': largest['confidence'],
+                    'probabilities': largest['probabilities'],
                     'model': self.current_model,
+                    'frame_id': frame_id,
                     'timestamp': time.time()
-                }
-                
-                # Broadcast to all clients
-                for client_addr in self.udp_server.get_connected_clients():
-                    self.udp_server.send_detection_result(client_addr, result_data)
-                    
+                })
         except Exception as e:
-            logger.error(f"ML detection error: {e}")
+            logger.error(f"Detection request error from {addr}: {e}")
+    
+    def _handle_reload_models(self, models_dir: str, addr: Tuple[str, int]) -> None:
+        """Queue a background model hot reload (called on the UDP listener thread)"""
+        if self.detection_worker:
+            queued = self.detection_worker.request_reload(models_dir or None)
+        else:
+            queued = bool(self.ethnicity_detector) and self.ethnicity_detector.request_model_reload(models_dir or None)
+        
+        response = "RELOAD_QUEUED" if queued else "RELOAD_ERROR:Reload not available"
+        self.udp_server.send_to_client(addr, response.encode('utf-8'))
+        logger.log_model_operation("RELOAD_REQUESTED", models_dir or "current models_dir", client=addr, queued=queued)
+    
+    def _broadcast_detection_result(
+        self,
+        ethnicity: str,
+        confidence: float,
+        model_name: str,
+        probabilities: Optional[Dict[str, float]] = None,
+        frame_id: Optional[int] = None,
+        converged: bool = False
+    ) -> None:
+        """Send detection result (class distribution, source frame number, session convergence) to all clients"""
+        result_data = {
+            'ethnicity': ethnicity,
+            'confidence': confidence,
+            'probabilities': probabilities or {},
+            'model': model_name,
+            'frame_id': frame_id,
+            'converged': converged,
+            'timestamp': time.time()
+        }
+        
+        # Broadcast to all clients
+        for client_addr in self.udp_server.get_connected_clients():
+            self.udp_server.send_detection_result(client_addr, result_data)
+    
+    def _get_available_models(self) -> list:
+        """Get models available to the active detection backend"""
+        if self.detection_worker:
+            return self.detection_worker.available_models
+        return self.ethnicity_detector.get_available_models() if self.ethnicity_detector else []
+    
+    def _get_detection_stats(self) -> Dict[str, Any]:
+        """Get performance statistics from the active detection backend"""
+        if self.detection_worker:
+            stats = dict(self.detection_worker.performance_stats) or {'total_detections': 0, 'average_time': 0.0}
+            stats['worker'] = self.detection_worker.get_stats()
+        else:
+            stats = self.ethnicity_detector.get_performance_stats() if self.ethnicity_detector else {}
+            if self.detection_thread:
+                stats['detection_thread'] = self.detection_thread.get_stats()
+        stats['keep_alive'] = {'converged': self.detection_converged, 'skipped_detections': self.keep_alive_skips}
+        return stats
     
     def _log_server_status(self) -> None:
         """Log server status information"""
         try:
             client_count = self.udp_server.get_client_count()
-            perf_stats = self.ethnicity_detector.get_performance_stats()
+            perf_stats = self._get_detection_stats()
             
             logger.info(f"📊 Server Status: {client_count} clients, {self.frame_count} frames processed")
             logger.info(f"🧠 ML Stats: {perf_stats['total_detections']} detections, avg {perf_stats['average_time']:.3f}s")
@@ -217,10 +370,27 @@ class MLWebcamServer:
         if self.camera:
             self.camera.release()
         
-        # Wait for broadcast thread
+        # Stop detecting before the detector goes away
+        if self.detection_thread:
+            self.detection_thread.stop()
+            self.detection_thread = None
+        
+        if self._request_executor:
+            self._request_executor.shutdown(wait=True)
+            self._request_executor = None
+        
+        # Release detector resources
+        if self.ethnicity_detector:
+            self.ethnicity_detector.shutdown()
+        
+        # Wait for broadcast thread before releasing the worker's frame buffer
         if self._broadcast_thread and self._broadcast_thread.is_alive():
             self._broadcast_thread.join(timeout=2.0)
         
+        if self.detection_worker:
+            self.detection_worker.stop()
+            self.detection_worker = None
+        
         logger.info("✅ ML server stopped")
     
     def get_server_info(self) -> Dict[str, Any]:
@@ -231,10 +401,10 @@ class MLWebcamServer:
             'running': self.running,
             'frame_count': self.frame_count,
             'client_count': self.udp_server.get_client_count() if self.udp_server else 0,
-            'available_models': self.ethnicity_detector.get_available_models() if self.ethnicity_detector else [],
+            'available_models': self._get_available_models(),
             'current_model': self.current_model,
             'camera_properties': self.camera.get_properties() if self.camera else {},
-            'performance_stats': self.ethnicity_detector.get_performance_stats() if self.ethnicity_detector else {}
+            'performance_stats': self._get_detection_stats()
         }
 
 
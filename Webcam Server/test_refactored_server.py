@@ -6,6 +6,7 @@ Tests individual components and integration
 
 import sys
 import os
+import time
 from pathlib import Path
 import numpy as np
 import cv2
@@ -22,6 +23,16 @@ from src.ml.ethnicity_detector import MLEthnicityDetector
 from src.ml.feature_extractors import FeatureExtractorFactory
 from src.ml.face_detector import FaceDetectorFactory
 from src.ml.model_manager import ModelManagerFactory
+from src.ml.preprocessing import FacePreprocessingContext
+from src.ml.extraction_plan import build_extraction_plan
+from src.ml.feature_cache import FeatureCache, compute_face_hash
+from src.ml.quality_gate import FaceQualityGate
+from src.ml.glcm_engine import GLCMEngine
+from src.ml.lbp_engine import LBPEngine
+from src.ml.hog_engine import HOGEngine
+from src.ml.cascade_registry import cascade_registry
+from src.server.detection_worker import DetectionWorker
+from src.server.detection_thread import DetectionThread
 
 
 def test_logger():
@@ -37,6 +48,117 @@ def test_logger():
     print("✅ Logger test passed")
 
 
+def test_detection_worker():
+    """Test process-based detection worker with drop-if-busy submission"""
+    print("Testing Detection Worker...")
+    worker = DetectionWorker("config.json", (240, 320, 3))
+    try:
+        if not worker.start():
+            print("❌ Detection worker failed to start")
+            return
+        print(f"✅ Detection worker started: models {worker.available_models}")
+        
+        frame = np.random.randint(0, 255, (240, 320, 3), dtype=np.uint8)
+        first = worker.submit(frame, "glcm_hog", frame_id=1)
+        second = worker.submit(frame, "glcm_hog", frame_id=2)
+        print(f"{'✅' if first and not second else '❌'} Second frame dropped while busy")
+        
+        result = None
+        for _ in range(500):
+            result = worker.poll_result()
+            if result is not None:
+                break
+            time.sleep(0.01)
+        
+        if result is not None and result['frame_id'] == 1 and not worker.in_flight:
+            print(f"✅ Worker result received in {result['detection_time']:.3f}s")
+        else:
+            print("❌ No result from detection worker")
+
+        # A camera that ignored the requested resolution: frame is downscaled, not dropped
+        large_frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        if worker.submit(large_frame, "glcm_hog", frame_id=3) and worker.resized == 1:
+            print("✅ Oversized frame downscaled into the detection buffer")
+        else:
+            print(f"❌ Oversized frame rejected: {worker.get_stats()}")
+
+    except Exception as e:
+        print(f"❌ Detection worker test failed: {e}")
+    finally:
+        worker.stop()
+
+
+def test_detection_thread():
+    """Test latest-frame detection thread that never blocks the frame loop"""
+    print("Testing Detection Thread...")
+    from types import SimpleNamespace
+    from src.ml.cascade_registry import DEFAULT_FACE_CASCADE
+    
+    cold_loads = []
+    
+    class SlowDetector:
+        face_detector = SimpleNamespace(cascade_path=DEFAULT_FACE_CASCADE)
+        
+        def predict_ethnicity(self, frame, model_name):
+            # Cascade must already be loaded for this thread
+            cold_loads.append(cascade_registry.warm_up(DEFAULT_FACE_CASCADE))
+            time.sleep(0.05)
+            return "Jawa", float(frame[0, 0, 0]) / 255
+        
+        def get_last_probabilities(self):
+            return {"Jawa": 1.0}
+        
+        def is_converged(self):
+            return False
+    
+    results = []
+    detection_thread = DetectionThread(SlowDetector(), results.append)
+    try:
+        detection_thread.start()
+        
+        # Publish 20 frames at ~200 FPS; only the newest waiting frame survives
+        start_time = time.perf_counter()
+        max_submit = 0.0
+        for frame_id in range(20):
+            frame = np.full((48, 64, 3), frame_id, dtype=np.uint8)
+            submit_start = time.perf_counter()
+            detection_thread.submit(frame, "hsv", frame_id)
+            max_submit = max(max_submit, time.perf_counter() - submit_start)
+            time.sleep(0.005)
+        publish_time = time.perf_counter() - start_time
+        
+        deadline = time.time() + 2.0
+        while detection_thread.last_frame_id != 19 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        stats = detection_thread.get_stats()
+        if max_submit < 0.005 and publish_time < 0.5:
+            print(f"✅ Publishing never waited on detection (max submit {max_submit * 1e6:.0f}µs)")
+        else:
+            print(f"❌ Publishing blocked: max submit {max_submit * 1000:.1f}ms")
+        
+        frame_ids = [result['frame_id'] for result in results]
+        if frame_ids and frame_ids[-1] == 19 and frame_ids == sorted(frame_ids) and stats['dropped'] > 0:
+            print(f"✅ {len(results)} results for 20 frames, newest frame detected, {stats['dropped']} stale frames dropped")
+        else:
+            print(f"❌ Unexpected results: frames {frame_ids}, stats {stats}")
+        
+        if all(abs(result['confidence'] - result['frame_id'] / 255) < 1e-9 for result in results):
+            print("✅ Results carry the frame number they were computed on")
+        else:
+            print("❌ Result frame numbers do not match their frames")
+        
+        if cold_loads and not any(cold_loads):
+            print("✅ Cascade warmed up before the first detection on the detection thread")
+        else:
+            print(f"❌ Cascade loaded during detection: {cold_loads}")
+        
+    except Exception as e:
+        print(f"❌ Detection thread test failed: {e}")
+    finally:
+        detection_thread.stop()
+
+
 def test_camera():
     """Test camera functionality"""
     print("Testing Camera...")
@@ -89,6 +211,233 @@ def test_feature_extractors():
         print(f"❌ Feature extractor test failed: {e}")
 
 
+def test_preprocessing_context():
+    """Test shared preprocessing context"""
+    print("Testing Preprocessing Context...")
+    try:
+        test_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+        context = FacePreprocessingContext(test_image)
+        
+        # Context-based extraction must match direct extraction
+        extractors = FeatureExtractorFactory.create_combined_extractor(['hog', 'glcm', 'lbp', 'hsv'])
+        for name, extractor in extractors.items():
+            direct = extractor.extract(test_image)
+            shared = extractor.extract_from_context(context)
+            if np.array_equal(direct, shared):
+                print(f"✅ {name} context features match direct extraction")
+            else:
+                print(f"❌ {name} context features differ from direct extraction")
+        
+        print(f"✅ Context cache: {context.get_cache_info()}")
+        
+    except Exception as e:
+        print(f"❌ Preprocessing context test failed: {e}")
+
+
+def test_extraction_plan():
+    """Test compiled extraction plan layout and preallocated feature row"""
+    print("Testing Extraction Plan...")
+    try:
+        config_manager = ConfigManager()
+        extractors = FeatureExtractorFactory.create_combined_extractor(['glcm', 'lbp', 'hsv'])
+        extractors['hog'] = FeatureExtractorFactory.create_extractor('hog', backend='skimage')
+        
+        plan = build_extraction_plan('glcm_lbp_hog_hsv', extractors, config_manager.get_model_info('glcm_lbp_hog_hsv'))
+        print(f"✅ Plan layout: {plan.get_layout()} ({plan.total_dimensions} features)")
+        
+        test_image = np.random.randint(0, 255, (150, 130, 3), dtype=np.uint8)
+        context = FacePreprocessingContext(test_image)
+        row = plan.extract_into(context)
+        
+        # Same values as concatenating extractors in the configured order
+        expected = np.concatenate([extractors[name].extract(test_image) for name in plan.feature_names])
+        if row is plan.buffer and row.dtype == np.float32 and np.array_equal(row, expected):
+            print(f"✅ Plan row matches per-extractor features in config order: {plan.feature_names}")
+        else:
+            print("❌ Plan row differs from per-extractor features")
+        
+        # Concurrent mode fills the same row
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            concurrent_row = plan.extract_into(FacePreprocessingContext(test_image), executor=executor, timeout=5.0)
+            if np.array_equal(concurrent_row, expected):
+                print("✅ Concurrent extraction matches sequential extraction")
+            else:
+                print("❌ Concurrent extraction differs from sequential extraction")
+        
+    except Exception as e:
+        print(f"❌ Extraction plan test failed: {e}")
+
+
+def test_feature_cache():
+    """Test perceptual-hash feature cache hits, misses and TTL"""
+    print("Testing Feature Cache...")
+    try:
+        cache = FeatureCache(max_entries=4, similarity_threshold=6, ttl_seconds=60.0)
+        face = cv2.GaussianBlur(np.random.randint(0, 255, (120, 100), dtype=np.uint8), (0, 0), 3)
+        noisy = np.clip(face.astype(np.int16) + np.random.randint(-2, 3, face.shape), 0, 255).astype(np.uint8)
+        other = cv2.GaussianBlur(np.random.randint(0, 255, (120, 100), dtype=np.uint8), (0, 0), 3)
+        
+        cache.store('hsv', compute_face_hash(face), ('Jawa', 0.9), probabilities={'Jawa': 0.9, 'Sunda': 0.1})
+        
+        hit = cache.lookup('hsv', compute_face_hash(noisy))
+        print(f"{'✅' if hit is not None and hit['result'] == ('Jawa', 0.9) else '❌'} Near-identical crop hits cache")
+        
+        # Callers get a copy; changing it must not corrupt the cached entry
+        hit['probabilities']['Jawa'] = 0.0
+        hit['result'] = None
+        again = cache.lookup('hsv', compute_face_hash(face))
+        if again['result'] == ('Jawa', 0.9) and again['probabilities']['Jawa'] == 0.9 and 'features' not in again:
+            print("✅ Lookup returns a copy of the cached prediction")
+        else:
+            print(f"❌ Cached entry modified through lookup: {again}")
+        
+        miss_other = cache.lookup('hsv', compute_face_hash(other))
+        miss_model = cache.lookup('glcm_hog', compute_face_hash(face))
+        print(f"{'✅' if miss_other is None and miss_model is None else '❌'} Different crop or model misses cache")
+        
+        cache.ttl_seconds = -1.0
+        expired = cache.lookup('hsv', compute_face_hash(face))
+        stats = cache.get_stats()
+        if expired is None and stats['hits'] == 2 and stats['misses'] == 3 and stats['expirations'] == 1:
+            print(f"✅ Cache statistics: {stats}")
+        else:
+            print(f"❌ Unexpected cache statistics: {stats}")
+        
+    except Exception as e:
+        print(f"❌ Feature cache test failed: {e}")
+
+
+def test_quality_gate():
+    """Test face-crop quality gate rejections"""
+    print("Testing Quality Gate...")
+    try:
+        gate = FaceQualityGate(min_face_size=64, min_sharpness=25.0, min_brightness=40, max_brightness=220)
+        sharp = np.random.randint(60, 200, (120, 120), dtype=np.uint8)
+        
+        cases = {
+            'ok': sharp,
+            'too_small': sharp[:40, :40],
+            'too_dark': (sharp // 8).astype(np.uint8),
+            'too_bright': np.full((120, 120), 240, dtype=np.uint8),
+            'too_blurry': cv2.GaussianBlur(sharp, (0, 0), 8)
+        }
+        results = {expected: gate.evaluate(image)[1] for expected, image in cases.items()}
+        
+        if all(expected == actual for expected, actual in results.items()):
+            print(f"✅ Quality gate reasons: {gate.get_stats()}")
+        else:
+            print(f"❌ Unexpected quality gate results: {results}")
+        
+    except Exception as e:
+        print(f"❌ Quality gate test failed: {e}")
+
+
+def test_glcm_engine():
+    """Test vectorized GLCM engine against skimage reference"""
+    print("Testing GLCM Engine...")
+    try:
+        from skimage.feature import graycomatrix, graycoprops
+        
+        engine = GLCMEngine(distances=[1], angles=[0, 45, 90, 135], levels=256)
+        test_image = np.random.randint(0, 255, (120, 90), dtype=np.uint8)
+        
+        # skimage reference (exact training code)
+        angles_rad = [np.radians(angle) for angle in [0, 45, 90, 135]]
+        glcm = graycomatrix(test_image, distances=[1], angles=angles_rad, levels=256, symmetric=True, normed=True)
+        reference = []
+        for prop in ['contrast', 'homogeneity', 'correlation', 'energy']:
+            reference.extend(graycoprops(glcm, prop).ravel())
+        for j in range(len(angles_rad)):
+            P = glcm[:, :, 0, j]
+            P = P[P > 0]
+            reference.append(-np.sum(P * np.log2(P)))
+        
+        features = engine.compute(test_image)
+        if np.array_equal(features, np.array(reference)):
+            print(f"✅ GLCM engine matches skimage exactly: {len(features)} features")
+        else:
+            print(f"❌ GLCM engine differs from skimage: max diff {np.abs(features - reference).max()}")
+        
+    except Exception as e:
+        print(f"❌ GLCM engine test failed: {e}")
+
+
+def test_lbp_engine():
+    """Test vectorized uniform LBP engine against skimage reference"""
+    print("Testing LBP Engine...")
+    try:
+        from skimage.feature import local_binary_pattern
+        
+        engine = LBPEngine(n_points=8, radius=1.0)
+        test_image = np.random.randint(0, 255, (120, 90), dtype=np.uint8)
+        
+        # skimage reference (exact training code)
+        lbp = local_binary_pattern(test_image, 8, 1.0, method='uniform')
+        reference, _ = np.histogram(lbp.ravel(), bins=10, range=(0, 10), density=True)
+        
+        if np.array_equal(engine.compute_labels(test_image), lbp):
+            print("✅ LBP engine labels match skimage exactly")
+        else:
+            print("❌ LBP engine labels differ from skimage")
+        
+        histogram = engine.compute_histogram(test_image)
+        if np.array_equal(histogram, reference):
+            print(f"✅ LBP engine histogram matches skimage exactly: {len(histogram)} bins")
+        else:
+            print(f"❌ LBP engine histogram differs from skimage: max diff {np.abs(histogram - reference).max()}")
+        
+    except Exception as e:
+        print(f"❌ LBP engine test failed: {e}")
+
+
+def test_hog_engine():
+    """Test HOG engine backends against the skimage training reference"""
+    print("Testing HOG Engine...")
+    try:
+        from skimage.feature import hog
+        
+        engine = HOGEngine(image_size=(256, 256), backend='skimage')
+        test_image = np.random.randint(0, 255, (256, 256), dtype=np.uint8)
+        
+        # skimage reference (exact training code)
+        reference = hog(test_image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(2, 2),
+                        block_norm='L2-Hys', feature_vector=True, channel_axis=None).astype(np.float32)
+        
+        features = engine.compute(test_image)
+        if np.array_equal(features, reference) and engine.feature_dimensions == len(reference):
+            print(f"✅ HOG engine matches skimage exactly: {len(features)} dimensions")
+        else:
+            print("❌ HOG engine differs from skimage reference")
+        
+        # cv2 fast path must produce the same layout and dimensions
+        fast_features = engine._compute_cv2(test_image)
+        if fast_features.shape == reference.shape:
+            print(f"✅ HOG cv2 layout: correlation {np.corrcoef(fast_features, reference)[0, 1]:.3f}")
+        else:
+            print(f"❌ HOG cv2 dimensions differ: {fast_features.shape} vs {reference.shape}")
+        
+        # 'auto' only selects cv2 when the parity check passes
+        auto_engine = HOGEngine(image_size=(256, 256), backend='auto')
+        expected_backend = 'cv2' if auto_engine.parity_report['passed'] else 'skimage'
+        if auto_engine.backend == expected_backend:
+            print(f"✅ HOG auto backend: {auto_engine.backend} (max diff {auto_engine.parity_report['max_abs_diff']:.4f})")
+        else:
+            print(f"❌ HOG auto backend ignored parity check: {auto_engine.backend}")
+
+        # The parity verdict is cached per configuration
+        start_time = time.perf_counter()
+        second_engine = HOGEngine(image_size=(256, 256), backend='auto')
+        construct_ms = (time.perf_counter() - start_time) * 1000
+        if second_engine.parity_report == auto_engine.parity_report and construct_ms < 50:
+            print(f"✅ HOG parity verdict reused: second 'auto' engine built in {construct_ms:.1f}ms")
+        else:
+            print(f"❌ HOG parity recomputed: {construct_ms:.1f}ms")
+
+    except Exception as e:
+        print(f"❌ HOG engine test failed: {e}")
+
+
 def test_face_detector():
     """Test face detector"""
     print("Testing Face Detector...")
@@ -152,6 +501,95 @@ def test_config_manager():
         print(f"❌ Config manager test failed: {e}")
 
 
+def test_cascade_registry():
+    """Test shared cascade registry reuses one instance per thread"""
+    print("Testing Cascade Registry...")
+    try:
+        import threading
+        
+        first = cascade_registry.get()
+        second = cascade_registry.get()
+        print(f"{'✅' if first is second else '❌'} Cascade reused within a thread")
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(cascade_registry.get()))
+        thread.start()
+        thread.join()
+        print(f"{'✅' if other and other[0] is not first else '❌'} Separate cascade instance per thread")
+        
+        print(f"✅ Cascade load stats: {cascade_registry.get_stats()}")
+        
+    except Exception as e:
+        print(f"❌ Cascade registry test failed: {e}")
+
+
+def test_downscaled_face_detection():
+    """Test downscaled cascade detection maps boxes back to full resolution"""
+    print("Testing Downscaled Face Detection...")
+    try:
+        from skimage import data
+        
+        frame = cv2.resize(cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2BGR), (640, 640))[80:560]
+        full = FaceDetectorFactory.create_detector("opencv", detection_scale=1.0).detect_largest_face(frame)
+        scaled = FaceDetectorFactory.create_detector("opencv", detection_scale=0.5).detect_largest_face(frame)
+        
+        if full and scaled and all(abs(a - b) <= 8 for a, b in zip(full, scaled)):
+            print(f"✅ Downscaled detection matches full resolution: {scaled} vs {full}")
+        else:
+            print(f"❌ Downscaled detection differs: {scaled} vs {full}")
+        
+    except Exception as e:
+        print(f"❌ Downscaled face detection test failed: {e}")
+
+
+def test_tracking_face_detection():
+    """Test ROI-tracked detection between full-frame scans"""
+    print("Testing Tracking Face Detection...")
+    try:
+        from skimage import data
+        
+        frame = cv2.resize(cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2BGR), (640, 640))[80:560]
+        detector = FaceDetectorFactory.create_detector("opencv_tracking", full_scan_interval=5)
+        # Full scan, five ROI scans, then the periodic full scan
+        faces = [detector.detect_largest_face(frame) for _ in range(7)]
+        stats = detector.get_tracking_stats()
+        
+        if all(faces) and stats['full_scans'] == 2 and stats['roi_hits'] == 5:
+            print(f"✅ Tracking detection: {stats}")
+        else:
+            print(f"❌ Unexpected tracking behaviour: {faces}, {stats}")
+        
+        # A miss in the ROI falls back to a full-frame scan
+        blank = np.zeros_like(frame)
+        if detector.detect_largest_face(blank) is None and detector.last_face is None:
+            print("✅ Lost face resets tracking")
+        else:
+            print("❌ Tracking kept a face on a blank frame")
+        
+    except Exception as e:
+        print(f"❌ Tracking face detection test failed: {e}")
+
+
+def test_yunet_detector_fallback():
+    """Test YuNet backend requires a local model and falls back to Haar"""
+    print("Testing YuNet Detector Fallback...")
+    try:
+        try:
+            FaceDetectorFactory.create_detector("yunet", model_path="models/missing_yunet.onnx")
+            print("❌ YuNet detector created without a model file")
+        except ValueError:
+            print("✅ YuNet detector rejects a missing model file")
+        
+        detector = MLEthnicityDetector._create_face_detector({'backend': 'yunet', 'yunet_model': 'models/missing_yunet.onnx'})
+        if detector.accepts_grayscale:
+            print(f"✅ Fallback face detector: {type(detector).__name__}")
+        else:
+            print("❌ Unexpected fallback detector")
+        
+    except Exception as e:
+        print(f"❌ YuNet fallback test failed: {e}")
+
+
 def test_model_manager():
     """Test model manager"""
     print("Testing Model Manager...")
@@ -176,6 +614,413 @@ def test_model_manager():
         print(f"❌ Model manager test failed: {e}")
 
 
+def test_model_store():
+    """Test joblib conversion and lazy, memory-mapped model loading"""
+    print("Testing Model Store...")
+    try:
+        import pickle
+        import tempfile
+        from sklearn.linear_model import LogisticRegression
+        from src.ml.model_store import convert_pickle_models
+        
+        X = np.random.rand(60, 32)
+        model = LogisticRegression(max_iter=200).fit(X, np.arange(60) % 4)
+        
+        with tempfile.TemporaryDirectory() as models_dir:
+            with open(Path(models_dir) / "HSV_model.pkl", 'wb') as f:
+                pickle.dump(model, f)
+            
+            manifest = convert_pickle_models(models_dir)
+            if manifest.get('HSV_model', {}).get('n_features') == 32:
+                print(f"✅ Converted to joblib: {manifest['HSV_model']['file']}")
+            else:
+                print(f"❌ Conversion manifest incomplete: {manifest}")
+            
+            model_manager = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+            model_manager.load_models(models_dir)
+            
+            # Registered, not loaded; model info comes from the manifest
+            info = model_manager.get_model_info('hsv')
+            if not model_manager.models.is_loaded('hsv') and info.get('n_features') == 32:
+                print(f"✅ Lazy registration with manifest info: {info}")
+            else:
+                print(f"❌ Model loaded eagerly: {info}")
+            
+            ethnicity, _ = model_manager.predict('hsv', X[0])
+            stats = model_manager.get_load_stats()['hsv']
+            if ethnicity is not None and stats['loaded'] and stats['format'] == 'joblib' and stats['mapped_bytes'] > 0:
+                print(f"✅ Loaded on first prediction: {stats}")
+            else:
+                print(f"❌ Lazy load failed: {ethnicity}, {stats}")
+            
+            # Drop the mapped model before the directory is removed
+            del model_manager.models['hsv']
+
+            # A pickle retrained in place is newer than its joblib and wins
+            pickle_path = Path(models_dir) / "HSV_model.pkl"
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(LogisticRegression(max_iter=200).fit(X[:, :16], np.arange(60) % 4), f)
+            joblib_stat = (Path(models_dir) / "HSV_model.joblib").stat()
+            os.utime(pickle_path, ns=(joblib_stat.st_atime_ns, joblib_stat.st_mtime_ns + 1_000_000_000))
+
+            model_manager.load_models(models_dir)
+            info = model_manager.get_model_info('hsv', load=False)
+            if info.get('loaded') is False and not model_manager.models.is_loaded('hsv'):
+                print("✅ Model info without a manifest entry does not load the model")
+            else:
+                print(f"❌ Model info loaded the model: {info}")
+
+            ethnicity, _ = model_manager.predict('hsv', X[0, :16])
+            stats = model_manager.get_load_stats()['hsv']
+            if ethnicity is not None and stats['format'] == 'pkl' and 'n_features' not in model_manager.models.get_metadata('hsv'):
+                print(f"✅ Stale joblib skipped for retrained pickle: {stats['file']}")
+            else:
+                print(f"❌ Stale joblib served: {ethnicity}, {stats}")
+
+    except Exception as e:
+        print(f"❌ Model store test failed: {e}")
+
+
+def test_model_residency():
+    """Test LRU eviction under a model residency budget"""
+    print("Testing Model Residency...")
+    try:
+        import pickle
+        import tempfile
+        from sklearn.linear_model import LogisticRegression
+        from src.ml.model_store import ModelStore
+        
+        X = np.random.rand(40, 8)
+        model = LogisticRegression(max_iter=200).fit(X, np.arange(40) % 4)
+        
+        with tempfile.TemporaryDirectory() as models_dir:
+            store = ModelStore(max_resident_models=2)
+            for name in ('a', 'b', 'c'):
+                path = Path(models_dir) / f"{name}.pkl"
+                with open(path, 'wb') as f:
+                    pickle.dump(model, f)
+                store.register(name, path)
+            
+            for name in ('a', 'b', 'a', 'c'):
+                store[name]
+            
+            residency = store.get_residency_stats()
+            if residency['resident_models'] == ['a', 'c'] and residency['evictions'] == 1:
+                print(f"✅ Least recently used model evicted: {residency['resident_models']}")
+            else:
+                print(f"❌ Unexpected residency: {residency}")
+            
+            # Evicted model reloads on demand
+            store['b']
+            stats = store.get_stats()
+            if stats['b']['misses'] == 2 and stats['b']['evictions'] == 1 and stats['a']['hits'] == 1:
+                print(f"✅ Reload on demand: b={stats['b']['misses']} misses, a={stats['a']['hits']} hit")
+            else:
+                print(f"❌ Unexpected access stats: {stats}")
+        
+    except Exception as e:
+        print(f"❌ Model residency test failed: {e}")
+
+
+def test_compiled_tree_manager():
+    """Test array-compiled tree ensemble inference against sklearn"""
+    print("Testing Compiled Tree Manager...")
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+        
+        X = np.random.rand(200, 40)
+        y = np.arange(200) % 4
+        forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+        
+        reference = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+        compiled = ModelManagerFactory.create_manager("compiled_tree", config_manager=ConfigManager())
+        reference.models['glcm_hog'] = forest
+        compiled.models['glcm_hog'] = forest
+        
+        expected = reference.predict_distribution('glcm_hog', X[:16])
+        results = compiled.predict_distribution('glcm_hog', X[:16])
+        max_diff = max(
+            abs(result['probabilities'][name] - reference_result['probabilities'][name])
+            for result, reference_result in zip(results, expected) for name in result['probabilities']
+        )
+        labels_match = [r['ethnicity'] for r in results] == [r['ethnicity'] for r in expected]
+        if labels_match and max_diff <= 1e-9:
+            print(f"✅ Compiled probabilities match sklearn (max diff {max_diff:.1e})")
+        else:
+            print(f"❌ Compiled inference differs (max diff {max_diff}, labels match {labels_match})")
+        
+        info = compiled.get_model_info('glcm_hog')
+        if info.get('inference') == 'compiled' and info['parity']['passed']:
+            print(f"✅ Model served by compiled engine: {info['parity']}")
+        else:
+            print(f"❌ Model not compiled: {info}")
+        
+        # Non-tree models fall back to sklearn
+        compiled.models['hsv'] = LogisticRegression(max_iter=200).fit(X, y)
+        ethnicity, _ = compiled.predict('hsv', X[0])
+        if ethnicity is not None and compiled.get_model_info('hsv').get('inference') is None:
+            print(f"✅ Unsupported model served by sklearn: {ethnicity}")
+        else:
+            print(f"❌ Fallback failed: {ethnicity}, {compiled.get_model_info('hsv')}")
+        
+    except Exception as e:
+        print(f"❌ Compiled tree manager test failed: {e}")
+
+
+def test_onnx_manager():
+    """Test ONNX Runtime manager (or the pickle fallback when onnxruntime is not installed)"""
+    print("Testing ONNX Model Manager...")
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+        
+        try:
+            onnx_manager = ModelManagerFactory.create_manager("onnx", config_manager=ConfigManager())
+        except ImportError as e:
+            print(f"✅ ONNX manager reports missing dependencies: {e}")
+            manager = MLEthnicityDetector._create_model_manager({'manager': 'onnx'}, ConfigManager())
+            if type(manager).__name__ == 'PickleModelManager':
+                print("✅ Detector falls back to the pickle manager")
+            else:
+                print(f"❌ Unexpected fallback manager: {type(manager).__name__}")
+            return
+        
+        X = np.random.rand(200, 40).astype(np.float32)
+        forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, np.arange(200) % 4)
+        reference = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+        reference.models['glcm_hog'] = forest
+        onnx_manager.models['glcm_hog'] = forest
+        
+        expected = [r['ethnicity'] for r in reference.predict_distribution('glcm_hog', X[:32])]
+        results = [r['ethnicity'] for r in onnx_manager.predict_distribution('glcm_hog', X[:32])]
+        agreement = np.mean([a == b for a, b in zip(expected, results)])
+        if agreement >= 0.95 and onnx_manager.get_model_info('glcm_hog').get('inference') == 'onnx':
+            print(f"✅ ONNX predictions agree with sklearn: {agreement:.1%}")
+        else:
+            print(f"❌ ONNX predictions disagree: {agreement:.1%}")
+        
+    except Exception as e:
+        print(f"❌ ONNX model manager test failed: {e}")
+
+
+def test_model_hot_reload():
+    """Test background model reload with atomic swap, rejection and rollback"""
+    print("Testing Model Hot Reload...")
+    try:
+        import pickle
+        import tempfile
+        import threading
+        from sklearn.ensemble import RandomForestClassifier
+        from src.ml.model_reloader import ModelReloader
+        
+        X = np.random.rand(200, 40).astype(np.float32)
+        
+        def write_run(root, run_name, n_features, seed):
+            run_dir = Path(root) / run_name
+            run_dir.mkdir()
+            model = RandomForestClassifier(n_estimators=10, random_state=seed).fit(
+                np.random.rand(200, n_features), np.arange(200) % 4
+            )
+            with open(run_dir / 'GLCM_HOG_model.pkl', 'wb') as f:
+                pickle.dump(model, f)
+            return str(run_dir)
+        
+        with tempfile.TemporaryDirectory() as root:
+            run_a = write_run(root, 'run_a', 40, 0)
+            run_b = write_run(root, 'run_b', 40, 1)
+            run_c = write_run(root, 'run_c', 30, 2)
+            
+            manager = ModelManagerFactory.create_manager("compiled_tree", config_manager=ConfigManager())
+            manager.load_models(run_a)
+            manager.predict_distribution('glcm_hog', X[0])
+            
+            # Predictions keep flowing while the new set loads, compiles and swaps in
+            failures = []
+            stop = threading.Event()
+            
+            def predict_loop():
+                while not stop.is_set():
+                    if not manager.predict_distribution('glcm_hog', X[0]):
+                        failures.append(1)
+            
+            thread = threading.Thread(target=predict_loop)
+            thread.start()
+            report = manager.reload_models(run_b, {'glcm_hog': 40})
+            stop.set()
+            thread.join()
+            
+            new_model = manager.models['glcm_hog']
+            engine_installed = manager.compiled['glcm_hog'][0]() is new_model
+            if report['success'] and manager.models_dir == run_b and engine_installed and not failures:
+                print(f"✅ Hot-swapped models in {report['reload_time_ms']:.0f}ms without failed predictions")
+            else:
+                print(f"❌ Hot swap failed: {report}, engine installed {engine_installed}, {len(failures)} failures")
+            
+            # A set that does not match the extractors is rejected and the current set keeps serving
+            report = manager.reload_models(run_c, {'glcm_hog': 40})
+            if not report['success'] and manager.models_dir == run_b and manager.models['glcm_hog'] is new_model:
+                print(f"✅ Mismatching model set rejected: {report['error']}")
+            else:
+                print(f"❌ Mismatching model set was not rejected: {report}")
+            
+            if manager.rollback_models() and manager.models_dir == run_a:
+                print("✅ Rolled back to the previous model set")
+            else:
+                print("❌ Rollback failed")
+            
+            # Directory watch reloads once a changed file is stable for one poll
+            reloader = ModelReloader(manager, run_a, poll_interval=0.05, watch=True)
+            reloader.start()
+            write_run(root, 'run_d', 40, 3)
+            Path(run_a, 'GLCM_HOG_model.pkl').write_bytes(Path(root, 'run_d', 'GLCM_HOG_model.pkl').read_bytes())
+            deadline = time.time() + 5.0
+            while reloader.reloads == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            refused = not reloader.request_reload(tempfile.gettempdir())
+            reloader.stop()
+            
+            if reloader.reloads == 1 and refused:
+                print(f"✅ Watched directory change reloaded, outside directory refused: {reloader.get_stats()}")
+            else:
+                print(f"❌ Reloader did not behave as expected: {reloader.get_stats()}, refused {refused}")
+        
+    except Exception as e:
+        print(f"❌ Model hot reload test failed: {e}")
+
+
+def test_inference_queue():
+    """Test micro-batching of concurrent predictions"""
+    print("Testing Inference Queue...")
+    try:
+        import threading
+        from sklearn.ensemble import RandomForestClassifier
+        from src.ml.inference_queue import InferenceQueue
+        
+        X = np.random.rand(200, 40).astype(np.float32)
+        forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, np.arange(200) % 4)
+        model_manager = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+        model_manager.models['glcm_hog'] = forest
+        expected = model_manager.predict_distribution('glcm_hog', X[:8])
+        
+        inference_queue = InferenceQueue(model_manager, max_batch_size=16, max_wait_ms=50.0)
+        inference_queue.start()
+        results = [None] * 8
+        
+        def caller(index):
+            with inference_queue.track():
+                results[index] = inference_queue.predict_distribution('glcm_hog', X[index])
+        
+        threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = inference_queue.get_queue_stats()
+        matches = all(
+            result and result[0]['ethnicity'] == reference['ethnicity']
+            and abs(result[0]['confidence'] - reference['confidence']) < 1e-9
+            for result, reference in zip(results, expected)
+        )
+        if matches and stats['requests'] == 8 and stats['batches'] < 8:
+            print(f"✅ 8 concurrent requests answered in {stats['batches']} batches "
+                  f"(max {stats['max_batch_rows']} rows, avg wait {stats['average_wait_ms']:.1f}ms)")
+        else:
+            print(f"❌ Queued predictions differ or were not batched: {stats}")
+        
+        # A lone tracked caller is not held for the batching window
+        start_time = time.perf_counter()
+        with inference_queue.track():
+            inference_queue.predict('glcm_hog', X[0])
+        lone_ms = (time.perf_counter() - start_time) * 1000
+        if lone_ms < 50.0:
+            print(f"✅ Lone request dispatched without waiting: {lone_ms:.1f}ms")
+        else:
+            print(f"❌ Lone request waited for the window: {lone_ms:.1f}ms")
+        
+        inference_queue.stop()
+        if not inference_queue.is_running() and inference_queue.predict('glcm_hog', X[0])[0] is not None:
+            print("✅ Stopped queue predicts directly")
+        else:
+            print("❌ Stopped queue failed to predict")
+        
+    except Exception as e:
+        print(f"❌ Inference queue test failed: {e}")
+
+
+def test_batch_prediction():
+    """Test batched feature extraction and stacked prediction"""
+    print("Testing Batch Prediction...")
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+        
+        faces = [np.random.randint(0, 255, (h, w, 3), dtype=np.uint8) for h, w in [(80, 80), (120, 100), (64, 90)]]
+        
+        # Batch extraction matches per-face extraction
+        extractor = FeatureExtractorFactory.create_extractor("hsv")
+        batch = extractor.extract_batch(faces)
+        single = np.vstack([extractor.extract(face) for face in faces])
+        if batch.shape == single.shape and np.allclose(batch, single):
+            print(f"✅ HSV batch extraction: {batch.shape}")
+        else:
+            print(f"❌ HSV batch extraction differs: {batch.shape} vs {single.shape}")
+        
+        # One predict_proba call matches per-row predictions
+        model_manager = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+        X = np.random.rand(40, batch.shape[1]).astype(np.float32)
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, np.arange(40) % 4)
+        model_manager.models['hsv'] = model
+        
+        batch_results = model_manager.predict_batch('hsv', batch)
+        single_results = [model_manager.predict('hsv', row) for row in batch]
+        if [r[0] for r in batch_results] == [r[0] for r in single_results]:
+            print(f"✅ Batch prediction matches single predictions: {batch_results}")
+        else:
+            print(f"❌ Batch prediction differs: {batch_results} vs {single_results}")
+        
+    except Exception as e:
+        print(f"❌ Batch prediction test failed: {e}")
+
+
+def test_probability_first_prediction():
+    """Test single predict_proba inference with full class distribution"""
+    print("Testing Probability-First Prediction...")
+    try:
+        from sklearn.linear_model import LogisticRegression
+        
+        model_manager = ModelManagerFactory.create_manager("pickle", config_manager=ConfigManager())
+        X = np.random.rand(60, 8)
+        y = np.arange(60) % 4
+        model = LogisticRegression(max_iter=200).fit(X, y)
+        model_manager.models['hsv'] = model
+        
+        results = model_manager.predict_distribution('hsv', X[:5])
+        expected = [model_manager.ethnicity_map[label] for label in model.predict(X[:5])]
+        if [r['ethnicity'] for r in results] == expected:
+            print(f"✅ Argmax labels match model.predict: {expected}")
+        else:
+            print(f"❌ Argmax labels differ: {[r['ethnicity'] for r in results]} vs {expected}")
+        
+        distribution = results[0]['probabilities']
+        if abs(sum(distribution.values()) - 1.0) < 1e-6 and results[0]['confidence'] == max(distribution.values()):
+            print(f"✅ Full distribution returned: {distribution}")
+        else:
+            print(f"❌ Distribution inconsistent with confidence: {results[0]}")
+        
+        # Single-row predict uses the same path
+        ethnicity, confidence = model_manager.predict('hsv', X[0])
+        if ethnicity == results[0]['ethnicity'] and abs(confidence - results[0]['confidence']) < 1e-9:
+            print(f"✅ predict() matches distribution: {ethnicity} ({confidence:.3f})")
+        else:
+            print(f"❌ predict() differs: {ethnicity}, {confidence}")
+        
+        if model_manager.predict_distribution('missing', X[:2]) == []:
+            print("✅ Unknown model returns no predictions")
+        
+    except Exception as e:
+        print(f"❌ Probability-first prediction test failed: {e}")
+
+
 def test_udp_server():
     """Test UDP server"""
     print("Testing UDP Server...")
@@ -234,6 +1079,227 @@ def test_ethnicity_detector():
         print(f"❌ Ethnicity detector test failed: {e}")
 
 
+def test_detector_warm_up():
+    """Test startup warm-up of detector, extractors and models"""
+    print("Testing Detector Warm-Up...")
+    try:
+        from sklearn.linear_model import LogisticRegression
+        
+        detector = MLEthnicityDetector.create_default_detector(ConfigManager())
+        if 'face_detector' in detector.warm_up_report and 'extractor:hog' in detector.warm_up_report:
+            print(f"✅ Warm-up ran during startup: {detector.warm_up_report['total']:.0f}ms")
+        else:
+            print(f"❌ Warm-up report incomplete: {detector.warm_up_report}")
+        
+        dimensions = detector.get_expected_feature_dimensions('hsv')
+        detector.model_manager.models['hsv'] = LogisticRegression(max_iter=200).fit(
+            np.random.rand(40, dimensions), np.arange(40) % 4
+        )
+        report = detector.warm_up(['hsv'])
+        if 'model:hsv' in report and detector.get_performance_stats()['total_detections'] == 0:
+            print(f"✅ Model warm-up without touching detection stats: {report['model:hsv']:.1f}ms")
+        else:
+            print(f"❌ Model warm-up failed: {report}")
+
+        # A lazily registered model without manifest info is checked on first use, not at startup
+        import pickle
+        import tempfile
+        with tempfile.TemporaryDirectory() as models_dir:
+            model_path = Path(models_dir) / "HSV_model.pkl"
+            with open(model_path, 'wb') as f:
+                pickle.dump(LogisticRegression(max_iter=200).fit(np.random.rand(40, 7), np.arange(40) % 4), f)
+            detector.model_manager.models.register('hsv', model_path)
+
+            detector.verify_model_dimensions()
+            deferred = 'hsv' in detector.unverified_models and not detector.model_manager.models.is_loaded('hsv')
+            face = np.random.randint(0, 255, (200, 200, 3), dtype=np.uint8)
+            rejected = detector.predict_ethnicity(face, 'hsv') == (None, 0.0) and 'hsv' in detector.invalid_models
+            if deferred and rejected:
+                print("✅ Dimension check deferred to first load, mismatching model rejected then")
+            else:
+                print(f"❌ Deferred dimension check failed: {detector.dimension_report.get('hsv')}")
+            del detector.model_manager.models['hsv']
+
+            # Default warm-up loads only the default model, the rest stay lazily registered
+            from sklearn.dummy import DummyClassifier
+            default_model = detector.config_manager.get_default_model()
+            for model_name in ('glcm_hog', 'glcm_lbp_hog', 'hsv'):
+                dummy = DummyClassifier().fit(np.zeros((4, detector.get_expected_feature_dimensions(model_name))), np.arange(4))
+                model_path = Path(models_dir) / f"{model_name}.pkl"
+                with open(model_path, 'wb') as f:
+                    pickle.dump(dummy, f)
+                detector.model_manager.models.register(model_name, model_path)
+            detector.verify_model_dimensions()
+            report = detector.warm_up()
+            loaded = [name for name in ('glcm_hog', 'glcm_lbp_hog', 'hsv') if detector.model_manager.models.is_loaded(name)]
+            if loaded == [default_model] and f'model:{default_model}' in report:
+                print(f"✅ Default warm-up loaded only {loaded}")
+            else:
+                print(f"❌ Warm-up loaded {loaded}: {report}")
+            for model_name in ('glcm_hog', 'glcm_lbp_hog', 'hsv'):
+                del detector.model_manager.models[model_name]
+
+        detector.shutdown()
+        
+    except Exception as e:
+        print(f"❌ Detector warm-up test failed: {e}")
+
+
+def test_confidence_cascade():
+    """Test cheap-model-first cascade with escalation and feature reuse"""
+    print("Testing Confidence Cascade...")
+    try:
+        from skimage import data
+        from sklearn.dummy import DummyClassifier
+        
+        detector = MLEthnicityDetector.create_default_detector(ConfigManager())
+        detector.feature_cache = None
+        detector.temporal_aggregator = None
+        detector.cascade_model = 'hsv'
+        frame = cv2.resize(cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2BGR), (640, 640))[80:560]
+        
+        # Constant-confidence models: hsv is always sure (1.0), the full model answers with 0.5
+        full_model = 'glcm_lbp_hog_hsv'
+        for model_name, labels in (('hsv', [0] * 4), (full_model, [1, 1, 2, 2])):
+            dimensions = detector.get_expected_feature_dimensions(model_name)
+            detector.model_manager.models[model_name] = DummyClassifier(strategy='prior').fit(
+                np.zeros((4, dimensions)), labels
+            )
+        
+        hsv_extractor = detector.feature_extractors['hsv']
+        hsv_calls = []
+        original_extract_into = hsv_extractor.extract_into
+        hsv_extractor.extract_into = lambda *args: hsv_calls.append(1) or original_extract_into(*args)
+        
+        detector.cascade_threshold = 0.9
+        ethnicity, confidence = detector.predict_ethnicity(frame, full_model)
+        if ethnicity is None:
+            print("❌ No detection on the test face")
+            return
+        stats = detector.get_cascade_stats()
+        if confidence == 1.0 and stats['escalations'] == 0:
+            print(f"✅ Confident cheap model answered alone in {stats['average_accepted_ms']:.1f}ms")
+        else:
+            print(f"❌ Cheap model was not accepted: {confidence}, {stats}")
+        
+        hsv_calls.clear()
+        detector.cascade_threshold = 1.01
+        ethnicity, confidence = detector.predict_ethnicity(frame, full_model)
+        stats = detector.get_cascade_stats()
+        if confidence == 0.5 and stats['escalations'] == 1 and len(hsv_calls) == 1:
+            print(f"✅ Escalated to {full_model} reusing the HSV block: {stats['average_escalated_ms']:.1f}ms, "
+                  f"escalation rate {stats['escalation_rate']:.0%}")
+        else:
+            print(f"❌ Escalation failed: {confidence}, {stats}, HSV extracted {len(hsv_calls)} times")
+        
+        if detector.get_performance_stats()['cascade']['detections'] == 2:
+            print("✅ Cascade stats reported")
+        else:
+            print("❌ Cascade stats missing")
+
+        # A cheap model failing the dimension check is reported instead of silently skipped
+        detector.invalid_models.add('hsv')
+        if not detector.check_cascade_model() and not detector.get_cascade_stats()['active']:
+            print("✅ Inactive cascade reported for an invalid cheap model")
+        else:
+            print("❌ Invalid cheap model not reported")
+
+        detector.shutdown()
+        
+    except Exception as e:
+        print(f"❌ Confidence cascade test failed: {e}")
+
+
+def test_temporal_aggregation():
+    """Test per-session result smoothing, convergence and session resets"""
+    print("Testing Temporal Aggregation...")
+    try:
+        from skimage import data
+        from sklearn.dummy import DummyClassifier
+        from src.ml.temporal_aggregator import TemporalAggregator
+        
+        # Noisy detections leaning to Jawa: the raw argmax flickers, the aggregate does not
+        noisy = [
+            {'Jawa': 0.7, 'Batak': 0.3}, {'Jawa': 0.4, 'Batak': 0.6}, {'Jawa': 0.8, 'Batak': 0.2},
+            {'Jawa': 0.9, 'Batak': 0.1}, {'Jawa': 0.85, 'Batak': 0.15}, {'Jawa': 0.9, 'Batak': 0.1}
+        ]
+        aggregator = TemporalAggregator(method='decay', decay=0.6, margin=0.25, convergence_count=3)
+        results = [aggregator.update(probabilities, face_hash=0, model_name='hsv') for probabilities in noisy]
+        if all(result['ethnicity'] == 'Jawa' for result in results):
+            print("✅ Aggregated result stable through a flickering detection")
+        else:
+            print(f"❌ Aggregated result flickered: {[result['ethnicity'] for result in results]}")
+        
+        converged_at = next((i + 1 for i, result in enumerate(results) if result['converged']), None)
+        if converged_at is not None and aggregator.is_converged():
+            print(f"✅ Converged after {converged_at} detections")
+        else:
+            print(f"❌ Did not converge: {aggregator.get_stats()}")
+        
+        # A different face (hash far away) starts a new, unconverged session
+        result = aggregator.update({'Jawa': 0.1, 'Batak': 0.9}, face_hash=(1 << 64) - 1, model_name='hsv')
+        if result['ethnicity'] == 'Batak' and not result['converged'] and aggregator.get_stats()['sessions'] == 2:
+            print("✅ Face change starts a new session")
+        else:
+            print(f"❌ Face change not detected: {result}")
+        
+        voter = TemporalAggregator(method='vote', window=3, margin=0.3, convergence_count=2)
+        votes = [voter.update(probabilities, face_hash=0)['ethnicity'] for probabilities in noisy[:3]]
+        if votes == ['Jawa', 'Jawa', 'Jawa'] and voter.get_stats()['method'] == 'vote':
+            print("✅ Sliding vote aggregation")
+        else:
+            print(f"❌ Sliding vote unexpected: {votes}")
+        
+        try:
+            TemporalAggregator(method='median')
+            print("❌ Unknown method accepted")
+        except ValueError:
+            print("✅ Unknown method rejected")
+        
+        # Detector reports the session result and its convergence
+        detector = MLEthnicityDetector.create_default_detector(ConfigManager())
+        detector.feature_cache = None
+        detector.temporal_aggregator = TemporalAggregator(convergence_count=3)
+        dimensions = detector.get_expected_feature_dimensions('hsv')
+        detector.model_manager.models['hsv'] = DummyClassifier(strategy='prior').fit(
+            np.zeros((4, dimensions)), [0, 0, 0, 1]
+        )
+        frame = cv2.resize(cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2BGR), (640, 640))[80:560]
+        converged = []
+        for _ in range(3):
+            detector.predict_ethnicity(frame, 'hsv')
+            converged.append(detector.is_converged())
+        stats = detector.get_performance_stats().get('temporal_aggregation', {})
+        if converged == [False, False, True] and stats.get('converged_sessions') == 1:
+            print(f"✅ Detector session converged: {stats}")
+        else:
+            print(f"❌ Detector session did not converge: {converged}, {stats}")
+
+        # Cache hits repeat one inference and must not count toward convergence
+        detector.feature_cache = FeatureCache(ttl_seconds=60.0)
+        detector.temporal_aggregator = TemporalAggregator(convergence_count=3)
+        results = [detector.predict_ethnicity(frame, 'hsv') for _ in range(5)]
+        stats = detector.get_performance_stats().get('temporal_aggregation', {})
+        cache_stats = detector.feature_cache.get_stats()
+        if (cache_stats['hits'] > 0 and stats.get('detections') == cache_stats['misses']
+                and not detector.is_converged() and len(set(results)) == 1):
+            print(f"✅ Cache hits report the session result without adding to it: {stats}")
+        else:
+            print(f"❌ Cache hits counted as detections: {cache_stats}, {stats}")
+
+        # DETECTION_REQUEST batches must not replace the detection thread's last distribution
+        detector.last_probabilities = {'Sasak': 1.0}
+        batch = detector.predict_ethnicity_batch(frame, 'hsv')
+        if batch and batch[0]['probabilities'] and detector.get_last_probabilities() == {'Sasak': 1.0}:
+            print("✅ Batch prediction leaves the shared last distribution alone")
+        else:
+            print(f"❌ Batch prediction overwrote last distribution: {detector.get_last_probabilities()}")
+        detector.shutdown()
+        
+    except Exception as e:
+        print(f"❌ Temporal aggregation test failed: {e}")
+
+
 def main():
     """Run all tests"""
     print("=== Testing Refactored ML Webcam Server ===\n")
@@ -242,11 +1308,35 @@ def main():
         test_logger,
         test_config_manager,
         test_feature_extractors,
+        test_preprocessing_context,
+        test_extraction_plan,
+        test_feature_cache,
+        test_quality_gate,
+        test_glcm_engine,
+        test_lbp_engine,
+        test_hog_engine,
         test_face_detector,
+        test_cascade_registry,
+        test_downscaled_face_detection,
+        test_tracking_face_detection,
+        test_yunet_detector_fallback,
         test_model_manager,
+        test_model_store,
+        test_model_residency,
+        test_model_hot_reload,
+        test_compiled_tree_manager,
+        test_onnx_manager,
+        test_inference_queue,
+        test_batch_prediction,
+        test_probability_first_prediction,
         test_udp_server,
+        test_detection_worker,
+        test_detection_thread,
         test_camera,
-        test_ethnicity_detector
+        test_ethnicity_detector,
+        test_detector_warm_up,
+        test_confidence_cascade,
+        test_temporal_aggregation
     ]
     
     passed = 0